@@ -0,0 +1,705 @@
+"""
+Execution Backends for the UK Corporate Analysis.
+
+The analysis is defined once in `uk_corporate_analysis` in terms of a few
+operations on a frame:
+
+- scan: read the columns of a dataset, filling defaults for missing values,
+- split: separate the rows whose column takes one of some values from the rest,
+- process_companies / process_officers_owners: add the derived columns, the
+  latter also reporting the nationalities it cannot map,
+- group_count: count the rows per group, optionally filtered, as a small
+  pandas DataFrame sorted by count, ready for the charts,
+- grouping_sets: compute many group counts, given as a dict of grouping
+  specifications ({'by': ..., 'where': ..., 'top_n': ...}), in one scan,
+- collect: run a small result of the backend into a pandas DataFrame.
+
+This module implements these operations on Polars lazy frames and on DuckDB
+relations querying the Parquet files directly. The pandas implementation is
+the reference one in `uk_corporate_analysis`. Only the small grouped results
+are converted to pandas, so the heavy work runs in the selected engine. The
+Polars and DuckDB backends are made of native expressions only, including
+the date and address parsing, so they never call back into Python.
+
+Filters passed to `group_count` are written in the subset of syntax shared by
+`pandas.DataFrame.query` and SQL: comparisons with `==` and `!=`, `and`,
+`or`, `True`/`False` and quoted strings. Unlike pandas, SQL comparisons with
+a null value are never true.
+
+Future Improvements:
+---------------------
+1. Keep the DuckDB relations of a run in one transaction to reuse scans.
+"""
+import re
+import logging
+import pathlib
+import datetime as dt
+import typing
+
+import polars as pl
+import pandas as pd
+
+import wrangle
+import parquet_layout as layout
+
+try:
+    import duckdb
+except ImportError:  # Optional, only needed by the 'duckdb' backend
+    duckdb = None
+
+
+# Characters separating the first nationality of a compound value, see
+# uk_corporate_analysis.normalize_nationality
+NATIONALITY_SEPARATORS = r'+;/,()&-'
+# DuckDB types of the Hive partition keys, see parquet_layout.HIVE_DTYPES
+DUCKDB_HIVE_TYPES = {pl.String: 'VARCHAR', pl.Int64: 'BIGINT', pl.Boolean: 'BOOLEAN'}
+
+_duckdb_connection = None
+
+
+def _as_list(by: typing.Union[str, typing.List[str]]) -> typing.List[str]:
+    """Return group keys as a list."""
+    return [by] if isinstance(by, str) else list(by)
+
+
+def object_labels(df: pd.DataFrame, cols: typing.List[str]) -> pd.DataFrame:
+    """
+    Turn categorical group labels into plain objects, as prepare_grouped_data does.
+
+    Used on every grouped result converted to pandas, by the backends here
+    and by `uk_corporate_analysis.collect_plan`.
+    """
+    for col in cols:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+# ----------------------------------- Polars -----------------------------------
+
+def polars_scan(logger: logging.Logger,
+                path: pathlib.Path,
+                cols: typing.List[str],
+                partition_by: typing.Optional[typing.List[str]] = None,
+                cast: typing.Optional[typing.Dict[str, pl.DataType]] = None,
+                fill_null: typing.Optional[typing.Dict[str, typing.Any]] = None,
+                cache: bool = False
+                ) -> pl.LazyFrame:
+    """
+    Lazily scan the columns of a dataset.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    path : pathlib.Path
+        Parquet file or partitioned dataset directory.
+    cols : list of str
+        Columns to read.
+    partition_by : list of str, optional
+        Partition keys of the dataset.
+    cast : dict, optional
+        Types to cast columns to, e.g. Enums.
+    fill_null : dict, optional
+        Value replacing the nulls of each column.
+    cache : bool, optional
+        Read through the Arrow IPC cache, see `arrow_cache`.
+
+    Returns
+    -------
+    pl.LazyFrame
+        Lazy frame over the dataset.
+    """
+    if cache:
+        lf = layout.read_dataset(logger, path, cols=cols, partition_by=partition_by,
+                                 cast=cast, cache=True).lazy()
+    else:
+        lf = layout.scan_dataset(path, partition_by).select(cols)
+        if cast:
+            lf = lf.cast({col: dtype for col, dtype in cast.items() if col in cols})
+    return lf.with_columns([pl.col(col).fill_null(pl.lit(value))
+                            for col, value in (fill_null or {}).items()])
+
+
+def polars_split(lf: pl.LazyFrame,
+                 col: str,
+                 values: typing.List[str]
+                 ) -> typing.Tuple[pl.LazyFrame, pl.LazyFrame]:
+    """Split a frame into the rows whose `col` is in `values` and the others, nulls included."""
+    matches = pl.col(col).cast(pl.String).is_in(values).fill_null(False)
+    return lf.filter(matches), lf.filter(~matches)
+
+
+def polars_date(schema: pl.Schema, col: str) -> pl.Expr:
+    """Return a date column as Date, parsing '%Y-%m-%d' strings when it was not typed at ingest."""
+    if schema[col] == pl.String:
+        return pl.col(col).str.to_date('%Y-%m-%d', strict=False)
+    return pl.col(col).cast(pl.Date)
+
+
+def polars_add_city(lf: pl.LazyFrame,
+                    english_countries: typing.List[str],
+                    address_col: str = 'office_address'
+                    ) -> pl.LazyFrame:
+    """
+    Add the 'city' of office addresses, as `wrangle.process_address`.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        Frame holding the addresses.
+    english_countries : list of str
+        Cities replaced by the country part of the address, as
+        `wrangle.process_country`.
+    address_col : str, optional
+        Column of the addresses (default is 'office_address').
+
+    Returns
+    -------
+    pl.LazyFrame
+        The frame with 'city', see `wrangle.with_city`.
+    """
+    city = pl.col('city')
+    return wrangle.with_city(lf, address_col)\
+        .with_columns(pl.when(city.is_in(english_countries))
+                      .then(wrangle.country_expr(pl.col(address_col)))
+                      .otherwise(city).alias('city'))
+
+
+def polars_years_bracket(days: pl.Expr) -> pl.Expr:
+    """
+    Bin days active into `wrangle.YEARS_BRACKET_LABELS`, as `pd.cut`.
+
+    Bins are right-closed, days outside of them (0 or less) and nulls give
+    null. The result is an Enum ordered as the labels, like the categorical
+    of `pd.cut`.
+    """
+    bins, labels = wrangle.YEARS_BRACKET_BINS, wrangle.YEARS_BRACKET_LABELS
+    bracket = pl.when(days.is_null() | (days <= bins[0])).then(None)
+    for upper, label in zip(bins[1:], labels):
+        bracket = bracket.when(days <= upper).then(pl.lit(label))
+    return bracket.cast(pl.Enum(labels))
+
+
+def polars_process_companies(logger: logging.Logger,
+                             lf: pl.LazyFrame,
+                             english_countries: typing.List[str]
+                             ) -> pl.LazyFrame:
+    """
+    Add 'Year', 'city', 'num_days_active' and 'Years_bracket' to companies.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    lf : pl.LazyFrame
+        Company data.
+    english_countries : list of str
+        Values of 'city' replaced by the country part of the address.
+
+    Returns
+    -------
+    pl.LazyFrame
+        Processed companies, as `uk_corporate_analysis.process_companies_data`.
+
+    Notes
+    -----
+    Every column is a native expression, nothing calls back into Python, so
+    the frame stays lazy and runs multithreaded (and streaming) in Polars.
+    """
+    schema = lf.collect_schema()
+    incorporation_date = polars_date(schema, 'incorporation_date')
+    days = pl.col('num_days_active')
+    lf = lf.with_columns(
+        incorporation_date.dt.year().alias('Year'),
+        (polars_date(schema, 'date_of_cessation') - incorporation_date)
+        .dt.total_days().abs().alias('num_days_active'))
+    return polars_add_city(lf, english_countries)\
+        .with_columns(polars_years_bracket(days).alias('Years_bracket'))\
+        .select(*schema.names(), 'Year', 'city', 'num_days_active', 'Years_bracket')
+
+
+def polars_process_officers_owners(lf: pl.LazyFrame,
+                                   world_countries: typing.Dict[str, str],
+                                   english_countries: typing.List[str]
+                                   ) -> typing.Tuple[pl.LazyFrame, pl.LazyFrame]:
+    """
+    Normalize the residence and nationality of officers and owners.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        Officer and owner data.
+    world_countries : dict
+        Mapping of lower-case nationalities to countries.
+    english_countries : list of str
+        Residences replaced by 'United Kingdom'.
+
+    Returns
+    -------
+    tuple
+        Processed data and the report of the unmapped nationalities, both
+        lazy, as `uk_corporate_analysis.process_officers_owners_data`.
+
+    Notes
+    -----
+    Nationalities are normalized over their distinct values and joined
+    back, as `uk_corporate_analysis.normalize_nationalities`. The report is
+    taken from the same lookup, which collected together is computed once.
+    """
+    residence = pl.col('country_of_residence').cast(pl.String)
+    nationality = pl.col('nationality').cast(pl.String)
+    # Normalized once per distinct nationality and joined back
+    lookup = lf.group_by(nationality.alias('nationality_raw'), maintain_order=True)\
+        .agg(pl.len().cast(pl.Int64).alias('rows'))\
+        .with_columns(pl.col('nationality_raw')
+                      .str.extract(f'^([^{NATIONALITY_SEPARATORS}]*)', 1)
+                      .str.strip_chars().str.to_lowercase().alias('key'))\
+        .with_columns(pl.col('key')
+                      .replace_strict(world_countries, default=None, return_dtype=pl.String)
+                      .alias('nationality'))
+    unmapped = lookup\
+        .filter(pl.col('nationality_raw').is_not_null() & pl.col('nationality').is_null())\
+        .select(pl.col('nationality_raw').alias('nationality'), 'key', 'rows')\
+        .sort('rows', descending=True, maintain_order=True)
+    processed = lf\
+        .with_columns(
+            pl.when(residence.is_in(english_countries))
+            .then(pl.lit('United Kingdom')).otherwise(residence)
+            .alias('country_of_residence'),
+            nationality.alias('nationality_raw'))\
+        .drop('nationality')\
+        .join(lookup.select('nationality_raw', 'nationality'), on='nationality_raw', how='left')\
+        .drop('nationality_raw')
+    return processed, unmapped
+
+
+def polars_group_count(lf: pl.LazyFrame,
+                       by: typing.Union[str, typing.List[str]],
+                       where: typing.Optional[str] = None,
+                       top_n: typing.Optional[int] = None
+                       ) -> pd.DataFrame:
+    """
+    Count rows per group with Polars.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        Frame to group.
+    by : str or list of str
+        Group keys. Rows with a null key are dropped.
+    where : str, optional
+        Row filter, see the module docstring.
+    top_n : int, optional
+        Number of largest groups to keep.
+
+    Returns
+    -------
+    pd.DataFrame
+        The keys and 'size', sorted by descending size, ties by key.
+    """
+    return object_labels(_polars_group_query(lf, by, where, top_n).collect().to_pandas(),
+                          _as_list(by))
+
+
+def _polars_group_query(lf: pl.LazyFrame,
+                        by: typing.Union[str, typing.List[str]],
+                        where: typing.Optional[str] = None,
+                        top_n: typing.Optional[int] = None
+                        ) -> pl.LazyFrame:
+    """Return the lazy query of `polars_group_count`."""
+    by = _as_list(by)
+    if where:
+        lf = lf.filter(pl.sql_expr(where))
+    grouped = lf.drop_nulls(by).group_by(by)\
+        .agg(pl.len().cast(pl.Int64).alias('size'))\
+        .sort(['size', *by], descending=[True] + [False] * len(by))
+    return grouped.head(top_n) if top_n else grouped
+
+
+def polars_grouping_queries(lf: pl.LazyFrame,
+                            specs: typing.Dict[str, typing.Dict[str, typing.Any]]
+                            ) -> typing.Dict[str, pl.LazyFrame]:
+    """Return the lazy queries of `polars_grouping_sets`, keyed by name and not collected."""
+    return {name: _polars_group_query(lf, **spec) for name, spec in specs.items()}
+
+
+def polars_label_top(lf: pl.LazyFrame,
+                     col: str,
+                     top_n: int = 10
+                     ) -> pl.LazyFrame:
+    """
+    Label all but the largest groups as 'Other' and sum their sizes, with Polars.
+
+    Lazy equivalent of `uk_corporate_analysis.top_n_other`, ties kept
+    as with `keep='first'`.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        Group counts with `col` and 'size'.
+    col : str
+        Column holding the group labels.
+    top_n : int, optional
+        Number of largest groups keeping their label, at least 1 (default
+        is 10). Ties are broken by the order of `lf`, as
+        `pd.DataFrame.nlargest` does.
+
+    Returns
+    -------
+    pl.LazyFrame
+        `col` and the summed 'size', sorted by `col`. A group already
+        labelled 'Other' is summed with the remaining groups.
+    """
+    if top_n < 1:
+        raise ValueError(f"top_n must be at least 1, got {top_n!r}")
+    label = pl.col(col).cast(pl.String)
+    top = label.sort_by('size', descending=True, maintain_order=True).head(top_n).implode()
+    return lf.select(pl.when(label.is_in(top)).then(label).otherwise(pl.lit('Other')).alias(col),
+                     pl.col('size'))\
+        .group_by(col).agg(pl.col('size').sum())\
+        .sort(col)
+
+
+def polars_grouping_sets(lf: pl.LazyFrame,
+                         specs: typing.Dict[str, typing.Dict[str, typing.Any]]
+                         ) -> typing.Dict[str, pd.DataFrame]:
+    """
+    Compute several group counts of a frame in one scan with Polars.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        Frame to group.
+    specs : dict
+        Grouping specifications keyed by result name, each with 'by' and
+        optionally 'where' and 'top_n', see `polars_group_count`.
+
+    Returns
+    -------
+    dict
+        The results of `polars_group_count` keyed by name.
+
+    Notes
+    -----
+    The queries are collected together with `pl.collect_all`, which scans
+    and filters their common input once.
+    """
+    queries = polars_grouping_queries(lf, specs)
+    frames = pl.collect_all(list(queries.values()))
+    return {name: object_labels(frame.to_pandas(), _as_list(specs[name]['by']))
+            for name, frame in zip(queries, frames)}
+
+
+# ----------------------------------- DuckDB -----------------------------------
+
+def duckdb_connection() -> 'duckdb.DuckDBPyConnection':
+    """Return the in-memory DuckDB connection shared by the 'duckdb' backend."""
+    global _duckdb_connection
+    if duckdb is None:
+        raise ImportError("The 'duckdb' backend requires the duckdb package")
+    if _duckdb_connection is None:
+        _duckdb_connection = duckdb.connect()
+    return _duckdb_connection
+
+
+def _sql_literal(value: typing.Any) -> str:
+    """Format a Python value as a SQL literal."""
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (dt.date, dt.datetime)):
+        return f"DATE '{value:%Y-%m-%d}'"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+def _sql_list(values: typing.List[typing.Any]) -> str:
+    """Format values as a SQL list, e.g. for IN."""
+    return '(' + ', '.join(_sql_literal(value) for value in values) + ')'
+
+
+def duckdb_scan(logger: logging.Logger,
+                path: pathlib.Path,
+                cols: typing.List[str],
+                partition_by: typing.Optional[typing.List[str]] = None,
+                cast: typing.Optional[typing.Dict[str, pl.DataType]] = None,
+                fill_null: typing.Optional[typing.Dict[str, typing.Any]] = None,
+                cache: bool = False
+                ) -> 'duckdb.DuckDBPyRelation':
+    """
+    Query the columns of a dataset from its Parquet files with DuckDB.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    path : pathlib.Path
+        Parquet file or partitioned dataset directory.
+    cols : list of str
+        Columns to read.
+    partition_by : list of str, optional
+        Partition keys of the dataset, typed from `parquet_layout.HIVE_DTYPES`.
+    cast : dict, optional
+        Ignored, DuckDB reads Enum columns as strings.
+    fill_null : dict, optional
+        Value replacing the nulls of each column.
+    cache : bool, optional
+        Ignored, DuckDB reads the Parquet files directly.
+
+    Returns
+    -------
+    duckdb.DuckDBPyRelation
+        Lazy relation over the dataset.
+    """
+    con = duckdb_connection()
+    fill_null = fill_null or {}
+    if path.is_dir():
+        hive_types = {key: DUCKDB_HIVE_TYPES[layout.HIVE_DTYPES[key]]
+                      for key in partition_by or [] if key in layout.HIVE_DTYPES}
+        types = ', '.join(f"'{key}': {sql_type}" for key, sql_type in hive_types.items())
+        rel = con.sql(f"SELECT * FROM read_parquet({_sql_literal(str(path / '**' / '*.parquet'))}, "
+                      f"hive_partitioning = true"
+                      f"{f', hive_types = {{{types}}}' if types else ''})")
+    else:
+        rel = con.read_parquet(str(path))
+    select = [f'coalesce("{col}", {_sql_literal(fill_null[col])}) AS "{col}"'
+              if col in fill_null else f'"{col}"' for col in cols]
+    return rel.project(', '.join(select))
+
+
+def duckdb_split(rel: 'duckdb.DuckDBPyRelation',
+                 col: str,
+                 values: typing.List[str]
+                 ) -> typing.Tuple['duckdb.DuckDBPyRelation', 'duckdb.DuckDBPyRelation']:
+    """Split a relation into the rows whose `col` is in `values` and the others, nulls included."""
+    matches = f'coalesce("{col}" IN {_sql_list(values)}, FALSE)'
+    return rel.filter(matches), rel.filter(f'NOT {matches}')
+
+
+def _re2_pattern(pattern: str) -> str:
+    """Give the `\\w` of a Python pattern its Unicode meaning in RE2, where it is ASCII only."""
+    tokens, in_class = [], False
+    for token in re.findall(r'\\.|\[|\]|[^\\\[\]]+', pattern):
+        if token == '\\w':
+            token = r'\p{L}\p{N}_' if in_class else r'[\p{L}\p{N}_]'
+        elif token in ('[', ']'):
+            in_class = token == '['
+        tokens.append(token)
+    return ''.join(tokens)
+
+
+def _duckdb_extract(col: str, pattern: str) -> str:
+    """SQL of the first group of `pattern` in `col`, null when it does not match, as `re.search`."""
+    # A group of the patterns of wrangle never matches an empty string, '' is no match
+    return f"NULLIF(regexp_extract({col}, {_sql_literal(_re2_pattern(pattern))}, 1), '')"
+
+
+def duckdb_process_companies(logger: logging.Logger,
+                             rel: 'duckdb.DuckDBPyRelation',
+                             english_countries: typing.List[str]
+                             ) -> 'duckdb.DuckDBPyRelation':
+    """
+    Add 'Year', 'city', 'num_days_active' and 'Years_bracket' to companies.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    rel : duckdb.DuckDBPyRelation
+        Company data.
+    english_countries : list of str
+        Values of 'city' replaced by the country part of the address.
+
+    Returns
+    -------
+    duckdb.DuckDBPyRelation
+        Processed companies, as `uk_corporate_analysis.process_companies_data`.
+
+    Notes
+    -----
+    The address is parsed with native `regexp_extract` on the patterns of
+    `wrangle`, as `wrangle.with_city` and `wrangle.country_expr` do in
+    Polars, so no row calls back into Python.
+    """
+    bins, labels = wrangle.YEARS_BRACKET_BINS, wrangle.YEARS_BRACKET_LABELS
+    bracket = 'CASE WHEN num_days_active IS NULL OR num_days_active <= {} THEN NULL {} END'.format(
+        bins[0], ' '.join(f"WHEN num_days_active <= {upper} THEN '{label}'"
+                          for upper, label in zip(bins[1:-1], labels)) + f" ELSE '{labels[-1]}'")
+    city = _duckdb_extract('office_address', wrangle.CITY_PATTERN)
+    rel = rel.project(f'*, year(incorporation_date) AS "Year", '
+                      f"trim({city}, ' \t\n\r\f\v') AS city, "
+                      f'abs(date_diff(\'day\', incorporation_date, date_of_cessation)) AS num_days_active')
+    # A candidate holding a space and a digit is replaced by the fallback part when it matches
+    fallback = _duckdb_extract('office_address', wrangle.CITY_FALLBACK_PATTERN)
+    rel = rel.project(f"* REPLACE (CASE WHEN contains(city, ' ') AND regexp_matches(city, '\\d') "
+                      f"THEN coalesce({fallback}, city) ELSE city END AS city)")
+    country = _duckdb_extract('office_address', wrangle.COUNTRY_PATTERN)
+    return rel.project(f'* REPLACE (CASE WHEN city IN {_sql_list(english_countries)} '
+                       f'THEN {country} ELSE city END AS city), '
+                       f'{bracket} AS "Years_bracket"')
+
+
+def duckdb_process_officers_owners(rel: 'duckdb.DuckDBPyRelation',
+                                   world_countries: typing.Dict[str, str],
+                                   english_countries: typing.List[str]
+                                   ) -> typing.Tuple['duckdb.DuckDBPyRelation',
+                                                     'duckdb.DuckDBPyRelation']:
+    """
+    Normalize the residence and nationality of officers and owners.
+
+    Parameters
+    ----------
+    rel : duckdb.DuckDBPyRelation
+        Officer and owner data.
+    world_countries : dict
+        Mapping of lower-case nationalities to countries.
+    english_countries : list of str
+        Residences replaced by 'United Kingdom'.
+
+    Returns
+    -------
+    tuple
+        Processed data and the report of the unmapped nationalities, both
+        relations, as `uk_corporate_analysis.process_officers_owners_data`.
+        Nationalities tied in the report are ordered by name.
+
+    Notes
+    -----
+    Nationalities are mapped with a left join on a lookup table instead of a
+    per-row dictionary lookup.
+    """
+    con = duckdb_connection()
+    lookup = con.from_df(pd.DataFrame({'nationality_key': list(world_countries),
+                                       'nationality_value': list(world_countries.values())}))
+    key = (f"lower(trim(regexp_extract(nationality, '^([^{NATIONALITY_SEPARATORS}]*)', 1), "
+           f"' \t\n\r\f\v'))")
+    rel = rel.project(f'*, {key} AS nationality_key')
+    unmapped = rel.aggregate('nationality, nationality_key, count(*) AS "rows"',
+                             'nationality, nationality_key')\
+        .join(lookup, 'nationality_key', how='left')\
+        .filter('nationality IS NOT NULL AND nationality_value IS NULL')\
+        .project('nationality, nationality_key AS "key", "rows"')\
+        .order('"rows" DESC, nationality')
+    processed = rel.join(lookup, 'nationality_key', how='left')\
+        .project(f"* EXCLUDE (nationality_key, nationality_value) REPLACE ("
+                 f"CASE WHEN country_of_residence IN {_sql_list(english_countries)} "
+                 f"THEN 'United Kingdom' ELSE country_of_residence END AS country_of_residence, "
+                 f"nationality_value AS nationality)")
+    return processed, unmapped
+
+
+def duckdb_group_count(rel: 'duckdb.DuckDBPyRelation',
+                       by: typing.Union[str, typing.List[str]],
+                       where: typing.Optional[str] = None,
+                       top_n: typing.Optional[int] = None
+                       ) -> pd.DataFrame:
+    """
+    Count rows per group with DuckDB.
+
+    Parameters
+    ----------
+    rel : duckdb.DuckDBPyRelation
+        Relation to group.
+    by : str or list of str
+        Group keys. Rows with a null key are dropped.
+    where : str, optional
+        Row filter, see the module docstring.
+    top_n : int, optional
+        Number of largest groups to keep.
+
+    Returns
+    -------
+    pd.DataFrame
+        The keys and 'size', sorted by descending size, ties by key.
+    """
+    by = _as_list(by)
+    keys = ', '.join(f'"{col}"' for col in by)
+    if where:
+        rel = rel.filter(where)
+    grouped = rel.filter(' AND '.join(f'"{col}" IS NOT NULL' for col in by))\
+        .aggregate(f'{keys}, count(*) AS size', keys)\
+        .order(f'size DESC, {keys}')
+    if top_n:
+        grouped = grouped.limit(top_n)
+    return object_labels(grouped.df(), by)
+
+
+def duckdb_grouping_sets(rel: 'duckdb.DuckDBPyRelation',
+                         specs: typing.Dict[str, typing.Dict[str, typing.Any]]
+                         ) -> typing.Dict[str, pd.DataFrame]:
+    """
+    Compute several group counts of a relation in one GROUPING SETS query.
+
+    Parameters
+    ----------
+    rel : duckdb.DuckDBPyRelation
+        Relation to group.
+    specs : dict
+        Grouping specifications keyed by result name, each with 'by' and
+        optionally 'where' and 'top_n', see `duckdb_group_count`.
+
+    Returns
+    -------
+    dict
+        The results of `duckdb_group_count` keyed by name.
+
+    Notes
+    -----
+    Every distinct filter becomes a boolean flag column that is grouped
+    with the keys of the specifications using it, so the relation is
+    scanned once. `GROUPING()` identifies the grouping set of each result
+    row.
+    """
+    wheres = list(dict.fromkeys(spec['where'] for spec in specs.values() if spec.get('where')))
+    flags = {where: f'__where_{i}' for i, where in enumerate(wheres)}
+    sets = {name: ([flags[spec['where']]] if spec.get('where') else []) + _as_list(spec['by'])
+            for name, spec in specs.items()}
+    columns = list(dict.fromkeys(col for cols in sets.values() for col in cols))
+    grouping_sets = list(dict.fromkeys(tuple(cols) for cols in sets.values()))
+
+    quoted = ', '.join(f'"{col}"' for col in columns)
+    if flags:
+        rel = rel.project('*, ' + ', '.join(f'coalesce(({where}), FALSE) AS "{flag}"'
+                                           for where, flag in flags.items()))
+    grouped = rel.aggregate(
+        f'{quoted}, count(*) AS size, GROUPING({quoted}) AS grouping_id',
+        'GROUPING SETS (' + ', '.join('(' + ', '.join(f'"{col}"' for col in cols) + ')'
+                                      for cols in grouping_sets) + ')').df()
+
+    results = {}
+    for name, spec in specs.items():
+        by = _as_list(spec['by'])
+        # GROUPING() sets the bit of every column outside the set, the first column highest
+        grouping_id = sum(1 << (len(columns) - 1 - i)
+                          for i, col in enumerate(columns) if col not in sets[name])
+        rows = grouped[grouped['grouping_id'] == grouping_id]
+        if spec.get('where'):
+            rows = rows[rows[flags[spec['where']]].astype(bool)]
+        rows = rows.dropna(subset=by)[by + ['size']]\
+            .sort_values(by).sort_values('size', ascending=False, kind='stable')\
+            .reset_index(drop=True)
+        if spec.get('top_n'):
+            rows = rows.head(spec['top_n'])
+        results[name] = object_labels(rows, by)
+    return results
+
+
+POLARS_BACKEND = {
+    'scan': polars_scan,
+    'split': polars_split,
+    'process_companies': polars_process_companies,
+    'process_officers_owners': polars_process_officers_owners,
+    'group_count': polars_group_count,
+    'grouping_sets': polars_grouping_sets,
+    'collect': lambda lf: lf.collect().to_pandas(),
+}
+DUCKDB_BACKEND = {
+    'scan': duckdb_scan,
+    'split': duckdb_split,
+    'process_companies': duckdb_process_companies,
+    'process_officers_owners': duckdb_process_officers_owners,
+    'group_count': duckdb_group_count,
+    'grouping_sets': duckdb_grouping_sets,
+    'collect': lambda rel: rel.df(),
+}
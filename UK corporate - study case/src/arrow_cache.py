@@ -0,0 +1,177 @@
+"""
+Arrow IPC Cache for Parquet Datasets.
+
+Reading the Parquet files decompresses every page on each run. This module
+keeps an uncompressed Arrow IPC (Feather v2) copy of a dataset next to its
+Parquet source (`<source>.arrow`) and opens it through a memory map, so
+repeated analysis runs and notebook sessions map the columns straight from
+the page cache instead of decompressing them again.
+
+Each cache file stores a fingerprint of its source (size and modification
+time of every Parquet file) and of the read that produced it (columns and
+types) in its schema metadata. A cache whose fingerprint no longer matches
+is ignored and rewritten, so a new snapshot written by `data_pipeline`
+invalidates it automatically.
+
+Strings are stored as Arrow string views, the layout Polars uses in memory,
+so the mapped columns are handed to Polars without converting them.
+
+Future Improvements:
+---------------------
+1. Keep one cache per column selection instead of rewriting the cache when
+   the selection changes.
+2. Cap the total size of the caches.
+"""
+import hashlib
+import logging
+import pathlib
+import typing
+
+import polars as pl
+import pyarrow as pa
+
+
+CACHE_SUFFIX = '.arrow'
+FINGERPRINT_KEY = b'source_fingerprint'
+
+
+def cache_path(source: pathlib.Path) -> pathlib.Path:
+    """Return the cache path of a Parquet file or partitioned dataset directory."""
+    return source.with_suffix(CACHE_SUFFIX)
+
+
+def source_fingerprint(source: pathlib.Path, key: str = '') -> str:
+    """
+    Fingerprint a Parquet file or partitioned dataset.
+
+    Parameters
+    ----------
+    source : pathlib.Path
+        Parquet file or partitioned dataset directory.
+    key : str, optional
+        Description of the read cached from the source, e.g. its columns.
+
+    Returns
+    -------
+    str
+        Digest of the path, size and modification time of every Parquet file
+        of the source, and of `key`.
+    """
+    files = sorted(source.rglob('*.parquet')) if source.is_dir() else [source]
+    digest = hashlib.sha1(key.encode())
+    for path in files:
+        stat = path.stat()
+        digest.update(f'{path.relative_to(source.parent)}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()
+
+
+def write_cache(df: pl.DataFrame, path: pathlib.Path, fingerprint: str) -> None:
+    """
+    Write a frame as an uncompressed Arrow IPC file.
+
+    Parameters
+    ----------
+    df : pl.DataFrame
+        Frame to cache.
+    path : pathlib.Path
+        Path of the cache file.
+    fingerprint : str
+        Fingerprint of the source, see `source_fingerprint`.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    The file is written to a temporary path and renamed, so readers never
+    map a partially written cache.
+    """
+    table = df.rechunk().to_arrow(compat_level=pl.CompatLevel.newest())
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           FINGERPRINT_KEY: fingerprint.encode()})
+    tmp = path.with_suffix(f'{CACHE_SUFFIX}.tmp')
+    with pa.OSFile(str(tmp), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    tmp.replace(path)
+
+
+def open_cache(path: pathlib.Path, fingerprint: str) -> typing.Optional[pa.Table]:
+    """
+    Memory-map a cache file if it matches a fingerprint.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path of the cache file.
+    fingerprint : str
+        Expected fingerprint, see `source_fingerprint`.
+
+    Returns
+    -------
+    pa.Table or None
+        The cached table, backed by the memory map, or None if the cache is
+        missing, stale or unreadable.
+    """
+    if not path.exists():
+        return None
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = reader.schema.metadata or {}
+    if metadata.get(FINGERPRINT_KEY) != fingerprint.encode():
+        return None
+    return reader.read_all()
+
+
+def cached_frame(logger: logging.Logger,
+                 source: pathlib.Path,
+                 load: typing.Callable[[], typing.Optional[pl.DataFrame]],
+                 key: str = ''
+                 ) -> typing.Optional[pl.DataFrame]:
+    """
+    Return the cached frame of a source, loading and caching it when needed.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    source : pathlib.Path
+        Parquet file or partitioned dataset directory the frame is read from.
+    load : callable
+        Reads the frame from `source` on a cache miss.
+    key : str, optional
+        Description of the read done by `load`, part of the fingerprint.
+
+    Returns
+    -------
+    pl.DataFrame or None
+        The frame, mapped from the cache, or None if `load` failed.
+
+    Notes
+    -----
+    A cache that cannot be written is logged and skipped, the loaded frame
+    is returned as is.
+    """
+    path = cache_path(source)
+    fingerprint = source_fingerprint(source, key)
+    table = open_cache(path, fingerprint)
+    if table is not None:
+        logger.info(f"Read {source.name} from {path.name}")
+        return pl.from_arrow(table)
+
+    df = load()
+    if df is None:
+        return None
+    try:
+        write_cache(df, path, fingerprint)
+        logger.info(f"Cached {source.name} to {path.name}")
+    except Exception as e:
+        logger.error(f"Failed to cache {source} to {path}: {e}")
+    return df
+
+
+def clear_cache(source: pathlib.Path) -> None:
+    """Remove the cache of a source, if any."""
+    cache_path(source).unlink(missing_ok=True)
@@ -0,0 +1,205 @@
+"""
+Micro-benchmarks for the UK Corporate pipeline.
+
+Each subcommand times one optimization against the code path it replaces on
+our data and prints the results.
+
+Usage:
+------
+    python benchmarks.py lookup ../data/companies.parquet --sample 10
+    python benchmarks.py backends --data-dir ../data --backends pandas polars duckdb
+    python benchmarks.py companies ../data/companies.parquet --rows 1000000
+    python benchmarks.py dates ../data/companies.parquet --rows 1000000
+    python benchmarks.py addresses ../data/companies.parquet --rows 5000000
+    python benchmarks.py groups --data-dir ../data
+    python benchmarks.py charts --results-dir ../data/results --workers 4
+    python benchmarks.py serialize --results-dir ../data/results
+"""
+import logging
+import datetime as dt
+import pathlib
+import argparse
+
+import polars as pl
+
+import parquet_layout
+
+
+def run_lookup(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """Time sorted-layout lookups of a few random keys against a full scan."""
+    values = pl.scan_parquet(args.path).select(parquet_layout.SORT_KEY)\
+        .collect().to_series().sample(args.sample, seed=0).to_list()
+    results = parquet_layout.benchmark_lookup(logger, args.path, values)
+    print(f"{args.sample} keys: full scan {results['full_scan']:.3f}s, "
+          f"lookup {results['lookup']:.3f}s ({results['speedup']:.0f}x)")
+
+
+def run_backends(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """Time the analysis on each execution backend and check their results agree."""
+    import uk_corporate_analysis
+
+    timings = uk_corporate_analysis.benchmark_backends(logger, args.data_dir, args.backends,
+                                                       args.arrow_cache)
+    for backend, result in timings.items():
+        print(f"{backend:<8} load {result['load']:.2f}s, wrangle {result['wrangle']:.2f}s, "
+              f"aggregate {result['aggregate']:.2f}s, total {result['total']:.2f}s"
+              + (f", differs on {', '.join(result['mismatches'])}" if result['mismatches'] else ''))
+
+
+def run_companies(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """Time process_companies_data in pandas against the vectorized Polars version."""
+    import uk_corporate_analysis
+
+    companies = pl.read_parquet(args.path, columns=['office_address', 'incorporation_date',
+                                                    'date_of_cessation'])
+    if args.rows:
+        companies = companies.sample(args.rows, with_replacement=len(companies) < args.rows, seed=0)
+    # Missing cessation dates are filled with today at load
+    companies = companies.with_columns(pl.col('date_of_cessation').fill_null(dt.date.today()))
+    if args.string_dates:
+        # The row-wise pandas path logs every missing date, keep complete rows
+        companies = companies.drop_nulls('incorporation_date')\
+            .with_columns(pl.col('incorporation_date', 'date_of_cessation').cast(pl.String))
+    results = uk_corporate_analysis.benchmark_process_companies(logger, companies)
+    print(f"{len(companies)} companies: pandas {results['pandas']:.3f}s, "
+          f"polars {results['polars']:.3f}s ({results['speedup']:.0f}x), "
+          f"{'identical' if results['identical'] else 'DIFFERENT'} outputs")
+
+
+def run_dates(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """Time the row date functions of wrangle against their column versions."""
+    import wrangle
+
+    dates = pl.read_parquet(args.path, columns=['incorporation_date', 'date_of_cessation'])
+    if args.rows:
+        dates = dates.sample(args.rows, with_replacement=len(dates) < args.rows, seed=0)
+    # Missing cessation dates are filled with today at load, the row functions
+    # log every missing date, keep complete rows
+    dates = dates.drop_nulls('incorporation_date')\
+        .with_columns(pl.col('date_of_cessation').fill_null(dt.date.today()))\
+        .to_pandas()
+    if args.mixed:
+        # Every other date as a string, as in raw or partially typed data
+        for col in dates.columns:
+            strings = dates[col].dt.strftime('%Y-%m-%d')
+            dates[col] = dates[col].astype(object)
+            dates.loc[::2, col] = strings[::2]
+    results = wrangle.benchmark_dates(logger, dates)
+    print(f"{len(dates)} companies: rows {results['rows']:.3f}s, "
+          f"columns {results['columns']:.3f}s ({results['speedup']:.0f}x), "
+          f"{'identical' if results['identical'] else 'DIFFERENT'} outputs")
+
+
+def run_addresses(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """Time the row address functions of wrangle against their column versions."""
+    import wrangle
+
+    addresses = pl.read_parquet(args.path, columns=['office_address'])
+    if args.rows:
+        addresses = addresses.sample(args.rows, with_replacement=len(addresses) < args.rows, seed=0)
+    # process_address logs every address without a city candidate
+    logger.setLevel(logging.CRITICAL)
+    results = wrangle.benchmark_addresses(logger, addresses.to_series().to_pandas())
+    print(f"{len(addresses)} addresses: rows {results['rows']:.3f}s, "
+          f"columns {results['columns']:.3f}s ({results['speedup']:.0f}x), "
+          f"{'identical' if results['identical'] else 'DIFFERENT'} outputs")
+
+
+def run_groups(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """Time the officers group counts one by one against one grouping sets pass."""
+    import uk_corporate_analysis
+
+    results = uk_corporate_analysis.benchmark_grouping_sets(logger, args.data_dir)
+    print(f"separate {results['separate']:.3f}s, grouping sets {results['grouping_sets']:.3f}s "
+          f"({results['speedup']:.1f}x), one groupby {results['one_scan']:.3f}s, "
+          f"{'identical' if results['identical'] else 'DIFFERENT'} outputs")
+
+
+def run_charts(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """Time the charts rendered one by one against the process pool, per chart."""
+    import time
+    import uk_corporate_analysis
+    import chart_render
+
+    results = uk_corporate_analysis.load_results(logger, args.results_dir)
+    # Render once untimed, or the first run alone pays the import of Plotly
+    chart_render.render_charts(results, 1)
+    for workers in (1, args.workers):
+        start = time.perf_counter()
+        _, timings = chart_render.render_charts(results, workers)
+        print(f"{workers} process(es): {time.perf_counter() - start:.3f}s")
+    print(timings.to_string(index=False, float_format='{:.3f}'.format))
+
+
+def run_serialize(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """Time Plotly's JSON serialization of the charts against the orjson serializer."""
+    import uk_corporate_analysis
+    import chart_render
+
+    results = uk_corporate_analysis.load_results(logger, args.results_dir)
+    timings = chart_render.benchmark_serializers(results, repeats=args.repeats)
+    print(timings.to_string(index=False, float_format='{:.4f}'.format))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    lookup = subparsers.add_parser('lookup', help='Sorted-layout lookup vs full scan')
+    lookup.add_argument('path', type=pathlib.Path, help='Sorted parquet file')
+    lookup.add_argument('--sample', type=int, default=10, help='Number of keys to look up')
+    lookup.set_defaults(func=run_lookup)
+
+    backends = subparsers.add_parser('backends', help='pandas vs Polars vs DuckDB analysis')
+    backends.add_argument('--data-dir', type=pathlib.Path,
+                          default=pathlib.Path(__file__).resolve().parent.parent / 'data',
+                          help='Directory of the parquet files')
+    backends.add_argument('--backends', nargs='+', choices=['pandas', 'polars', 'duckdb'],
+                          help='Backends to time, the first is the reference (default is all)')
+    backends.add_argument('--arrow-cache', action='store_true',
+                          help='Read the data through the memory-mapped Arrow IPC cache')
+    backends.set_defaults(func=run_backends)
+
+    companies = subparsers.add_parser('companies', help='process_companies_data, pandas vs Polars')
+    companies.add_argument('path', type=pathlib.Path, help='companies.parquet')
+    companies.add_argument('--rows', type=int, help='Rows sampled from the file (default is all)')
+    companies.add_argument('--string-dates', action='store_true',
+                           help='Pass dates as strings, as before they were typed at ingest')
+    companies.set_defaults(func=run_companies)
+
+    dates = subparsers.add_parser('dates', help='Row vs column date functions of wrangle')
+    dates.add_argument('path', type=pathlib.Path, help='companies.parquet')
+    dates.add_argument('--rows', type=int, help='Rows sampled from the file (default is all)')
+    dates.add_argument('--mixed', action='store_true',
+                       help='Mix string and datetime dates in each column')
+    dates.set_defaults(func=run_dates)
+
+    addresses = subparsers.add_parser('addresses', help='Row vs column address parsing of wrangle')
+    addresses.add_argument('path', type=pathlib.Path, help='companies.parquet')
+    addresses.add_argument('--rows', type=int, default=5_000_000,
+                           help='Rows sampled from the file (default is 5M)')
+    addresses.set_defaults(func=run_addresses)
+
+    groups = subparsers.add_parser('groups', help='Separate group counts vs grouping sets')
+    groups.add_argument('--data-dir', type=pathlib.Path,
+                        default=pathlib.Path(__file__).resolve().parent.parent / 'data',
+                        help='Directory of the parquet files')
+    groups.set_defaults(func=run_groups)
+
+    charts = subparsers.add_parser('charts', help='Serial vs parallel chart rendering')
+    charts.add_argument('--results-dir', type=pathlib.Path,
+                        default=pathlib.Path(__file__).resolve().parent.parent / 'data' / 'results',
+                        help='Directory of the aggregates saved by the analyze stage')
+    charts.add_argument('--workers', type=int, default=4, help='Number of render processes')
+    charts.set_defaults(func=run_charts)
+
+    serialize = subparsers.add_parser('serialize', help='Plotly vs orjson chart serialization')
+    serialize.add_argument('--results-dir', type=pathlib.Path,
+                           default=pathlib.Path(__file__).resolve().parent.parent / 'data' / 'results',
+                           help='Directory of the aggregates saved by the analyze stage')
+    serialize.add_argument('--repeats', type=int, default=5, help='Timed repetitions per chart')
+    serialize.set_defaults(func=run_serialize)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    args.func(args, logging.getLogger('benchmarks'))
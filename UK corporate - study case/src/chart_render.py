@@ -0,0 +1,317 @@
+"""
+Chart Rendering Module for the UK Corporate Dashboard.
+
+The render stage builds about a dozen Plotly figures from the aggregates of
+`uk_corporate_analysis.analyze` and serializes each to an HTML snippet. Most
+of the time goes to Plotly validating the figures and encoding them as JSON,
+one chart after the other, although the charts are independent.
+
+This module describes every chart as data in `CHARTS` (the `data_visualize`
+function, the aggregates it is drawn from and its arguments), so the charts
+can be built and serialized in parallel by a process pool:
+
+- each worker receives only the columns its chart draws, as small pandas
+  DataFrames, never the whole results,
+- the snippets are returned in the order of `CHARTS` whatever the order the
+  workers finish in, so the page is identical to a serial render,
+- the time spent building and serializing every chart is measured in the
+  worker and returned with the snippets.
+
+Charts are serialized either as HTML snippets embedding the figure, or as
+the figure JSON compressed with gzip (`FORMATS`), the payloads of the lazy
+dashboard that fetches each chart when it scrolls into view. Either is
+written by Plotly, or by the orjson serializer of `data_visualize` when
+serializer options are given, see `benchmark_serializers`.
+
+Future Improvements:
+---------------------
+1. Keep a warm pool across renders, worker start-up includes importing Plotly.
+2. Skip the charts whose aggregates did not change since the last render.
+"""
+import os
+import gzip
+import time
+import typing
+import concurrent.futures
+
+import pandas as pd
+
+
+# Charts keyed by placeholder of the dashboard templates. 'frames' is one
+# aggregate name, or a list of them for the toggleable charts, optionally as
+# (name, filter) with a `pd.DataFrame.query` filter. 'args' and 'kwargs'
+# follow the frames in the call to the `data_visualize` function 'chart'.
+CHARTS = {
+    'cities_viz': {
+        'chart': 'create_toggleable_pie_charts',
+        'frames': ['active_city', 'not_active_city'],
+        'args': (['city', 'city'], ['size', 'size'],
+                 ['Active Companies by City', 'Not Active Companies by City'])},
+    'company_type_viz': {
+        'chart': 'create_toggleable_bar_charts',
+        'frames': ['active_company', 'not_active_company'],
+        'args': (['company_type', 'company_type'], ['size', 'size'],
+                 ['Active Companies by Type', 'Not Active Companies by Type']),
+        'kwargs': {'width': 1000, 'height': 1200}},
+    'years_viz': {
+        'chart': 'create_toggleable_pie_charts',
+        'frames': ['active_years', 'not_active_years'],
+        'args': (['Years_bracket', 'Years_bracket'], ['size', 'size'],
+                 ['Active Companies by Years Bracket', 'Not Active Companies by Years Bracket'])},
+    'officer_roles_viz': {
+        'chart': 'create_bar_chart',
+        'frames': 'officer_roles_df',
+        'args': ('officer_role', 'size', 'Officer Roles Overview')},
+    'occupation_viz': {
+        'chart': 'create_pie_chart',
+        'frames': 'occupations_df',
+        'args': ('occupation', 'size', 'Occupation Overview')},
+    'owners_viz': {
+        'chart': 'create_toggleable_pie_charts',
+        'frames': ['owners_df', 'owners_officer_roles'],
+        'args': (['is_owner', 'officer_role'], ['size', 'size'],
+                 ['Is Owner', 'Owner Ofiicer Role'])},
+    'nationality_viz': {
+        'chart': 'create_toggleable_bar_charts',
+        'frames': ['nationality_df', 'nationality_excl_uk'],
+        'args': (['nationality', 'nationality'], ['size', 'size'],
+                 ['Nationality Overview', 'Nationality Overview (excl UK)'])},
+    'residence_nationality_viz': {
+        'chart': 'create_toggleable_bar_charts',
+        'frames': ['uk_residence_df', 'uk_nationality'],
+        'args': (['nationality', 'country_of_residence'], ['size', 'size'],
+                 ['UK Residence (excl British)', 'UK Nationality (not UK resident)'])},
+    'owners_and_non_owners_viz': {
+        'chart': 'create_toggleable_pie_charts',
+        'frames': ['owners_nationality', 'owners_nationality_excl_uk',
+                   'non_owners_nationality', 'non_owners_nationality_excl_uk'],
+        'args': (['nationality'] * 4, ['size'] * 4,
+                 ['Owners Nationality', 'Owners Nationality (Excl UK)',
+                  'Non Owners Nationality', 'Non Owners Nationality (Excl UK)'])},
+    'uk_owners_and_residents_ocuppation_viz': {
+        'chart': 'create_pie_chart',
+        'frames': 'uk_owners_and_residents_ocuppation',
+        'args': ('occupation', 'size', 'Occupation for UK nationals who reside in the UK')},
+    'filings_per_year_html': {
+        'chart': 'create_line_chart',
+        'frames': 'filings_by_type',
+        'args': ('year', 'filings', 'company_type', 'Filings per Year by Company Type')},
+    'filings_per_status_html': {
+        'chart': 'create_line_chart',
+        'frames': 'filings_by_status',
+        'args': ('year', 'filings', 'company_status', 'Filings per Year by Company Status')},
+    'filing_recency_html': {
+        'chart': 'create_toggleable_bar_charts',
+        'frames': [('filing_recency', "activity == 'Active'"),
+                   ('filing_recency', "activity == 'Not active'")],
+        'args': (['recency_bracket', 'recency_bracket'], ['size', 'size'],
+                 ['Active Companies by Time Since Last Filing',
+                  'Not Active Companies by Time Since Last Filing'])},
+    'filing_cadence_html': {
+        'chart': 'create_toggleable_bar_charts',
+        'frames': ['filing_cadence_by_type'],
+        'args': (['company_type'], ['median_cadence_days'],
+                 ['Median Days Between Filings by Company Type'])},
+}
+# Default number of render processes, capped by the number of charts
+RENDER_WORKERS = os.cpu_count() or 1
+# Serializations of a chart: an HTML snippet, or gzip-compressed figure JSON
+FORMATS = ('html', 'json.gz')
+# Plotly.js of the page, the version bundled with the installed plotly package
+PLOTLY_CDN = 'https://cdn.plot.ly/plotly-{version}.min.js'
+
+
+def _frame_names(spec: typing.Dict[str, typing.Any]) -> typing.List[str]:
+    """Return the names of the aggregates a chart is drawn from."""
+    frames = spec['frames'] if isinstance(spec['frames'], list) else [spec['frames']]
+    return [frame[0] if isinstance(frame, tuple) else frame for frame in frames]
+
+
+def chart_inputs(results: typing.Dict[str, pd.DataFrame],
+                 spec: typing.Dict[str, typing.Any]
+                 ) -> typing.Union[pd.DataFrame, typing.List[pd.DataFrame]]:
+    """
+    Select the data a chart draws from the aggregates.
+
+    Parameters
+    ----------
+    results : dict
+        Aggregate DataFrames keyed by name.
+    spec : dict
+        Chart specification, see `CHARTS`.
+
+    Returns
+    -------
+    pd.DataFrame or list of pd.DataFrame
+        The filtered aggregates, reduced to the columns named in the
+        arguments of the chart, in the form the chart function takes.
+    """
+    named = {value for arg in spec['args']
+             for value in (arg if isinstance(arg, list) else [arg]) if isinstance(value, str)}
+    frames = []
+    for frame in (spec['frames'] if isinstance(spec['frames'], list) else [spec['frames']]):
+        name, where = frame if isinstance(frame, tuple) else (frame, None)
+        df = results[name].query(where) if where else results[name]
+        frames.append(df[[col for col in df.columns if col in named]].reset_index(drop=True))
+    return frames if isinstance(spec['frames'], list) else frames[0]
+
+
+def build_chart(name: str,
+                spec: typing.Dict[str, typing.Any],
+                frames: typing.Union[pd.DataFrame, typing.List[pd.DataFrame]],
+                fmt: str = 'html',
+                serializer: typing.Optional[typing.Dict[str, typing.Any]] = None
+                ) -> typing.Tuple[str, typing.Union[str, bytes], float, float]:
+    """
+    Build one chart and serialize it to an HTML snippet, the work of a render process.
+
+    Parameters
+    ----------
+    name : str
+        Placeholder of the chart.
+    spec : dict
+        Chart specification, see `CHARTS`.
+    frames : pd.DataFrame or list of pd.DataFrame
+        Data of the chart, see `chart_inputs`.
+    fmt : str, optional
+        Serialization, one of `FORMATS` (default is 'html').
+    serializer : dict, optional
+        Options of `data_visualize.figure_to_json`, used instead of Plotly's
+        serialization when given, e.g. {'precision': 2}.
+
+    Returns
+    -------
+    tuple
+        The name, the snippet (str) or compressed JSON (bytes), and the
+        seconds spent building the figure and serializing it.
+    """
+    # Imported here, plotly is only needed by the render processes
+    import data_visualize as viz
+
+    start = time.perf_counter()
+    figure = getattr(viz, spec['chart'])(frames, *spec['args'], **spec.get('kwargs', {}))
+    built = time.perf_counter()
+    if fmt == 'html':
+        payload = figure.to_html(full_html=False, include_plotlyjs=False) if serializer is None \
+            else viz.figure_to_html(figure, **serializer)
+    else:
+        text = figure.to_json() if serializer is None else viz.figure_to_json(figure, **serializer)
+        # mtime=0, the payload only changes with the chart
+        payload = gzip.compress(text.encode(), compresslevel=9, mtime=0)
+    return name, payload, built - start, time.perf_counter() - built
+
+
+def plotly_js_url() -> str:
+    """
+    Return the CDN URL of the Plotly.js version the installed plotly package writes for.
+
+    The figures use features of that version, e.g. the typed arrays of
+    plotly 6 that the unversioned 'plotly-latest' (1.58.5) cannot decode.
+
+    Returns
+    -------
+    str
+        URL of the minified Plotly.js, see `PLOTLY_CDN`.
+    """
+    from plotly.offline import get_plotlyjs_version
+
+    return PLOTLY_CDN.format(version=get_plotlyjs_version())
+
+
+def render_charts(results: typing.Dict[str, pd.DataFrame],
+                  workers: int = RENDER_WORKERS,
+                  fmt: str = 'html',
+                  serializer: typing.Optional[typing.Dict[str, typing.Any]] = None
+                  ) -> typing.Tuple[typing.Dict[str, typing.Union[str, bytes]], pd.DataFrame]:
+    """
+    Build and serialize the charts of `CHARTS` whose aggregates exist, in parallel.
+
+    Parameters
+    ----------
+    results : dict
+        Aggregate DataFrames keyed by name.
+    workers : int, optional
+        Number of render processes (default is `RENDER_WORKERS`). With 1,
+        the charts are rendered one after the other in this process.
+    fmt : str, optional
+        Serialization of the charts, one of `FORMATS` (default is 'html').
+    serializer : dict, optional
+        Options of the orjson serializer, see `build_chart`. Plotly's
+        serialization when None (default).
+
+    Returns
+    -------
+    tuple
+        The payloads keyed by placeholder, in the order of `CHARTS`, and
+        the timings with one row per chart: 'chart', 'build' and 'serialize'
+        seconds, measured in the worker.
+    """
+    names = [name for name, spec in CHARTS.items()
+             if all(frame in results for frame in _frame_names(spec))]
+    specs = [CHARTS[name] for name in names]
+    inputs = [chart_inputs(results, spec) for spec in specs]
+    formats, serializers = [fmt] * len(names), [serializer] * len(names)
+    workers = min(workers, len(names))
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            # map returns in submission order, the page does not depend on scheduling
+            rendered = list(executor.map(build_chart, names, specs, inputs, formats, serializers))
+    else:
+        rendered = list(map(build_chart, names, specs, inputs, formats, serializers))
+    timings = pd.DataFrame([(name, build, serialize) for name, _, build, serialize in rendered],
+                           columns=['chart', 'build', 'serialize'])
+    return {name: payload for name, payload, _, _ in rendered}, timings
+
+
+def benchmark_serializers(results: typing.Dict[str, pd.DataFrame],
+                          serializers: typing.Optional[typing.Dict[str, typing.Dict[str, typing.Any]]] = None,
+                          repeats: int = 3
+                          ) -> pd.DataFrame:
+    """
+    Time Plotly's serialization of the charts against the orjson serializer.
+
+    Parameters
+    ----------
+    results : dict
+        Aggregate DataFrames keyed by name.
+    serializers : dict, optional
+        Options of `data_visualize.figure_to_json` keyed by label (default
+        compares orjson with typed arrays, and with lists of floats rounded
+        to 2 decimals).
+    repeats : int, optional
+        Number of timed repetitions, the fastest is kept (default is 3).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per chart and serializer ('plotly' is `Figure.to_json`) with
+        the best 'seconds', and the 'bytes' and 'gzip_bytes' of the JSON.
+        A 'total' row per serializer sums the charts.
+    """
+    # Imported here, plotly is only needed to render
+    import data_visualize as viz
+
+    serializers = serializers or {'orjson': {}, 'orjson lists 2dp': {'typed_arrays': False,
+                                                                     'precision': 2}}
+    encoders = {'plotly': lambda figure: figure.to_json(),
+                **{label: lambda figure, options=options: viz.figure_to_json(figure, **options)
+                   for label, options in serializers.items()}}
+    rows = []
+    for name, spec in CHARTS.items():
+        if not all(frame in results for frame in _frame_names(spec)):
+            continue
+        figure = getattr(viz, spec['chart'])(chart_inputs(results, spec), *spec['args'],
+                                            **spec.get('kwargs', {}))
+        for label, encode in encoders.items():
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                text = encode(figure)
+                timings.append(time.perf_counter() - start)
+            rows.append({'chart': name, 'serializer': label, 'seconds': min(timings),
+                         'bytes': len(text.encode()),
+                         'gzip_bytes': len(gzip.compress(text.encode(), mtime=0))})
+    timings = pd.DataFrame(rows, columns=['chart', 'serializer', 'seconds', 'bytes', 'gzip_bytes'])
+    totals = timings.groupby('serializer', sort=False, as_index=False)[['seconds', 'bytes', 'gzip_bytes']]\
+        .sum().assign(chart='total')
+    return pd.concat([timings, totals[timings.columns]], ignore_index=True)
@@ -0,0 +1,207 @@
+"""
+Command Line Interface for the UK Corporate pipeline.
+
+Each stage runs as its own subcommand, so stages can run in separate
+processes (or on separate machines) and communicate through files only:
+
+- ingest: convert the raw CSV files to parquet (`data_pipeline.run_pipeline`),
+- analyze: load, wrangle and aggregate the parquet files, saving the
+  aggregates as parquet (`uk_corporate_analysis.analyze`),
+- render: build the charts from the saved aggregates and write the HTML
+  dashboard (`uk_corporate_analysis.render`),
+- run: analyze and render in one process, without saving the aggregates,
+- explain: print the lazy query plan of the analysis, optionally timed
+  (`uk_corporate_analysis.analysis_plan`).
+
+Defaults and choices are taken from the stage modules, so the command line
+and the module settings cannot disagree. The modules are imported when the
+parser is built rather than at import time, so importing this module stays
+cheap.
+
+Usage:
+------
+    python cli.py ingest --data-dir ../data --workers 3 --profile balanced
+    python cli.py analyze --data-dir ../data --results-dir ../data/results --backend polars
+    python cli.py render --results-dir ../data/results --output ../../docs/dashboard.html
+    python cli.py explain --data-dir ../data --profile
+"""
+import os
+import sys
+import logging
+import typing
+import pathlib
+import argparse
+
+
+def run_ingest(args: argparse.Namespace, logger: logging.Logger) -> bool:
+    """Convert the raw CSV files in the data directory to parquet."""
+    import data_pipeline
+
+    return data_pipeline.run_pipeline(logger,
+                                      data_dir=args.data_dir,
+                                      datasets=args.datasets,
+                                      workers=args.workers,
+                                      chunk_rows=args.chunk_rows or None,
+                                      profile=args.profile,
+                                      streaming=not args.eager,
+                                      diff=not args.no_diff,
+                                      partition=not args.no_partition,
+                                      sort=not args.no_sort)
+
+
+def run_analyze(args: argparse.Namespace, logger: logging.Logger) -> bool:
+    """Compute the dashboard aggregates and save them to the results directory."""
+    import uk_corporate_analysis
+
+    uk_corporate_analysis.analyze(logger, args.data_dir, args.results_dir, args.arrow_cache,
+                                  args.backend, args.lazy_plan)
+    return True
+
+
+def serializer_options(args: argparse.Namespace) -> typing.Optional[dict]:
+    """Return the options of the orjson chart serializer, None for Plotly's."""
+    if not args.fast_json:
+        return None
+    return {'typed_arrays': not args.no_typed_arrays, 'precision': args.float_precision}
+
+
+def run_render(args: argparse.Namespace, logger: logging.Logger) -> bool:
+    """Write the HTML dashboard from the saved aggregates."""
+    import uk_corporate_analysis
+
+    uk_corporate_analysis.render(logger, results_dir=args.results_dir, html_path=args.output,
+                                 workers=args.render_workers, lazy=args.lazy,
+                                 serializer=serializer_options(args))
+    return True
+
+
+def run_all(args: argparse.Namespace, logger: logging.Logger) -> bool:
+    """Analyze and render in one process."""
+    import uk_corporate_analysis
+
+    results = uk_corporate_analysis.analyze(logger, args.data_dir, results_dir=None,
+                                            cache=args.arrow_cache, backend=args.backend,
+                                            lazy_plan=args.lazy_plan)
+    uk_corporate_analysis.render(logger, results=results, html_path=args.output,
+                                 workers=args.render_workers, lazy=args.lazy,
+                                 serializer=serializer_options(args))
+    return True
+
+
+def run_explain(args: argparse.Namespace, logger: logging.Logger) -> bool:
+    """Print the lazy query plan of the analysis and, with --profile, its timings."""
+    import uk_corporate_analysis
+
+    plan, _ = uk_corporate_analysis.analysis_plan(logger, args.data_dir, args.arrow_cache)
+    print(uk_corporate_analysis.explain_plan(plan, optimized=not args.unoptimized))
+    if args.profile:
+        print(uk_corporate_analysis.profile_plan(logger, plan).to_string(index=False))
+    return True
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser of the command line interface.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Parser with one subcommand per stage, defaulting to the settings of
+        `data_pipeline`, `parquet_benchmark` and `uk_corporate_analysis`.
+    """
+    import data_pipeline
+    import parquet_benchmark
+    import uk_corporate_analysis
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--log-level', default='WARNING',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    data_dir = argparse.ArgumentParser(add_help=False)
+    data_dir.add_argument('--data-dir', type=pathlib.Path,
+                          default=uk_corporate_analysis.DATA_PATH,
+                          help='Directory of the CSV and parquet files')
+    results_dir = argparse.ArgumentParser(add_help=False)
+    results_dir.add_argument('--results-dir', type=pathlib.Path,
+                             default=uk_corporate_analysis.RESULTS_PATH,
+                             help='Directory of the saved aggregates')
+    analysis = argparse.ArgumentParser(add_help=False)
+    analysis.add_argument('--arrow-cache', action='store_true',
+                          help='Read the data through the memory-mapped Arrow IPC cache')
+    analysis.add_argument('--backend', default=uk_corporate_analysis.BACKEND,
+                          choices=list(uk_corporate_analysis.BACKENDS),
+                          help='Execution backend of the analysis')
+    analysis.add_argument('--lazy-plan', action='store_true',
+                          help='Run the whole analysis as one lazy Polars plan, ignores --backend')
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--output', type=pathlib.Path, default=uk_corporate_analysis.HTML_PATH,
+                        help='Path of the HTML dashboard')
+    output.add_argument('--render-workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of processes building the charts')
+    output.add_argument('--lazy', action='store_true',
+                        help='Write each chart as precompressed JSON next to the page, '
+                             'loaded when scrolled into view')
+    output.add_argument('--fast-json', action='store_true',
+                        help='Serialize the charts with orjson instead of Plotly')
+    output.add_argument('--float-precision', type=int,
+                        help='Decimals of the chart floats with --fast-json (default is all)')
+    output.add_argument('--no-typed-arrays', action='store_true',
+                        help='Write the chart arrays as lists with --fast-json')
+
+    ingest = subparsers.add_parser('ingest', parents=[data_dir],
+                                   help='Convert the raw CSV files to parquet')
+    ingest.add_argument('--datasets', nargs='+', metavar='NAME',
+                        help='Datasets to convert (default is all)')
+    ingest.add_argument('--workers', type=int, default=data_pipeline.WORKERS,
+                        help='Number of files converted in parallel')
+    ingest.add_argument('--chunk-rows', type=int, default=data_pipeline.CHUNK_ROWS or 0,
+                        help='Rows per resumable chunk, 0 converts every file in one go')
+    ingest.add_argument('--profile', default=data_pipeline.PARQUET_PROFILE,
+                        choices=list(parquet_benchmark.DEFAULT_PROFILES),
+                        help='Parquet write profile')
+    ingest.add_argument('--eager', action='store_true',
+                        help='Convert with etl_tools in memory instead of streaming')
+    ingest.add_argument('--no-diff', action='store_true',
+                        help='Do not write change sets against the previous snapshot')
+    ingest.add_argument('--no-partition', action='store_true',
+                        help='Do not write the partitioned layouts')
+    ingest.add_argument('--no-sort', action='store_true',
+                        help='Do not sort the parquet files by company_number')
+    ingest.set_defaults(func=run_ingest)
+
+    analyze = subparsers.add_parser('analyze', parents=[data_dir, results_dir, analysis],
+                                    help='Compute and save the dashboard aggregates')
+    analyze.set_defaults(func=run_analyze)
+
+    render = subparsers.add_parser('render', parents=[results_dir, output],
+                                   help='Write the HTML dashboard from saved aggregates')
+    render.set_defaults(func=run_render)
+
+    run = subparsers.add_parser('run', parents=[data_dir, output, analysis],
+                                help='Analyze and render in one process')
+    run.set_defaults(func=run_all)
+
+    explain = subparsers.add_parser('explain', parents=[data_dir],
+                                    help='Print the lazy query plan of the analysis')
+    explain.add_argument('--arrow-cache', action='store_true',
+                         help='Read the data through the memory-mapped Arrow IPC cache')
+    explain.add_argument('--unoptimized', action='store_true',
+                         help='Print the plans as written, before the optimizations')
+    explain.add_argument('--profile', action='store_true',
+                         help='Also time each aggregate alone and all of them together')
+    explain.set_defaults(func=run_explain)
+    return parser
+
+
+def main(argv=None) -> int:
+    """Parse the arguments, run the selected stage and return the exit code."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=args.log_level,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(args.command)
+    return 0 if args.func(args, logger) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,768 @@
+"""
+Streaming Ingestion Module for UK Corporate Data.
+
+This module converts the semicolon-separated Companies House CSV exports into
+Parquet without materializing them in memory. The CSVs are scanned lazily
+with Polars and sunk straight to Parquet by the streaming engine, so memory
+use stays bounded by the engine's batch size rather than the file size.
+
+Every conversion reports the number of rows written, the throughput in rows
+per second and the peak resident memory observed while it ran.
+
+Date columns (`DATE_COLUMNS`) are parsed once at ingest with a vectorized
+parser and stored as native Parquet Dates. Unparseable values are counted and
+their rows quarantined to `<dataset>.quarantine.parquet`, with their line in
+the CSV, while the CSV is read for the conversion.
+
+Low-cardinality columns (`CATEGORICAL_COLUMNS`) are stored as dictionary-encoded
+Enums. Their categories are persisted in `<dataset>.categories.json` and only
+ever appended to, so codes stay stable across snapshots and readers can load
+the columns as Polars Enums or pandas Categoricals.
+
+The same scan that writes a Parquet file also profiles its columns (null and
+distinct counts, min/max, top values) into `<dataset>.profile.json`, see
+`data_profile`.
+
+`ingest_datasets` runs several conversions concurrently in a process pool and
+reports progress, timing and failures for each dataset separately.
+
+With `chunk_rows` set, a CSV is converted in chunks of that many rows, each
+written as its own part to `<dataset>.parts/`. The CSV is still read once, in
+batches that are cut into the chunks. A checkpoint manifest records
+the completed parts, so a conversion that failed or was killed resumes from
+the last completed chunk instead of starting over. The parts are consolidated
+into `<dataset>.parquet` at the end, or kept and read as a dataset.
+
+Future Improvements:
+---------------------
+1. Stream the quarantined rows to disk, they are held until their part is written.
+2. Cap the Polars thread pool of each worker when running in parallel.
+"""
+import json
+import time
+import shutil
+import logging
+import pathlib
+import threading
+import typing
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import polars as pl
+from polars.io.plugins import register_io_source
+
+import data_profile
+
+try:
+    import psutil
+except ImportError:  # Optional, only used for memory reporting
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+DEFAULT_SEPARATOR = ';'
+DEFAULT_COMPRESSION = 'zstd'
+DEFAULT_COMPRESSION_LEVEL = 22
+DATE_FORMAT = '%Y-%m-%d'
+
+# Date columns parsed and validated at ingest, per dataset
+DATE_COLUMNS = {
+    'companies': ['incorporation_date', 'date_of_cessation', 'last_accounts_period_end'],
+    'filings': ['date'],
+    'officers_and_owners': [],
+}
+# Identifier columns kept as strings, type inference would turn numeric
+# looking company numbers into integers and drop their leading zeros
+STRING_COLUMNS = ['company_number']
+# Low-cardinality columns stored as dictionary-encoded Enums, per dataset
+CATEGORICAL_COLUMNS = {
+    'companies': ['company_status', 'company_type', 'jurisdiction'],
+    'filings': [],
+    'officers_and_owners': ['officer_role', 'nationality', 'country_of_residence'],
+}
+# Values added to a category dictionary even if absent from the data, e.g.
+# fill values used downstream
+RESERVED_CATEGORIES = {
+    'jurisdiction': ['UK establishment'],
+}
+# Checkpoint manifest of a chunked conversion, kept in its parts directory
+MANIFEST_NAME = '_manifest.json'
+# Rows per batch read from a CSV by a chunked conversion
+BATCH_ROWS = 100_000
+
+
+class _PeakMemorySampler:
+    """
+    Sample the resident set size of the current process in a background thread.
+
+    Polars allocates outside of the Python heap, so `tracemalloc` cannot see
+    its buffers. The sampler polls the RSS instead and keeps the maximum.
+    Falls back to the process high-water mark when `psutil` is unavailable.
+    """
+
+    def __init__(self, interval: float = 0.1) -> None:
+        self.interval = interval
+        self.peak_bytes: typing.Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        process = psutil.Process()
+        while not self._stop.is_set():
+            rss = process.memory_info().rss
+            self.peak_bytes = max(self.peak_bytes or 0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> '_PeakMemorySampler':
+        if psutil is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if psutil is not None:
+            self._stop.set()
+            self._thread.join()
+        elif resource is not None:
+            # ru_maxrss is reported in kilobytes on Linux
+            self.peak_bytes = resource.getrusage(
+                resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def count_parquet_rows(path: pathlib.Path) -> int:
+    """
+    Count the rows of a Parquet file from its metadata.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path to the Parquet file.
+
+    Returns
+    -------
+    int
+        Number of rows stored in the file.
+    """
+    return pl.scan_parquet(path).select(pl.len()).collect().item()
+
+
+def quarantine_path(parquet_path: pathlib.Path) -> pathlib.Path:
+    """Return the path of the quarantine file written next to a Parquet file."""
+    return parquet_path.with_suffix('.quarantine.parquet')
+
+
+def _scan_raw(csv_path: pathlib.Path,
+              separator: str,
+              date_cols: typing.List[str]
+              ) -> typing.Tuple[pl.LazyFrame, typing.List[str]]:
+    """Scan a CSV with its date and identifier columns kept as strings, dropping unknown date columns."""
+    names = pl.scan_csv(csv_path, separator=separator, n_rows=1).collect_schema().names()
+    date_cols = [col for col in date_cols if col in names]
+    string_cols = [col for col in STRING_COLUMNS if col in names]
+    lf = pl.scan_csv(csv_path,
+                     separator=separator,
+                     try_parse_dates=True,
+                     schema_overrides={col: pl.String for col in date_cols + string_cols})
+    return lf, date_cols
+
+
+def _parse_date(col: str, date_format: str = DATE_FORMAT) -> pl.Expr:
+    """Parse a string column to Date, unparseable values become null."""
+    return pl.col(col).str.strip_chars().str.to_date(date_format, strict=False)
+
+
+def scan_source(csv_path: pathlib.Path,
+                separator: str = DEFAULT_SEPARATOR,
+                date_cols: typing.Optional[typing.List[str]] = None,
+                date_format: str = DATE_FORMAT
+                ) -> pl.LazyFrame:
+    """
+    Lazily scan a source CSV with typed columns.
+
+    Parameters
+    ----------
+    csv_path : pathlib.Path
+        Path to the source CSV file.
+    separator : str, optional
+        Field separator of the CSV file (default is ';').
+    date_cols : list of str, optional
+        Columns parsed to Date with `date_format`. Columns missing from the
+        file are ignored. Unparseable values become null.
+    date_format : str, optional
+        Format of the date columns (default is '%Y-%m-%d').
+
+    Returns
+    -------
+    pl.LazyFrame
+        Lazy frame over the typed source.
+    """
+    lf, date_cols = _scan_raw(csv_path, separator, date_cols or [])
+    return lf.with_columns([_parse_date(col, date_format) for col in date_cols])
+
+
+def parse_dates(batch: pl.DataFrame,
+                first_line: int,
+                date_cols: typing.List[str],
+                date_format: str = DATE_FORMAT
+                ) -> typing.Tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Parse the date columns of a batch of raw rows and pick the unparseable ones.
+
+    Parameters
+    ----------
+    batch : pl.DataFrame
+        Rows read with their date columns as strings.
+    first_line : int
+        Line of the first row of the batch in the CSV file, the header being
+        line 1.
+    date_cols : list of str
+        Date columns of the batch.
+    date_format : str, optional
+        Format of the date columns (default is '%Y-%m-%d').
+
+    Returns
+    -------
+    tuple of pl.DataFrame
+        The batch with its dates parsed, unparseable values as null, and its
+        quarantined rows: their `line`, the key column when present, the raw
+        date strings and one `<col>_invalid` flag per date column.
+
+    Notes
+    -----
+    Line numbers assume that no quoted value spans several lines.
+    """
+    invalid = [(pl.col(col).is_not_null() & _parse_date(col, date_format).is_null())
+               .alias(f'{col}_invalid') for col in date_cols]
+    keys = [col for col in ('company_number',) if col in batch.columns]
+    quarantined = batch.with_row_index('line', offset=first_line)\
+        .filter(pl.any_horizontal(invalid) if invalid else pl.lit(False))\
+        .select('line', *keys, *date_cols, *invalid)
+    return batch.with_columns([_parse_date(col, date_format) for col in date_cols]), quarantined
+
+
+def save_quarantine(quarantined: typing.List[pl.DataFrame],
+                    out_path: pathlib.Path
+                    ) -> typing.Dict[str, int]:
+    """
+    Write quarantined rows and count the unparseable values per date column.
+
+    Parameters
+    ----------
+    quarantined : list of pl.DataFrame
+        Quarantined rows, see `parse_dates`.
+    out_path : pathlib.Path
+        Path of the quarantine Parquet file. It is removed when no row is
+        quarantined.
+
+    Returns
+    -------
+    dict
+        Number of unparseable values per date column, only for columns with
+        at least one.
+    """
+    rows = pl.concat(quarantined) if quarantined else pl.DataFrame()
+    if rows.is_empty():
+        out_path.unlink(missing_ok=True)
+        return {}
+    rows.write_parquet(out_path)
+    counts = rows.select(pl.col('^.*_invalid$').sum()).row(0, named=True)
+    return {col.removesuffix('_invalid'): count for col, count in counts.items() if count}
+
+
+def category_dictionary_path(parquet_path: pathlib.Path) -> pathlib.Path:
+    """Return the path of the category dictionary written next to a Parquet file."""
+    return parquet_path.with_suffix('.categories.json')
+
+
+def load_category_dictionary(path: pathlib.Path) -> typing.Dict[str, typing.List[str]]:
+    """
+    Load a persisted category dictionary.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path of the JSON dictionary.
+
+    Returns
+    -------
+    dict
+        Ordered categories per column, empty if the file does not exist.
+    """
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def category_enums(path: pathlib.Path) -> typing.Dict[str, pl.Enum]:
+    """
+    Build the Polars Enum type of every column of a category dictionary.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path of the JSON dictionary.
+
+    Returns
+    -------
+    dict
+        Enum type per column, suitable for `pl.LazyFrame.cast`.
+    """
+    return {col: pl.Enum(categories)
+            for col, categories in load_category_dictionary(path).items()}
+
+
+def update_category_dictionary(path: pathlib.Path,
+                               values: typing.Dict[str, typing.Iterable[str]]
+                               ) -> typing.Dict[str, typing.List[str]]:
+    """
+    Add values to a persisted category dictionary.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path of the JSON dictionary, created if missing.
+    values : dict
+        Values seen per categorical column.
+
+    Returns
+    -------
+    dict
+        The updated dictionary restricted to the columns of `values`.
+
+    Notes
+    -----
+    New values are appended after the known ones, so the code of a value
+    never changes between snapshots. `RESERVED_CATEGORIES` are always added.
+    """
+    dictionary = load_category_dictionary(path)
+    for col, col_values in values.items():
+        known = dictionary.get(col, [])
+        seen = set(known)
+        new = set(col_values) | set(RESERVED_CATEGORIES.get(col, []))
+        dictionary[col] = known + sorted(new - seen)
+    path.write_text(json.dumps(dictionary, indent=2, ensure_ascii=False))
+    return {col: dictionary[col] for col in values}
+
+
+def parts_path(parquet_path: pathlib.Path) -> pathlib.Path:
+    """Return the directory the parts of a chunked conversion are written to."""
+    return parquet_path.with_suffix('.parts')
+
+
+def source_fingerprint(csv_path: pathlib.Path) -> typing.Dict[str, int]:
+    """Return the size and modification time of a source, to detect it changed."""
+    stat = csv_path.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_manifest(parts_dir: pathlib.Path) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """
+    Load the checkpoint manifest of a chunked conversion.
+
+    Parameters
+    ----------
+    parts_dir : pathlib.Path
+        Parts directory of the conversion, see `parts_path`.
+
+    Returns
+    -------
+    dict or None
+        The manifest, or None if the directory holds none.
+    """
+    path = parts_dir / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def _save_manifest(parts_dir: pathlib.Path, manifest: typing.Dict[str, typing.Any]) -> None:
+    """Write a manifest atomically, a crash leaves either the old or the new one."""
+    tmp = parts_dir / f'{MANIFEST_NAME}.tmp'
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    tmp.replace(parts_dir / MANIFEST_NAME)
+
+
+def write_chunks(csv_path: pathlib.Path,
+                 parquet_path: pathlib.Path,
+                 chunk_rows: typing.Optional[int],
+                 separator: str = DEFAULT_SEPARATOR,
+                 date_cols: typing.Optional[typing.List[str]] = None,
+                 date_format: str = DATE_FORMAT,
+                 categorical_cols: typing.Optional[typing.List[str]] = None,
+                 consolidate: bool = True,
+                 **write_options
+                 ) -> typing.Tuple[typing.Dict[str, typing.List[str]], typing.Dict[str, int], int]:
+    """
+    Write a source in chunks, resuming from the last completed chunk.
+
+    Parameters
+    ----------
+    csv_path : pathlib.Path
+        Path to the source CSV file, fingerprinted in the manifest.
+    parquet_path : pathlib.Path
+        Path of the Parquet file to write. The parts are written to
+        `parts_path(parquet_path)`.
+    chunk_rows : int or None
+        Number of source rows per part. The source is written as a single
+        part when None.
+    separator : str, optional
+        Field separator of the CSV file (default is ';').
+    date_cols : list of str, optional
+        Columns parsed to Date and validated, see `parse_dates`.
+    date_format : str, optional
+        Format of the date columns (default is '%Y-%m-%d').
+    categorical_cols : list of str, optional
+        Columns stored as Enums, see `update_category_dictionary`.
+    consolidate : bool, optional
+        Merge the parts into `parquet_path` and remove them once all chunks
+        are written (default is True). When False the parts directory is the
+        output, readable with `pl.scan_parquet(parts_dir / '*.parquet')`,
+        its categorical columns cast with `category_enums`.
+    **write_options
+        `compression`, `compression_level` and `row_group_size` of the parts
+        and of the consolidated file.
+
+    Returns
+    -------
+    tuple
+        The categories of the Enum columns, the number of unparseable values
+        per date column and the number of chunks that were already completed
+        by a previous run.
+
+    Notes
+    -----
+    - The manifest stores the source fingerprint, the chunk size and the
+      write options. A manifest that does not match the current run is
+      discarded and the conversion starts over.
+    - Categorical columns are written to the parts as strings. Their values
+      are collected in the same read and recorded with each part, then
+      appended to the category dictionary once all parts are written, so the
+      dictionary does not depend on the chunk size. The parts are cast to
+      Enums of the updated dictionary when consolidated or profiled.
+    - The source is read once, in batches of `BATCH_ROWS` rows cut into
+      parts of `chunk_rows` rows. Dates are parsed and validated batch by
+      batch, the rows holding unparseable dates of each part are kept next
+      to it and gathered into `quarantine_path(parquet_path)` at the end. A
+      resumed conversion skips the rows of the completed parts once, at the
+      start of the read.
+    - Each part is written to a temporary file and renamed before it is
+      recorded, so a part listed in the manifest is always complete.
+    - The profile is computed from the parts, in the same scan as the
+      consolidation when `consolidate` is True.
+    """
+    lf, date_cols = _scan_raw(csv_path, separator, date_cols or [])
+    parts_dir = parts_path(parquet_path)
+    settings = {'source': source_fingerprint(csv_path),
+                'chunk_rows': chunk_rows,
+                'write_options': write_options}
+    manifest = load_manifest(parts_dir)
+    if manifest is None or {key: manifest[key] for key in settings} != settings:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        parts_dir.mkdir(parents=True)
+        manifest = {**settings, 'parts': [], 'complete': False}
+        _save_manifest(parts_dir, manifest)
+    resumed = len(manifest['parts'])
+    names = lf.collect_schema().names()
+    seen = {col: set() for col in categorical_cols or [] if col in names}
+
+    # Read the source once, skipping the rows of the completed parts
+    done = sum(part['rows'] for part in manifest['parts'])
+    batches = iter(lf.slice(done).collect_batches(chunk_size=BATCH_ROWS))
+    line = done + 2
+    carry = []
+    quarantined = []
+
+    def chunk(with_columns, predicate, n_rows, batch_size):
+        nonlocal line
+        rows = 0
+        while chunk_rows is None or rows < chunk_rows:
+            batch = carry.pop() if carry else next(batches, None)
+            if batch is None:
+                return
+            if chunk_rows is not None and rows + len(batch) > chunk_rows:
+                # Keep the rows past the chunk for the next part
+                carry.append(batch.slice(chunk_rows - rows))
+                batch = batch.head(chunk_rows - rows)
+            batch, invalid = parse_dates(batch, line, date_cols, date_format)
+            quarantined.append(invalid)
+            for col, values in seen.items():
+                values.update(batch[col].drop_nulls().unique().to_list())
+            rows += len(batch)
+            line += len(batch)
+            yield batch
+
+    schema = lf.with_columns(pl.col(date_cols).cast(pl.Date)).collect_schema()
+    source = register_io_source(chunk, schema=schema)
+    while not manifest['complete']:
+        index = len(manifest['parts'])
+        part = parts_dir / f'part-{index:05d}.parquet'
+        tmp = part.with_suffix('.tmp')
+        source.sink_parquet(tmp, **write_options)
+        rows = count_parquet_rows(tmp)
+        if rows:
+            invalid_dates = save_quarantine(quarantined, part.with_suffix('.quarantine'))
+            tmp.replace(part)
+            manifest['parts'].append({'file': part.name, 'rows': rows,
+                                      'invalid_dates': invalid_dates,
+                                      'categories': {col: sorted(values)
+                                                     for col, values in seen.items()}})
+        else:
+            tmp.unlink()
+        quarantined.clear()
+        for values in seen.values():
+            values.clear()
+        # A short chunk is the last one
+        manifest['complete'] = chunk_rows is None or rows < chunk_rows
+        _save_manifest(parts_dir, manifest)
+
+    invalid_dates = {}
+    for part in manifest['parts']:
+        for col, count in part['invalid_dates'].items():
+            invalid_dates[col] = invalid_dates.get(col, 0) + count
+    quarantine_parts = [(parts_dir / part['file']).with_suffix('.quarantine')
+                        for part in manifest['parts'] if part['invalid_dates']]
+    if quarantine_parts:
+        pl.scan_parquet(quarantine_parts).sink_parquet(quarantine_path(parquet_path))
+    else:
+        quarantine_path(parquet_path).unlink(missing_ok=True)
+
+    for part in manifest['parts']:
+        for col, values in part['categories'].items():
+            seen[col].update(values)
+    categories = update_category_dictionary(category_dictionary_path(parquet_path), seen)
+    files = [parts_dir / part['file'] for part in manifest['parts']]
+    parts = pl.scan_parquet(files) if files else pl.LazyFrame(schema=schema)
+    parts = parts.cast({col: pl.Enum(values) for col, values in categories.items()})
+    if consolidate:
+        data_profile.sink_with_profile(parts, parquet_path, parquet_path.stem, **write_options)
+        shutil.rmtree(parts_dir)
+    else:
+        data_profile.save_profile(data_profile.profile_frame(parts, parquet_path.stem),
+                                  data_profile.profile_path(parquet_path))
+    return categories, invalid_dates, resumed
+
+
+def stream_csv_to_parquet(logger: logging.Logger,
+                          csv_path: pathlib.Path,
+                          parquet_path: pathlib.Path,
+                          separator: str = DEFAULT_SEPARATOR,
+                          compression: str = DEFAULT_COMPRESSION,
+                          compression_level: typing.Optional[int] = DEFAULT_COMPRESSION_LEVEL,
+                          row_group_size: typing.Optional[int] = None,
+                          date_cols: typing.Optional[typing.List[str]] = None,
+                          categorical_cols: typing.Optional[typing.List[str]] = None,
+                          chunk_rows: typing.Optional[int] = None,
+                          consolidate: bool = True
+                          ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """
+    Convert a CSV file to Parquet in bounded memory.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    csv_path : pathlib.Path
+        Path to the source CSV file.
+    parquet_path : pathlib.Path
+        Path of the Parquet file to write.
+    separator : str, optional
+        Field separator of the CSV file (default is ';').
+    compression : str, optional
+        Parquet compression codec (default is 'zstd').
+    compression_level : int, optional
+        Compression level passed to the codec (default is 22).
+    row_group_size : int, optional
+        Number of rows per row group. Polars picks one when None.
+    date_cols : list of str, optional
+        Columns parsed to Date and validated, see `parse_dates`.
+    categorical_cols : list of str, optional
+        Columns stored as dictionary-encoded Enums, see
+        `update_category_dictionary`.
+    chunk_rows : int, optional
+        Convert in resumable chunks of this many rows, see `write_chunks`.
+        The whole file is written as a single part when None.
+    consolidate : bool, optional
+        Merge the chunks into `parquet_path` (default is True). When False
+        they are kept in `parts_path(parquet_path)`. Ignored without
+        `chunk_rows`.
+
+    Returns
+    -------
+    dict or None
+        Conversion statistics with the keys 'dataset', 'rows', 'seconds',
+        'rows_per_sec', 'peak_rss_mb', 'invalid_dates', 'categories' and
+        'resumed_chunks', or None if the conversion failed.
+
+    Notes
+    -----
+    - Date columns are parsed once, vectorized, and stored as native Dates.
+      Unparseable values are stored as null, counted in 'invalid_dates' and
+      their rows copied to `<dataset>.quarantine.parquet`, in the same read
+      of the CSV as the conversion.
+    - Categorical columns are cast to Enums whose categories are persisted in
+      `<dataset>.categories.json`. Read them back with `category_enums`.
+    - The column profile is saved to `<dataset>.profile.json` from the same
+      scan, read it back with `data_profile.load_profile`.
+    - Other columns are parsed as by the eager `etl_tools.load_file`.
+    - `peak_rss_mb` is None when neither `psutil` nor `resource` is available.
+    """
+    try:
+        stats = _stream_csv_to_parquet(csv_path, parquet_path, separator,
+                                       compression, compression_level,
+                                       row_group_size, date_cols,
+                                       categorical_cols, chunk_rows,
+                                       consolidate)
+    except Exception as e:
+        logger.error(f"Failed to stream {csv_path} to parquet: {e}")
+        return None
+    if stats['invalid_dates']:
+        logger.warning(f"{csv_path.name}: unparseable dates {stats['invalid_dates']} "
+                       f"quarantined to {quarantine_path(parquet_path).name}")
+    logger.info(format_stats(stats))
+    return stats
+
+
+def _stream_csv_to_parquet(csv_path: pathlib.Path,
+                           parquet_path: pathlib.Path,
+                           separator: str = DEFAULT_SEPARATOR,
+                           compression: str = DEFAULT_COMPRESSION,
+                           compression_level: typing.Optional[int] = DEFAULT_COMPRESSION_LEVEL,
+                           row_group_size: typing.Optional[int] = None,
+                           date_cols: typing.Optional[typing.List[str]] = None,
+                           categorical_cols: typing.Optional[typing.List[str]] = None,
+                           chunk_rows: typing.Optional[int] = None,
+                           consolidate: bool = True
+                           ) -> typing.Dict[str, typing.Any]:
+    """Convert a CSV file to Parquet and return its statistics, raising on failure."""
+    start = time.perf_counter()
+    write_options = {'compression': compression,
+                     'compression_level': compression_level,
+                     'row_group_size': row_group_size}
+    with _PeakMemorySampler() as sampler:
+        # Without chunks the source is written as a single part
+        categories, invalid_dates, resumed = write_chunks(csv_path, parquet_path, chunk_rows,
+                                                          separator, date_cols,
+                                                          categorical_cols=categorical_cols,
+                                                          consolidate=consolidate or not chunk_rows,
+                                                          **write_options)
+    seconds = time.perf_counter() - start
+    output = parquet_path if not chunk_rows or consolidate\
+        else parts_path(parquet_path) / '*.parquet'
+    rows = count_parquet_rows(output)
+    return {
+        'dataset': csv_path.stem,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds else float('nan'),
+        'peak_rss_mb': (sampler.peak_bytes / 2**20
+                        if sampler.peak_bytes is not None else None),
+        'invalid_dates': invalid_dates,
+        'categories': {col: len(values) for col, values in categories.items()},
+        'resumed_chunks': resumed,
+    }
+
+
+def ingest_datasets(logger: logging.Logger,
+                    datasets: typing.List[pathlib.Path],
+                    workers: typing.Optional[int] = None,
+                    date_columns: typing.Optional[typing.Dict[str, typing.List[str]]] = None,
+                    categorical_columns: typing.Optional[typing.Dict[str, typing.List[str]]] = None,
+                    **write_options
+                    ) -> typing.Dict[str, typing.Union[typing.Dict[str, typing.Any], Exception]]:
+    """
+    Convert several CSV datasets to Parquet concurrently in a process pool.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    datasets : list of pathlib.Path
+        Dataset paths without suffix. `<dataset>.csv` is converted to
+        `<dataset>.parquet`.
+    workers : int, optional
+        Number of worker processes. Defaults to one per dataset.
+    date_columns : dict, optional
+        Date columns to parse per dataset name (default is `DATE_COLUMNS`).
+    categorical_columns : dict, optional
+        Columns to encode per dataset name (default is `CATEGORICAL_COLUMNS`).
+    **write_options
+        Extra keyword arguments for the conversion, such as `separator`,
+        `compression`, `compression_level`, `row_group_size` or `chunk_rows`.
+
+    Returns
+    -------
+    dict
+        Mapping of dataset name to its statistics, or to the exception raised
+        while converting it.
+
+    Notes
+    -----
+    - Progress is logged at INFO level as each dataset finishes. Failures are
+      logged at ERROR level.
+    - One failing dataset does not cancel the others. With `chunk_rows` set,
+      rerunning resumes a failed dataset from its last completed chunk.
+    - Workers are started with the 'spawn' method because Polars' thread pool
+      does not survive a fork. Callers must guard their entry point with
+      `if __name__ == '__main__':`.
+    """
+    workers = workers or len(datasets)
+    date_columns = DATE_COLUMNS if date_columns is None else date_columns
+    categorical_columns = CATEGORICAL_COLUMNS if categorical_columns is None\
+        else categorical_columns
+    results: typing.Dict[str, typing.Union[typing.Dict[str, typing.Any], Exception]] = {}
+    start = time.perf_counter()
+    context = multiprocessing.get_context('spawn')
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(_stream_csv_to_parquet,
+                        dataset.with_suffix('.csv'),
+                        dataset.with_suffix('.parquet'),
+                        date_cols=date_columns.get(dataset.name),
+                        categorical_cols=categorical_columns.get(dataset.name),
+                        **write_options): dataset.name
+            for dataset in datasets
+        }
+        logger.info(f"Ingesting {len(futures)} datasets with {workers} workers")
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+                logger.info(f"[{done}/{len(futures)}] "
+                            f"{format_stats(results[name])}")
+            except Exception as e:
+                results[name] = e
+                logger.error(f"[{done}/{len(futures)}] {name} failed: {e}")
+
+    failed = [name for name, res in results.items() if isinstance(res, Exception)]
+    logger.info(f"Ingestion finished in {time.perf_counter() - start:.1f}s, "
+                f"{len(results) - len(failed)} succeeded, {len(failed)} failed")
+    return results
+
+
+def format_stats(stats: typing.Dict[str, typing.Any]) -> str:
+    """
+    Format conversion statistics as a single log line.
+
+    Parameters
+    ----------
+    stats : dict
+        Statistics as returned by `stream_csv_to_parquet`.
+
+    Returns
+    -------
+    str
+        Human readable summary of the conversion.
+    """
+    peak = stats.get('peak_rss_mb')
+    peak_txt = f"{peak:,.0f} MB" if peak is not None else "n/a"
+    invalid = stats.get('invalid_dates')
+    invalid_txt = f", unparseable dates {invalid}" if invalid else ""
+    resumed = stats.get('resumed_chunks')
+    resumed_txt = f", resumed after {resumed} chunks" if resumed else ""
+    return (f"{stats['dataset']}: {stats['rows']:,} rows in "
+            f"{stats['seconds']:.1f}s ({stats['rows_per_sec']:,.0f} rows/s), "
+            f"peak RSS {peak_txt}{invalid_txt}{resumed_txt}")
@@ -6,50 +6,229 @@ UK corporate data, including companies, filings, and officers/owners datasets.
 The module uses CSV files as input, loads them into Polars DataFrames, and writes
 the processed data to Parquet files for efficient storage.
 
+By default the CSVs are streamed to Parquet through `data_ingest`, which scans
+them lazily and keeps memory bounded on the full bulk snapshot. The three
+datasets are converted concurrently in a process pool of `WORKERS` processes,
+and rows per second, peak memory and failures are reported for each dataset.
+Large CSVs are converted in chunks of `CHUNK_ROWS` rows with a checkpoint
+manifest, so rerunning after a failure resumes from the last completed chunk.
+
+When a previous Parquet snapshot exists, companies and officers/owners are
+diffed against it with `data_diff`, and the inserted, updated and deleted rows
+are written to `data/changes/<dataset>/` for incremental downstream runs.
+
+Every dataset gets a column profile sidecar (`<dataset>.profile.json`) with
+null and distinct counts, min/max and top values, computed while writing, so
+readers get these without rescanning, see `data_profile`.
+
+Date columns are parsed and validated once at ingest and stored as native
+Parquet Dates. Unparseable values are counted and quarantined. Low-cardinality
+columns are stored as dictionary-encoded Enums backed by a persisted, stable
+category dictionary per dataset.
+
+Parquet write settings come from a named profile (`PARQUET_PROFILE`), picked
+from the measurements of `parquet_benchmark.py` instead of a fixed zstd-22.
+
+All datasets are rewritten sorted by `company_number` with a page index and
+Bloom filters, so lookups and joins on it only touch the matching row groups.
+
+Companies and officers/owners are also written as Hive-partitioned datasets
+(`parquet_layout.PARTITION_KEYS`) so filtered readers only open the partitions
+they need.
+
+Importing the module has no side effects. The pipeline runs through
+`run_pipeline`, or from the command line with `python cli.py ingest`.
+
 Future Improvements:
 ---------------------
-1. Dynamically set the base path using `pathlib.Path.cwd()` instead of hardcoding.
-2. Add error handling for missing or corrupted input files.
-3. Allow configuration of paths and settings via a configuration file or environment variables.
-4. Improve logging granularity for better debugging and traceability.
+1. Add error handling for missing or corrupted input files.
+2. Allow configuration of settings via a configuration file or environment variables.
+3. Improve logging granularity for better debugging and traceability.
 """
 import pathlib
 import logging
+import typing
 from polars import DataFrame as pl_df
 
 import etl_tools
-import etl_logger
+import data_ingest
+import data_diff
+import data_profile
+import parquet_layout
+import parquet_benchmark
 
 BASE_PATH = pathlib.Path(__file__).resolve().parent.parent
+DATA_PATH = BASE_PATH / 'data'
 
 # Define specific data directories
-COMPANIES_DATA = BASE_PATH / 'data' / 'companies'
-FILINGS_DATA = BASE_PATH / 'data' / 'filings'
-OFFICE_OWNERS_DATA = BASE_PATH / 'data' / 'officers_and_owners'
-
-# Get logger
-console = logging.StreamHandler()
-logger = etl_logger.get_logger('logger', logging.WARNING, [console])
-
-# Load data
-companies: pl_df = etl_tools.load_file(
-    logger, COMPANIES_DATA.with_suffix('.csv'), separator=';')
-filings: pl_df = etl_tools.load_file(
-    logger, FILINGS_DATA.with_suffix('.csv'), separator=';')
-officers_owners: pl_df = etl_tools.load_file(
-    logger, OFFICE_OWNERS_DATA.with_suffix('.csv'), separator=';')
-
-
-# # Write parquet
-etl_tools.write_parquet(logger,
-                        companies,
-                        COMPANIES_DATA.with_suffix('.parquet'),
-                        compression_level=22)
-etl_tools.write_parquet(logger,
-                        filings,
-                        FILINGS_DATA.with_suffix('.parquet'),
-                        compression_level=22)
-etl_tools.write_parquet(logger,
-                        officers_owners,
-                        OFFICE_OWNERS_DATA.with_suffix('.parquet'),
-                        compression_level=22)
\ No newline at end of file
+COMPANIES_DATA = DATA_PATH / 'companies'
+FILINGS_DATA = DATA_PATH / 'filings'
+OFFICE_OWNERS_DATA = DATA_PATH / 'officers_and_owners'
+DATASET_NAMES = [COMPANIES_DATA.name, FILINGS_DATA.name, OFFICE_OWNERS_DATA.name]
+
+# Ingestion settings. STREAMING falls back to the eager load/write path when
+# False. WORKERS is the number of datasets converted at the same time.
+STREAMING = True
+WORKERS = 3
+# Rows per resumable chunk of the streaming conversion, None converts every
+# file in one go. A failed run resumes from the last completed chunk.
+CHUNK_ROWS = 5_000_000
+
+# Parquet write profile, one of 'archive', 'balanced' or 'fast-read'. The
+# settings are picked from the benchmark results file when it exists, see
+# parquet_benchmark.py, and from static defaults otherwise.
+PARQUET_PROFILE = 'balanced'
+BENCHMARK_RESULTS_NAME = 'parquet_benchmark.json'
+
+# Snapshot diff settings. When DIFF is True the previous parquet of every
+# dataset in data_diff.DIFF_KEYS is kept as '<dataset>.previous.parquet' and
+# the change sets are written to '<data_dir>/changes/<dataset>'.
+DIFF = True
+
+# Partitioned layout settings. When PARTITION is True every dataset in
+# parquet_layout.PARTITION_KEYS is also written as a Hive-partitioned dataset
+# to '<dataset>_partitioned'.
+PARTITION = True
+
+# Sorted layout settings. When SORTED is True every dataset is rewritten sorted
+# by company_number with a page index and Bloom filters, see
+# parquet_layout.write_sorted, so lookups and joins on it skip row groups.
+SORTED = True
+
+
+def previous_snapshot(dataset: pathlib.Path) -> pathlib.Path:
+    """Return the path the previous parquet snapshot of a dataset is kept at."""
+    return dataset.with_suffix('.previous.parquet')
+
+
+def run_pipeline(logger: logging.Logger,
+                 data_dir: pathlib.Path = DATA_PATH,
+                 datasets: typing.Optional[typing.List[str]] = None,
+                 workers: int = WORKERS,
+                 chunk_rows: typing.Optional[int] = CHUNK_ROWS,
+                 profile: str = PARQUET_PROFILE,
+                 streaming: bool = STREAMING,
+                 diff: bool = DIFF,
+                 partition: bool = PARTITION,
+                 sort: bool = SORTED
+                 ) -> bool:
+    """
+    Convert the CSV exports of a data directory to Parquet.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    data_dir : pathlib.Path, optional
+        Directory holding `<dataset>.csv`. Outputs are written next to them.
+    datasets : list of str, optional
+        Names of the datasets to convert (default is `DATASET_NAMES`).
+    workers : int, optional
+        Number of datasets converted at the same time (default is `WORKERS`).
+    chunk_rows : int, optional
+        Rows per resumable chunk of the streaming conversion (default is
+        `CHUNK_ROWS`). Every file is converted in one go when None.
+    profile : str, optional
+        Parquet write profile (default is `PARQUET_PROFILE`).
+    streaming : bool, optional
+        Stream the CSVs to Parquet. The eager `etl_tools` path is used when False.
+    diff : bool, optional
+        Write change sets against the previous snapshots.
+    partition : bool, optional
+        Write the Hive-partitioned layouts.
+    sort : bool, optional
+        Rewrite the datasets sorted by company_number.
+
+    Returns
+    -------
+    bool
+        True if every dataset was converted, False otherwise.
+
+    Notes
+    -----
+    - Callers running with `streaming=True` must guard their entry point with
+      `if __name__ == '__main__':`, the conversion uses a spawned process pool.
+    - After a failed or killed run, running again resumes the chunked
+      conversions and still diffs against the snapshot moved aside before.
+    """
+    dataset_paths = [data_dir / name for name in (datasets or DATASET_NAMES)]
+    write_options = parquet_benchmark.profile_write_options(logger,
+                                                            profile,
+                                                            data_dir / BENCHMARK_RESULTS_NAME)
+    failed = set()
+
+    # Keep the previous snapshots before they are overwritten. A killed run
+    # leaves its previous snapshot aside and no parquet, reuse it
+    diff_datasets = [dataset for dataset in dataset_paths
+                     if diff and dataset.name in data_diff.DIFF_KEYS
+                     and (dataset.with_suffix('.parquet').exists()
+                          or previous_snapshot(dataset).exists())]
+    for dataset in diff_datasets:
+        if dataset.with_suffix('.parquet').exists():
+            dataset.with_suffix('.parquet').replace(previous_snapshot(dataset))
+
+    if streaming:
+        # Convert all datasets concurrently, failures are reported per file
+        results = data_ingest.ingest_datasets(logger,
+                                              dataset_paths,
+                                              workers=workers,
+                                              separator=';',
+                                              chunk_rows=chunk_rows,
+                                              **write_options)
+        # ingest_datasets logs the stats and the error of each dataset
+        failed.update(name for name, result in results.items()
+                      if isinstance(result, Exception))
+        if failed:
+            logger.error(f"Failed to convert {sorted(failed)}, keeping their previous snapshots")
+    else:
+        for dataset in dataset_paths:
+            # Load data
+            data: pl_df = etl_tools.load_file(
+                logger, dataset.with_suffix('.csv'), separator=';')
+            # Write parquet with all the profile's options, on the writer the
+            # benchmark measures
+            try:
+                data.lazy().sink_parquet(dataset.with_suffix('.parquet'), **write_options)
+            except Exception as e:
+                logger.error(f"Failed to write {dataset.with_suffix('.parquet')}: {e}")
+                failed.add(dataset.name)
+                continue
+            # The streaming path profiles while writing, profile afterwards here
+            data_profile.profile_parquet(logger, dataset.with_suffix('.parquet'))
+    converted = [dataset for dataset in dataset_paths if dataset.name not in failed]
+
+    # Put back the previous snapshots of the datasets that failed
+    for dataset in diff_datasets:
+        if dataset not in converted:
+            previous_snapshot(dataset).replace(dataset.with_suffix('.parquet'))
+
+    # Sort by company_number for fast lookups and joins, with the profile's
+    # codec, level and row-group size
+    for dataset in converted:
+        if sort:
+            parquet_layout.write_sorted(logger,
+                                        dataset.with_suffix('.parquet'),
+                                        dataset.with_suffix('.parquet'),
+                                        **write_options)
+
+    # Write the partitioned layouts, with the profile's codec, level and row-group size
+    for dataset in converted:
+        if partition and dataset.name in parquet_layout.PARTITION_KEYS:
+            parquet_layout.write_partitioned(logger,
+                                             dataset.with_suffix('.parquet'),
+                                             parquet_layout.partitioned_path(dataset),
+                                             parquet_layout.PARTITION_KEYS[dataset.name],
+                                             **write_options)
+
+    # Write the change sets against the previous snapshots
+    for dataset in diff_datasets:
+        if dataset not in converted:
+            continue
+        counts = data_diff.diff_snapshots(logger,
+                                          dataset.with_suffix('.parquet'),
+                                          previous_snapshot(dataset),
+                                          data_dir / 'changes' / dataset.name,
+                                          keys=data_diff.DIFF_KEYS[dataset.name])
+        if counts:
+            logger.info(f"{dataset.name} changes: {counts}")
+    return not failed
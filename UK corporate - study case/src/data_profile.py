@@ -0,0 +1,461 @@
+"""
+Column Profiling Module for UK Corporate Data.
+
+This module computes a profile of every column of a dataset while it is
+written to Parquet, and stores it as a JSON sidecar next to the file
+(`<dataset>.profile.json`). The profile holds, per column:
+
+- the dtype, the null count and an approximate distinct count,
+- the min, max and mean of numeric and temporal columns (min and max only
+  for strings),
+- the most frequent values of the columns in `TOP_VALUE_COLUMNS`, of every
+  Enum column and of the derived columns in `DERIVED_COLUMNS`.
+
+The profile is computed batch by batch while the data streams to Parquet:
+every batch is reduced to partial aggregates (counts, sums, min/max, value
+counts and a sketch of hashes for distinct counts) that merge exactly, so
+memory stays bounded by the batch size and the source is read once. Readers
+then answer questions such as row counts or "top 50 cities" from the
+sidecar instantly, with `load_profile`, `row_count`, `column_profile` and
+`top_values`, instead of rescanning the data.
+
+Future Improvements:
+---------------------
+1. Store value histograms of numeric and temporal columns.
+2. Keep the partial aggregates of each chunk, to profile resumed conversions
+   without reading back the completed chunks.
+"""
+import json
+import time
+import logging
+import pathlib
+import datetime
+import collections
+import typing
+
+import numpy as np
+import polars as pl
+from polars.io.plugins import register_io_source
+
+import wrangle
+
+
+PROFILE_TOP_N = 50
+# Rows per batch of a profiled stream, memory is bounded by the batch size
+BATCH_ROWS = 100_000
+# Smallest hashes kept per column to estimate its distinct count, the error
+# is about 1 / sqrt(SKETCH_SIZE) above SKETCH_SIZE distinct values
+SKETCH_SIZE = 4096
+# Columns whose most frequent values are profiled, per dataset. Enum columns
+# are always included
+TOP_VALUE_COLUMNS = {
+    'companies': ['company_status', 'company_type', 'jurisdiction'],
+    'filings': ['type', 'category'],
+    'officers_and_owners': ['officer_role', 'occupation', 'nationality',
+                            'country_of_residence'],
+}
+# Columns derived from the source and profiled as if stored, per dataset: the
+# function adding the column to a batch and the source columns it reads.
+# 'city' is the one the analysis derives, see wrangle.with_city
+DERIVED_COLUMNS = {
+    'companies': {
+        'city': (wrangle.with_city, ['office_address']),
+    },
+}
+
+
+def profile_path(parquet_path: pathlib.Path) -> pathlib.Path:
+    """Return the path of the profile written next to a Parquet file."""
+    return parquet_path.with_suffix('.profile.json')
+
+
+def _derived_columns(schema: pl.Schema, dataset: str) -> typing.Dict[str, typing.Callable]:
+    """Return the functions adding the derived columns whose sources are in the schema, by name."""
+    return {col: derive for col, (derive, sources) in DERIVED_COLUMNS.get(dataset, {}).items()
+            if set(sources) <= set(schema.names())}
+
+
+def _profiled_columns(schema: pl.Schema, dataset: str) -> typing.Dict[str, pl.Expr]:
+    """Return the stored and derived columns profiled for a dataset, by name."""
+    return {col: pl.col(col) for col in [*schema.names(), *_derived_columns(schema, dataset)]}
+
+
+def _counts_values(col: str, dtype: pl.DataType, dataset: str) -> bool:
+    """Return whether the values of a column are counted, for its top values."""
+    return (col in TOP_VALUE_COLUMNS.get(dataset, []) or col in DERIVED_COLUMNS.get(dataset, {})
+            or isinstance(dtype, pl.Enum))
+
+
+def profile_exprs(schema: pl.Schema, dataset: str) -> typing.List[pl.Expr]:
+    """
+    Build the expressions of the partial profile of one batch.
+
+    Parameters
+    ----------
+    schema : pl.Schema
+        Schema of the frame to profile.
+    dataset : str
+        Dataset name, selecting its `TOP_VALUE_COLUMNS` and `DERIVED_COLUMNS`.
+
+    Returns
+    -------
+    list of pl.Expr
+        The row count ('__rows') and one struct per column holding its
+        partial aggregates, which `update_profile` merges across batches.
+    """
+    exprs = [pl.len().alias('__rows')]
+    for col, expr in _profiled_columns(schema, dataset).items():
+        dtype = schema.get(col, pl.String)
+        fields = [expr.null_count().alias('null_count'),
+                  expr.count().alias('count')]
+        if dtype.is_numeric() or dtype.is_temporal() or dtype == pl.String:
+            fields += [expr.min().alias('min'), expr.max().alias('max')]
+        if dtype.is_numeric() or dtype.is_temporal():
+            fields.append(expr.to_physical().cast(pl.Float64).sum().alias('sum'))
+        if _counts_values(col, dtype, dataset):
+            # Every value is counted, the top values are picked once merged
+            fields.append(expr.drop_nulls().cast(pl.String)
+                          .value_counts(name='count').implode().alias('top_values'))
+        else:
+            fields.append(expr.drop_nulls().hash().unique()
+                          .bottom_k(SKETCH_SIZE).implode().alias('hashes'))
+        exprs.append(pl.struct(fields).alias(col))
+    return exprs
+
+
+def start_profile(schema: pl.Schema,
+                  dataset: str,
+                  top_n: int = PROFILE_TOP_N
+                  ) -> typing.Dict[str, typing.Any]:
+    """
+    Start profiling a frame streamed in batches.
+
+    Parameters
+    ----------
+    schema : pl.Schema
+        Schema of the batches.
+    dataset : str
+        Dataset name, see `profile_exprs`.
+    top_n : int, optional
+        Number of most frequent values kept per column (default is 50).
+
+    Returns
+    -------
+    dict
+        The profiling state, fed with `update_profile` and turned into the
+        profile by `finish_profile`.
+    """
+    columns = {col: {'null_count': 0, 'count': 0, 'min': None, 'max': None, 'sum': 0.0,
+                     'hashes': np.empty(0, dtype=np.uint64), 'top_values': collections.Counter()}
+               for col in _profiled_columns(schema, dataset)}
+    return {'dataset': dataset, 'schema': schema, 'top_n': top_n,
+            'derive': list(_derived_columns(schema, dataset).values()),
+            'exprs': profile_exprs(schema, dataset), 'rows': 0, 'columns': columns}
+
+
+def update_profile(state: typing.Dict[str, typing.Any], batch: pl.DataFrame) -> None:
+    """
+    Merge the partial profile of a batch into a profiling state.
+
+    Parameters
+    ----------
+    state : dict
+        Profiling state, see `start_profile`.
+    batch : pl.DataFrame
+        Batch of rows, with the schema the profiling was started with.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Counts and sums add up, min/max keep the extremes, value counts add up
+    per value and distinct counts keep the `SKETCH_SIZE` smallest hashes of
+    the distinct values, so the merged profile does not depend on batching.
+    """
+    for derive in state['derive']:
+        batch = derive(batch)
+    row = batch.select(state['exprs']).row(0, named=True)
+    state['rows'] += row.pop('__rows')
+    for col, partial in row.items():
+        merged = state['columns'][col]
+        merged['null_count'] += partial['null_count']
+        merged['count'] += partial['count']
+        for key, pick in (('min', min), ('max', max)):
+            if partial.get(key) is not None:
+                merged[key] = partial[key] if merged[key] is None else pick(merged[key], partial[key])
+        merged['sum'] += partial.get('sum') or 0.0
+        if 'top_values' in partial:
+            merged['top_values'].update({value[col]: value['count']
+                                         for value in partial['top_values']})
+        else:
+            hashes = np.union1d(merged['hashes'], np.array(partial['hashes'], dtype=np.uint64))
+            merged['hashes'] = hashes[:SKETCH_SIZE]
+
+
+def _distinct_count(hashes: np.ndarray) -> int:
+    """Estimate a distinct count from the smallest hashes of the distinct values."""
+    if len(hashes) < SKETCH_SIZE:
+        return len(hashes)
+    # The k-th smallest of n uniform hashes is about k / n of the hash range
+    return round((SKETCH_SIZE - 1) * 2**64 / (int(hashes[-1]) + 1))
+
+
+def _mean(total: float, count: int, dtype: pl.DataType) -> typing.Any:
+    """Turn the sum of the physical values of a column into its mean."""
+    if not count:
+        return None
+    mean = total / count
+    if dtype == pl.Date:
+        # As `pl.Expr.mean`, the mean of dates is a datetime
+        return datetime.datetime(1970, 1, 1) + datetime.timedelta(days=mean)
+    if dtype.is_temporal():
+        return pl.Series([round(mean)]).cast(dtype).item()
+    return mean
+
+
+def finish_profile(state: typing.Dict[str, typing.Any],
+                   schema: typing.Optional[pl.Schema] = None
+                   ) -> typing.Dict[str, typing.Any]:
+    """
+    Turn a profiling state into the profile dict.
+
+    Parameters
+    ----------
+    state : dict
+        Profiling state, see `start_profile`.
+    schema : pl.Schema, optional
+        Schema of the written data, when its dtypes differ from the batches,
+        e.g. Enums of columns streamed as strings. Defaults to the schema the
+        profiling was started with.
+
+    Returns
+    -------
+    dict
+        The profile, with the keys 'dataset', 'rows', 'created' and 'columns'.
+        Distinct counts ('n_unique') exclude nulls, they are exact for the
+        columns with top values and estimated for the others.
+    """
+    schema = schema or state['schema']
+    columns = {}
+    for col, merged in state['columns'].items():
+        dtype = schema.get(col, pl.String)
+        counted = _counts_values(col, dtype, state['dataset'])
+        stats = {'null_count': merged['null_count'],
+                 'n_unique': len(merged['top_values']) if counted
+                 else _distinct_count(merged['hashes'])}
+        if dtype.is_numeric() or dtype.is_temporal() or dtype == pl.String:
+            stats.update(min=merged['min'], max=merged['max'])
+        if dtype.is_numeric() or dtype.is_temporal():
+            stats['mean'] = _mean(merged['sum'], merged['count'], dtype)
+        if counted:
+            stats['top_values'] = [[value, count] for value, count
+                                   in merged['top_values'].most_common(state['top_n'])]
+        stats['dtype'] = str(dtype)
+        stats['derived'] = col not in state['schema']
+        columns[col] = stats
+    return {'dataset': state['dataset'],
+            'rows': state['rows'],
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'columns': columns}
+
+
+def profile_frame(lf: pl.LazyFrame,
+                  dataset: str,
+                  top_n: int = PROFILE_TOP_N
+                  ) -> typing.Dict[str, typing.Any]:
+    """
+    Profile a lazy frame in one streaming scan.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        Frame to profile.
+    dataset : str
+        Dataset name, see `profile_exprs`.
+    top_n : int, optional
+        Number of most frequent values kept per column (default is 50).
+
+    Returns
+    -------
+    dict
+        The profile, with the keys 'dataset', 'rows', 'created' and 'columns'.
+    """
+    state = start_profile(lf.collect_schema(), dataset, top_n)
+    for batch in lf.collect_batches(chunk_size=BATCH_ROWS):
+        update_profile(state, batch)
+    return finish_profile(state)
+
+
+def sink_with_profile(lf: pl.LazyFrame,
+                      parquet_path: pathlib.Path,
+                      dataset: str,
+                      top_n: int = PROFILE_TOP_N,
+                      **write_options
+                      ) -> typing.Dict[str, typing.Any]:
+    """
+    Write a lazy frame to Parquet and save its profile from the same scan.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        Frame to write.
+    parquet_path : pathlib.Path
+        Path of the Parquet file. The profile is saved to
+        `profile_path(parquet_path)`.
+    dataset : str
+        Dataset name, see `profile_exprs`.
+    top_n : int, optional
+        Number of most frequent values kept per column (default is 50).
+    **write_options
+        Keyword arguments of `pl.LazyFrame.sink_parquet`.
+
+    Returns
+    -------
+    dict
+        The profile.
+
+    Notes
+    -----
+    The frame is streamed in batches of `BATCH_ROWS` rows, each batch is
+    profiled and then handed to `sink_parquet` through a Polars IO source, so
+    the source is read once and memory stays bounded by the batches.
+    """
+    schema = lf.collect_schema()
+    state = start_profile(schema, dataset, top_n)
+    batches = lf.collect_batches(chunk_size=BATCH_ROWS)
+
+    def profiled_batches(with_columns, predicate, n_rows, batch_size):
+        for batch in batches:
+            update_profile(state, batch)
+            yield batch
+
+    register_io_source(profiled_batches, schema=schema).sink_parquet(parquet_path, **write_options)
+    profile = finish_profile(state)
+    save_profile(profile, profile_path(parquet_path))
+    return profile
+
+
+def profile_parquet(logger: logging.Logger,
+                    parquet_path: pathlib.Path,
+                    dataset: typing.Optional[str] = None
+                    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """
+    Profile an existing Parquet file and save the sidecar.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    parquet_path : pathlib.Path
+        Path of the Parquet file.
+    dataset : str, optional
+        Dataset name (default is the file stem).
+
+    Returns
+    -------
+    dict or None
+        The profile, or None if profiling failed.
+    """
+    try:
+        profile = profile_frame(pl.scan_parquet(parquet_path),
+                                dataset or parquet_path.stem)
+        save_profile(profile, profile_path(parquet_path))
+    except Exception as e:
+        logger.error(f"Failed to profile {parquet_path}: {e}")
+        return None
+    return profile
+
+
+def save_profile(profile: typing.Dict[str, typing.Any], path: pathlib.Path) -> None:
+    """
+    Save a profile as JSON.
+
+    Parameters
+    ----------
+    profile : dict
+        Profile to save.
+    path : pathlib.Path
+        Path of the JSON file. Dates are stored as ISO strings.
+
+    Returns
+    -------
+    None
+    """
+    path.write_text(json.dumps(profile, indent=2, ensure_ascii=False, default=str))
+
+
+def load_profile(parquet_path: pathlib.Path) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """
+    Load the profile saved next to a Parquet file.
+
+    Parameters
+    ----------
+    parquet_path : pathlib.Path
+        Path of the profiled Parquet file.
+
+    Returns
+    -------
+    dict or None
+        The profile, or None if the file has none.
+    """
+    path = profile_path(parquet_path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def row_count(profile: typing.Dict[str, typing.Any]) -> int:
+    """Return the number of rows of a profiled dataset."""
+    return profile['rows']
+
+
+def column_profile(profile: typing.Dict[str, typing.Any], col: str) -> typing.Dict[str, typing.Any]:
+    """
+    Return the statistics of one column.
+
+    Parameters
+    ----------
+    profile : dict
+        Profile of the dataset.
+    col : str
+        Column name.
+
+    Returns
+    -------
+    dict
+        The 'dtype', 'derived', 'null_count' and 'n_unique' of the column,
+        plus 'min', 'max', 'mean' and 'top_values' when profiled.
+    """
+    if col not in profile['columns']:
+        raise KeyError(f"Column '{col}' is not in the profile of {profile['dataset']}")
+    return profile['columns'][col]
+
+
+def top_values(profile: typing.Dict[str, typing.Any],
+               col: str,
+               n: typing.Optional[int] = None
+               ) -> typing.List[typing.Tuple[str, int]]:
+    """
+    Return the most frequent values of a column with their counts.
+
+    Parameters
+    ----------
+    profile : dict
+        Profile of the dataset.
+    col : str
+        Column name.
+    n : int, optional
+        Number of values to return (default is all profiled values).
+
+    Returns
+    -------
+    list of tuple
+        (value, count) pairs, most frequent first. Values are strings.
+    """
+    stats = column_profile(profile, col)
+    if 'top_values' not in stats:
+        raise KeyError(f"Top values of '{col}' are not profiled, "
+                       f"see TOP_VALUE_COLUMNS")
+    return [tuple(value) for value in stats['top_values'][:n]]
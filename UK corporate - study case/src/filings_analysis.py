@@ -0,0 +1,286 @@
+"""
+Filings Analytics Module for UK Corporate Data.
+
+This module analyses the filing history written by `data_pipeline` to
+`filings.parquet`, joined to the companies on `company_number`:
+
+- per company: number of filings, first and last filing, days since the last
+  filing and filing cadence (average days between filings),
+- filings per year by company type and by company status,
+- companies per filing recency bracket, for active and not active companies,
+- median filing cadence by company type.
+
+Filings is the largest dataset, so everything is expressed as lazy Polars
+queries run on the streaming engine. Filings are reduced per company (and per
+company and year) before the join, so the join never holds one row per
+filing, and only the small dashboard aggregates are converted to pandas. The
+per-company table is sunk to Parquet. All queries are collected together so
+the filings are scanned once.
+
+Future Improvements:
+---------------------
+1. Break filings down by filing type once the dashboard has room for it.
+2. Use the change sets of `data_diff` to update the per-company table incrementally.
+"""
+import time
+import logging
+import pathlib
+import datetime as dt
+import typing
+
+import polars as pl
+import pandas as pd
+
+
+FILING_DATE_COL = 'date'
+ACTIVE_STATUSES = ['Active', 'Open']
+# Upper bounds in days of the recency brackets, the last bracket is open
+RECENCY_BREAKS = [365, 730, 1825]
+RECENCY_LABELS = ['< 1 year', '1-2 years', '2-5 years', '5+ years']
+# Dashboard aggregates returned by `analyze_filings`
+AGGREGATES = ['filings_by_type', 'filings_by_status', 'filing_recency',
+              'filing_cadence_by_type']
+
+
+def scan_filings(filings_path: pathlib.Path,
+                 companies_path: pathlib.Path
+                 ) -> typing.Tuple[pl.LazyFrame, pl.LazyFrame]:
+    """
+    Lazily scan the filings and the company attributes they are joined to.
+
+    Parameters
+    ----------
+    filings_path : pathlib.Path
+        Path of filings.parquet.
+    companies_path : pathlib.Path
+        Path of companies.parquet.
+
+    Returns
+    -------
+    tuple of pl.LazyFrame
+        Filings with 'company_number' and 'date', and companies with
+        'company_number', 'company_type' and 'company_status' as strings,
+        missing values labelled 'Unknown'.
+    """
+    filings = pl.scan_parquet(filings_path)\
+        .select('company_number', pl.col(FILING_DATE_COL).alias('date'))\
+        .drop_nulls('date')
+    companies = pl.scan_parquet(companies_path)\
+        .select('company_number',
+                pl.col('company_type', 'company_status').cast(pl.String).fill_null('Unknown'))\
+        .unique('company_number')
+    return filings, companies
+
+
+def company_filing_cadence(filings: pl.LazyFrame,
+                           companies: pl.LazyFrame,
+                           today: typing.Optional[dt.date] = None
+                           ) -> pl.LazyFrame:
+    """
+    Compute the filing activity of every company.
+
+    Parameters
+    ----------
+    filings : pl.LazyFrame
+        Filings, see `scan_filings`.
+    companies : pl.LazyFrame
+        Company attributes, see `scan_filings`.
+    today : datetime.date, optional
+        Reference date of 'days_since_last_filing' (default is today).
+
+    Returns
+    -------
+    pl.LazyFrame
+        One row per company with filings, with 'company_type',
+        'company_status', 'filings', 'first_filing', 'last_filing',
+        'days_since_last_filing' and 'cadence_days'. 'cadence_days' is null
+        for companies with a single filing. Companies missing from
+        companies.parquet are labelled 'Unknown'.
+    """
+    today = today or dt.date.today()
+    return filings.group_by('company_number')\
+        .agg(pl.len().alias('filings'),
+             pl.col('date').min().alias('first_filing'),
+             pl.col('date').max().alias('last_filing'))\
+        .join(companies, on='company_number', how='left')\
+        .with_columns(
+            pl.col('company_type', 'company_status').fill_null('Unknown'),
+            (pl.lit(today) - pl.col('last_filing')).dt.total_days()
+            .alias('days_since_last_filing'),
+            ((pl.col('last_filing') - pl.col('first_filing')).dt.total_days()
+             / (pl.col('filings') - 1)).alias('cadence_days'))\
+        .with_columns(pl.when(pl.col('filings') > 1).then(pl.col('cadence_days'))
+                      .alias('cadence_days'))
+
+
+def filings_per_year(filings: pl.LazyFrame,
+                     companies: pl.LazyFrame,
+                     by: str
+                     ) -> pl.LazyFrame:
+    """
+    Count filings per year and company attribute.
+
+    Parameters
+    ----------
+    filings : pl.LazyFrame
+        Filings, see `scan_filings`.
+    companies : pl.LazyFrame
+        Company attributes, see `scan_filings`.
+    by : str
+        'company_type' or 'company_status'.
+
+    Returns
+    -------
+    pl.LazyFrame
+        'year', `by` and 'filings', sorted by year.
+
+    Notes
+    -----
+    Filings are counted per company and year before the join, so the join
+    input has one row per company and year rather than per filing.
+    """
+    return filings.group_by('company_number', pl.col('date').dt.year().alias('year'))\
+        .agg(pl.len().alias('filings'))\
+        .join(companies.select('company_number', by), on='company_number', how='left')\
+        .with_columns(pl.col(by).fill_null('Unknown'))\
+        .group_by('year', by)\
+        .agg(pl.col('filings').sum())\
+        .sort('year', by)
+
+
+def filing_recency(cadence: pl.LazyFrame,
+                   active_statuses: typing.List[str] = ACTIVE_STATUSES
+                   ) -> pl.LazyFrame:
+    """
+    Count companies per bracket of days since their last filing.
+
+    Parameters
+    ----------
+    cadence : pl.LazyFrame
+        Result of `company_filing_cadence`.
+    active_statuses : list of str, optional
+        Statuses counted as active (default is ['Active', 'Open']).
+
+    Returns
+    -------
+    pl.LazyFrame
+        'activity' ('Active' or 'Not active'), 'recency_bracket' and 'size',
+        brackets sorted from the most recent.
+    """
+    return cadence\
+        .with_columns(
+            pl.when(pl.col('company_status').is_in(active_statuses))
+            .then(pl.lit('Active')).otherwise(pl.lit('Not active')).alias('activity'),
+            pl.col('days_since_last_filing').cut(RECENCY_BREAKS, labels=RECENCY_LABELS,
+                                                 left_closed=True)
+            .cast(pl.String).alias('recency_bracket'))\
+        .group_by('activity', 'recency_bracket')\
+        .agg(pl.len().alias('size'))\
+        .sort('activity', pl.col('recency_bracket').replace_strict(
+            RECENCY_LABELS, list(range(len(RECENCY_LABELS)))))
+
+
+def cadence_by_type(cadence: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Summarize the filing cadence per company type.
+
+    Parameters
+    ----------
+    cadence : pl.LazyFrame
+        Result of `company_filing_cadence`.
+
+    Returns
+    -------
+    pl.LazyFrame
+        'company_type', 'companies' (with at least two filings) and
+        'median_cadence_days', sorted by the median.
+    """
+    return cadence.drop_nulls('cadence_days')\
+        .group_by('company_type')\
+        .agg(pl.len().alias('companies'),
+             pl.col('cadence_days').median().alias('median_cadence_days'))\
+        .sort('median_cadence_days')
+
+
+def filings_queries(filings_path: pathlib.Path,
+                    companies_path: pathlib.Path,
+                    active_statuses: typing.List[str] = ACTIVE_STATUSES,
+                    today: typing.Optional[dt.date] = None
+                    ) -> typing.Tuple[typing.Dict[str, pl.LazyFrame], pl.LazyFrame]:
+    """
+    Build the lazy queries of the filings analytics.
+
+    Parameters
+    ----------
+    filings_path : pathlib.Path
+        Path of filings.parquet.
+    companies_path : pathlib.Path
+        Path of companies.parquet.
+    active_statuses : list of str, optional
+        Statuses counted as active (default is ['Active', 'Open']).
+    today : datetime.date, optional
+        Reference date of the recency (default is today).
+
+    Returns
+    -------
+    tuple
+        The queries of `AGGREGATES` keyed by name, and the per-company
+        table of `company_filing_cadence` they derive from.
+    """
+    filings, companies = scan_filings(filings_path, companies_path)
+    cadence = company_filing_cadence(filings, companies, today)
+    queries = {
+        'filings_by_type': filings_per_year(filings, companies, 'company_type'),
+        'filings_by_status': filings_per_year(filings, companies, 'company_status'),
+        'filing_recency': filing_recency(cadence, active_statuses),
+        'filing_cadence_by_type': cadence_by_type(cadence),
+    }
+    return queries, cadence
+
+
+def analyze_filings(logger: logging.Logger,
+                    filings_path: pathlib.Path,
+                    companies_path: pathlib.Path,
+                    cadence_path: typing.Optional[pathlib.Path] = None,
+                    active_statuses: typing.List[str] = ACTIVE_STATUSES,
+                    today: typing.Optional[dt.date] = None
+                    ) -> typing.Optional[typing.Dict[str, pd.DataFrame]]:
+    """
+    Run the filings analytics on the streaming engine.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    filings_path : pathlib.Path
+        Path of filings.parquet.
+    companies_path : pathlib.Path
+        Path of companies.parquet.
+    cadence_path : pathlib.Path, optional
+        Path the per-company table of `company_filing_cadence` is written to.
+        Not written when None.
+    active_statuses : list of str, optional
+        Statuses counted as active (default is ['Active', 'Open']).
+    today : datetime.date, optional
+        Reference date of the recency (default is today).
+
+    Returns
+    -------
+    dict or None
+        The aggregates of `AGGREGATES` as pandas DataFrames, or None if the
+        analysis failed.
+    """
+    try:
+        start = time.perf_counter()
+        queries, cadence = filings_queries(filings_path, companies_path, active_statuses, today)
+        lazy_frames = list(queries.values())
+        if cadence_path is not None:
+            cadence_path.parent.mkdir(parents=True, exist_ok=True)
+            lazy_frames.append(cadence.sink_parquet(cadence_path, lazy=True))
+        frames = pl.collect_all(lazy_frames, engine='streaming')
+    except Exception as e:
+        logger.error(f"Failed to analyze filings {filings_path}: {e}")
+        return None
+
+    logger.info(f"Filings analyzed in {time.perf_counter() - start:.1f}s")
+    return {name: frame.to_pandas() for name, frame in zip(queries, frames)}
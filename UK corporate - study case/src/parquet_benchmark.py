@@ -0,0 +1,351 @@
+"""
+Parquet Write Settings Benchmark.
+
+This module measures how Parquet write settings (codec, compression level
+and row-group size) affect four costs on our data:
+
+- write time,
+- file size,
+- full read time,
+- read time of the columns the analysis actually selects.
+
+Files are written with `pl.LazyFrame.sink_parquet` and read with Polars, the
+writer and readers of the pipeline, so the measured settings behave as they
+will when the pipeline uses them.
+
+The measurements are saved as JSON and used to pick the write options of a
+named profile ('archive', 'balanced' or 'fast-read') for the pipeline. By
+default they are saved to `<data-dir>/parquet_benchmark.json`, where
+`data_pipeline.run_pipeline` reads them. When no measurements exist, a static
+default is used for each profile.
+
+Usage:
+------
+    python parquet_benchmark.py --source ../data/companies.parquet --rows 1000000
+    python parquet_benchmark.py --synthetic 1000000 --data-dir ../data
+"""
+import json
+import logging
+import pathlib
+import argparse
+import tempfile
+import itertools
+import typing
+
+import numpy as np
+import polars as pl
+
+import wrangle
+
+
+# Columns selected downstream by uk_corporate_analysis
+PROJECTED_COLUMNS = {
+    'companies': ['company_status', 'company_type', 'incorporation_date',
+                  'date_of_cessation', 'office_address'],
+    'officers_and_owners': ['officer_role', 'occupation', 'is_owner',
+                            'nationality', 'country_of_residence'],
+}
+# Codecs and levels, with the names of `pl.LazyFrame.sink_parquet`
+CODEC_LEVELS = {
+    'zstd': [1, 3, 9, 22],
+    'gzip': [1, 6, 9],
+    'snappy': [None],
+    'lz4': [None],
+    'uncompressed': [None],
+}
+ROW_GROUP_SIZES = [128_000, 512_000, 1_000_000]
+METRICS = ['write_s', 'size_mb', 'read_s', 'projected_read_s']
+
+# Weight of each metric, relative to its best measured value, per profile
+PROFILE_WEIGHTS = {
+    'archive': {'size_mb': 1.0, 'write_s': 0.05},
+    'balanced': {'write_s': 1.0, 'size_mb': 1.0, 'read_s': 1.0, 'projected_read_s': 1.0},
+    'fast-read': {'read_s': 1.0, 'projected_read_s': 2.0, 'size_mb': 0.1},
+}
+# Used when no benchmark results are available
+DEFAULT_PROFILES = {
+    'archive': {'compression': 'zstd', 'compression_level': 19, 'row_group_size': 1_000_000},
+    'balanced': {'compression': 'zstd', 'compression_level': 3, 'row_group_size': 512_000},
+    'fast-read': {'compression': 'lz4', 'compression_level': None, 'row_group_size': 128_000},
+}
+
+
+def synthetic_companies(n_rows: int, seed: int = 0) -> pl.DataFrame:
+    """
+    Generate a synthetic frame shaped like companies.parquet.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of rows to generate.
+    seed : int, optional
+        Random seed (default is 0).
+
+    Returns
+    -------
+    pl.DataFrame
+        Frame with realistic cardinalities for the projected company columns.
+    """
+    rng = np.random.default_rng(seed)
+    statuses = ['Active', 'Dissolved', 'Liquidation', 'Open',
+                'Active - Proposal to Strike off', 'Closed']
+    types = ['Private limited company', 'Limited liability partnership',
+             'Public limited company', 'Overseas entity', 'Community interest company']
+    cities = [f'City {i}' for i in range(2_000)]
+    start = np.datetime64('1950-01-01')
+    incorporation = start + rng.integers(0, 27_000, n_rows).astype('timedelta64[D]')
+    cessation = incorporation + rng.integers(1, 10_000, n_rows).astype('timedelta64[D]')
+    return pl.DataFrame({
+        'company_number': [f'{i:08d}' for i in range(n_rows)],
+        'company_status': rng.choice(statuses, n_rows, p=[.6, .25, .05, .04, .04, .02]),
+        'company_type': rng.choice(types, n_rows),
+        'office_address': [f'{rng.integers(1, 999)} Street, England, {city}, AB1 2CD'
+                           for city in rng.choice(cities, n_rows)],
+        'incorporation_date': incorporation,
+        'date_of_cessation': cessation,
+        'jurisdiction': rng.choice(['England/Wales', 'Scotland', 'Northern Ireland'], n_rows),
+        'current_assets': rng.lognormal(8, 2, n_rows),
+    }).with_columns(pl.col('incorporation_date', 'date_of_cessation').cast(pl.Date))
+
+
+def candidate_configs() -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Enumerate the write settings compared by the benchmark.
+
+    Returns
+    -------
+    list of dict
+        One dict per combination of codec, level and row-group size, the
+        keyword arguments of `pl.LazyFrame.sink_parquet`.
+    """
+    return [
+        {'compression': codec, 'compression_level': level, 'row_group_size': row_group_size}
+        for codec, levels in CODEC_LEVELS.items()
+        for level, row_group_size in itertools.product(levels, ROW_GROUP_SIZES)
+    ]
+
+
+def benchmark_configs(logger: logging.Logger,
+                      data: pl.DataFrame,
+                      projected_cols: typing.List[str],
+                      configs: typing.Optional[typing.List[typing.Dict[str, typing.Any]]] = None,
+                      repeats: int = 3
+                      ) -> pl.DataFrame:
+    """
+    Measure write time, size and read times of a frame for each write setting.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    data : pl.DataFrame
+        Data to write.
+    projected_cols : list of str
+        Columns read in the projected read measurement.
+    configs : list of dict, optional
+        Write settings to compare (default is `candidate_configs()`).
+    repeats : int, optional
+        Number of timed repetitions, the fastest is kept (default is 3).
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per setting with the settings and the columns of `METRICS`.
+    """
+    configs = configs or candidate_configs()
+    projected_cols = [col for col in projected_cols if col in data.columns]
+    lf = data.lazy()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / 'bench.parquet'
+        for i, config in enumerate(configs, start=1):
+            try:
+                write_s, _ = wrangle.best_of(lambda: lf.sink_parquet(path, **config), repeats)
+                rows.append({
+                    **config,
+                    'write_s': write_s,
+                    'size_mb': path.stat().st_size / 2**20,
+                    'read_s': wrangle.best_of(lambda: pl.read_parquet(path), repeats)[0],
+                    'projected_read_s': wrangle.best_of(
+                        lambda: pl.read_parquet(path, columns=projected_cols), repeats)[0],
+                })
+                logger.info(f"[{i}/{len(configs)}] {config}: {rows[-1]['size_mb']:.1f} MB")
+            except Exception as e:
+                logger.error(f"Failed to benchmark {config}: {e}")
+    return pl.DataFrame(rows, schema_overrides={'compression_level': pl.Int64})
+
+
+def score_profile(results: pl.DataFrame, profile: str) -> pl.DataFrame:
+    """
+    Score benchmark results for a profile, lower is better.
+
+    Parameters
+    ----------
+    results : pl.DataFrame
+        Results of `benchmark_configs`.
+    profile : str
+        Name of a profile in `PROFILE_WEIGHTS`.
+
+    Returns
+    -------
+    pl.DataFrame
+        The results with a 'score' column, sorted by it.
+
+    Notes
+    -----
+    Each metric is divided by its best measured value before weighting, so
+    metrics with different units are comparable.
+    """
+    if profile not in PROFILE_WEIGHTS:
+        raise ValueError(f"Unknown profile '{profile}', "
+                         f"expected one of {list(PROFILE_WEIGHTS)}")
+    weights = PROFILE_WEIGHTS[profile]
+    score = pl.sum_horizontal([weight * pl.col(metric) / pl.col(metric).min()
+                               for metric, weight in weights.items()])
+    return results.with_columns(score.alias('score')).sort('score')
+
+
+def select_profile(results: pl.DataFrame,
+                   profile: str,
+                   use_dictionary: typing.Optional[bool] = True
+                   ) -> typing.Dict[str, typing.Any]:
+    """
+    Pick the write settings of a profile from measured results.
+
+    Parameters
+    ----------
+    results : pl.DataFrame
+        Results of `benchmark_configs`.
+    profile : str
+        Name of a profile in `PROFILE_WEIGHTS`.
+    use_dictionary : bool, optional
+        Only consider settings with this dictionary setting, for results of
+        older benchmarks that varied it. The Polars writer used by the
+        pipeline always applies dictionary encoding where it pays off, so the
+        default is True. Pass None to consider all settings.
+
+    Returns
+    -------
+    dict
+        The 'compression', 'compression_level' and 'row_group_size' options.
+    """
+    if use_dictionary is not None and 'use_dictionary' in results.columns:
+        results = results.filter(pl.col('use_dictionary') == use_dictionary)
+    best = score_profile(results, profile).row(0, named=True)
+    return {
+        # Older results use the pyarrow name of the 'uncompressed' codec
+        'compression': 'uncompressed' if best['compression'] == 'none' else best['compression'],
+        'compression_level': best['compression_level'],
+        'row_group_size': best['row_group_size'],
+    }
+
+
+def profile_write_options(logger: logging.Logger,
+                          profile: str,
+                          results_path: typing.Optional[pathlib.Path] = None
+                          ) -> typing.Dict[str, typing.Any]:
+    """
+    Return the write options of a profile for the pipeline.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    profile : str
+        Name of a profile in `PROFILE_WEIGHTS`.
+    results_path : pathlib.Path, optional
+        JSON results saved by `save_results`. `DEFAULT_PROFILES` is used when
+        the file is missing or unreadable.
+
+    Returns
+    -------
+    dict
+        Keyword arguments accepted by `data_ingest.stream_csv_to_parquet`.
+    """
+    if profile not in DEFAULT_PROFILES:
+        raise ValueError(f"Unknown profile '{profile}', "
+                         f"expected one of {list(DEFAULT_PROFILES)}")
+    if results_path is not None and results_path.exists():
+        try:
+            options = select_profile(load_results(results_path), profile)
+            logger.info(f"Profile '{profile}' from {results_path.name}: {options}")
+            return options
+        except Exception as e:
+            logger.error(f"Failed to select profile from {results_path}: {e}")
+    return dict(DEFAULT_PROFILES[profile])
+
+
+def save_results(results: pl.DataFrame, path: pathlib.Path) -> None:
+    """
+    Save benchmark results as JSON records.
+
+    Parameters
+    ----------
+    results : pl.DataFrame
+        Results of `benchmark_configs`.
+    path : pathlib.Path
+        Path of the JSON file.
+
+    Returns
+    -------
+    None
+    """
+    path.write_text(json.dumps(results.to_dicts(), indent=2))
+
+
+def load_results(path: pathlib.Path) -> pl.DataFrame:
+    """
+    Load benchmark results saved by `save_results`.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path of the JSON file.
+
+    Returns
+    -------
+    pl.DataFrame
+        The benchmark results.
+    """
+    return pl.DataFrame(json.loads(path.read_text()),
+                        schema_overrides={'compression_level': pl.Int64})
+
+
+if __name__ == '__main__':
+    import data_pipeline
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--source', type=pathlib.Path,
+                        help='Parquet file to benchmark on')
+    source.add_argument('--synthetic', type=int, metavar='ROWS',
+                        help='Benchmark on this many synthetic company rows')
+    parser.add_argument('--dataset', default='companies', choices=list(PROJECTED_COLUMNS),
+                        help='Dataset whose projected columns are read')
+    parser.add_argument('--rows', type=int, help='Only use the first ROWS rows of --source')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--data-dir', type=pathlib.Path, default=data_pipeline.DATA_PATH,
+                        help='Data directory the pipeline reads the results from')
+    parser.add_argument('--out', type=pathlib.Path,
+                        help='Results file (default is <data-dir>/parquet_benchmark.json)')
+    args = parser.parse_args()
+    out = args.out or args.data_dir / data_pipeline.BENCHMARK_RESULTS_NAME
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger('parquet_benchmark')
+
+    if args.source:
+        data = pl.scan_parquet(args.source)
+        data = (data.head(args.rows) if args.rows else data).collect()
+    else:
+        data = synthetic_companies(args.synthetic)
+
+    results = benchmark_configs(logger, data,
+                                PROJECTED_COLUMNS[args.dataset],
+                                repeats=args.repeats)
+    save_results(results, out)
+    logger.info(f"Saved the results to {out}")
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        print(results.sort('size_mb'))
+        for profile in PROFILE_WEIGHTS:
+            print(f"{profile}: {select_profile(results, profile)}")
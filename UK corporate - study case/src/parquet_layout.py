@@ -0,0 +1,463 @@
+"""
+Parquet Layout Module for UK Corporate Data.
+
+This module writes the ingested Parquet files as Hive-partitioned datasets
+(`<key>=<value>/` directories) and reads them back with partition pruning, so
+queries filtered on a partition key only open the matching directories.
+
+Partition keys are configurable per dataset. Besides plain columns, derived
+keys such as `incorporation_year` are computed on the fly from their source
+column while writing.
+
+It also rewrites Parquet files sorted by a key (`company_number`) with
+row-group statistics, a page index and Bloom filters, and reads the rows of a
+few keys back while only touching the row groups that can hold them.
+
+Reads can go through the memory-mapped Arrow IPC cache of `arrow_cache`, so
+repeated reads of a dataset skip the Parquet decompression.
+
+Future Improvements:
+---------------------
+1. Persist the partition keys in a small manifest next to each dataset.
+2. Compact small partitions into fewer files.
+"""
+import os
+import logging
+import pathlib
+import typing
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import arrow_cache
+import wrangle
+
+try:
+    import duckdb
+except ImportError:  # Optional, only used to probe Bloom filters
+    duckdb = None
+
+
+PARTITION_KEYS = {
+    'companies': ['company_status', 'incorporation_year'],
+    'officers_and_owners': ['is_owner'],
+}
+# Partition keys that are not stored columns, computed while writing
+DERIVED_COLUMNS = {
+    'incorporation_year': pc.year(ds.field('incorporation_date')),
+}
+# Sort key and Bloom filter columns of the sorted layout. None sets the number
+# of distinct values of a filter to the row-group size.
+SORT_KEY = 'company_number'
+BLOOM_FILTER_NDV = {
+    'company_number': None,
+    'nationality': 5_000,
+}
+SORTED_ROW_GROUP_SIZE = 100_000
+# Types of the partition values, which are stored as strings in the paths
+HIVE_DTYPES = {
+    'company_status': pl.String,
+    'company_type': pl.String,
+    'incorporation_year': pl.Int64,
+    'is_owner': pl.Boolean,
+}
+
+
+def partitioned_path(dataset: pathlib.Path) -> pathlib.Path:
+    """
+    Return the directory a partitioned dataset is written to.
+
+    Parameters
+    ----------
+    dataset : pathlib.Path
+        Dataset path without suffix, e.g. `data/companies`.
+
+    Returns
+    -------
+    pathlib.Path
+        The `<dataset>_partitioned` directory next to the dataset.
+    """
+    return dataset.with_name(f'{dataset.name}_partitioned')
+
+
+def write_partitioned(logger: logging.Logger,
+                      source: pathlib.Path,
+                      out_dir: pathlib.Path,
+                      partition_by: typing.List[str],
+                      compression: str = 'zstd',
+                      compression_level: typing.Optional[int] = 3,
+                      row_group_size: typing.Optional[int] = None
+                      ) -> bool:
+    """
+    Rewrite a Parquet file as a Hive-partitioned dataset.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    source : pathlib.Path
+        Path to the source Parquet file.
+    out_dir : pathlib.Path
+        Directory of the partitioned dataset. Existing partitions are replaced.
+    partition_by : list of str
+        Partition keys, either source columns or keys of `DERIVED_COLUMNS`.
+    compression : str, optional
+        Codec of the partition files (default is 'zstd'), with the names of
+        `pl.LazyFrame.sink_parquet`.
+    compression_level : int, optional
+        Compression level of the codec (default is 3).
+    row_group_size : int, optional
+        Maximum rows per row group. pyarrow's default when None.
+
+    Returns
+    -------
+    bool
+        True if the dataset was written, False otherwise.
+
+    Notes
+    -----
+    - The source is scanned in record batches, so memory stays bounded.
+    - Partition columns are stored in the paths, not inside the files.
+    """
+    try:
+        dataset = ds.dataset(source, format='parquet')
+        columns = {name: ds.field(name) for name in dataset.schema.names}
+        columns.update({key: DERIVED_COLUMNS[key] for key in partition_by
+                        if key in DERIVED_COLUMNS})
+        # Partition values are written as plain values, not dictionary codes
+        for key in partition_by:
+            if key in dataset.schema.names and pa.types.is_dictionary(dataset.schema.field(key).type):
+                columns[key] = ds.field(key).cast(dataset.schema.field(key).type.value_type)
+        scanner = dataset.scanner(columns=columns)
+        partition_schema = pa.schema([scanner.projected_schema.field(key)
+                                      for key in partition_by])
+        row_groups = {} if row_group_size is None else {'max_rows_per_group': row_group_size}
+        ds.write_dataset(
+            scanner,
+            out_dir,
+            format='parquet',
+            partitioning=ds.partitioning(partition_schema, flavor='hive'),
+            existing_data_behavior='delete_matching',
+            file_options=ds.ParquetFileFormat().make_write_options(
+                # pyarrow names the Polars 'uncompressed' codec 'none'
+                compression='none' if compression == 'uncompressed' else compression,
+                compression_level=compression_level),
+            max_partitions=10_000,
+            max_open_files=1024,
+            **row_groups)
+        logger.info(f"Partitioned {source.name} by {partition_by} into {out_dir}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to partition {source}: {e}")
+        return False
+
+
+def scan_dataset(path: pathlib.Path,
+                 partition_by: typing.Optional[typing.List[str]] = None
+                 ) -> pl.LazyFrame:
+    """
+    Lazily scan a single Parquet file or a Hive-partitioned dataset.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Parquet file or partitioned dataset directory.
+    partition_by : list of str, optional
+        Partition keys of the dataset, used to type the partition columns.
+
+    Returns
+    -------
+    pl.LazyFrame
+        Lazy frame over the data. Filters on partition columns are pushed
+        down and prune the directories that cannot match.
+    """
+    if not path.is_dir():
+        return pl.scan_parquet(path)
+    hive_schema = None
+    if partition_by and all(key in HIVE_DTYPES for key in partition_by):
+        hive_schema = {key: HIVE_DTYPES[key] for key in partition_by}
+    return pl.scan_parquet(path / '**' / '*.parquet',
+                           hive_partitioning=True,
+                           hive_schema=hive_schema)
+
+
+def read_dataset(logger: logging.Logger,
+                 path: pathlib.Path,
+                 cols: typing.Optional[typing.List[str]] = None,
+                 predicate: typing.Optional[pl.Expr] = None,
+                 partition_by: typing.Optional[typing.List[str]] = None,
+                 cast: typing.Optional[typing.Dict[str, pl.DataType]] = None,
+                 cache: bool = False
+                 ) -> typing.Optional[pl.DataFrame]:
+    """
+    Read selected columns and rows of a Parquet file or partitioned dataset.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    path : pathlib.Path
+        Parquet file or partitioned dataset directory.
+    cols : list of str, optional
+        Columns to read. All columns are read when None.
+    predicate : pl.Expr, optional
+        Row filter. On a partitioned dataset, conditions on partition keys
+        skip the partitions that cannot match.
+    partition_by : list of str, optional
+        Partition keys of the dataset.
+    cast : dict, optional
+        Types to cast columns to after reading, e.g. the Enums of
+        `data_ingest.category_enums`. Columns not read are ignored.
+    cache : bool, optional
+        Read the columns through the Arrow IPC cache of `arrow_cache`
+        (default is False). The cache holds every row of the columns read
+        and of the predicate, the predicate is applied to the mapped frame.
+
+    Returns
+    -------
+    pl.DataFrame or None
+        The data read, or None if reading failed.
+    """
+    if cache:
+        cached_cols = None if cols is None else list(dict.fromkeys(
+            cols + ([] if predicate is None else predicate.meta.root_names())))
+        df = arrow_cache.cached_frame(
+            logger, path,
+            lambda: read_dataset(logger, path, cols=cached_cols,
+                                 partition_by=partition_by, cast=cast),
+            key=repr((cached_cols, partition_by, cast)))
+        if df is None:
+            return None
+        if predicate is not None:
+            df = df.filter(predicate)
+        return df if cols is None else df.select(cols)
+    try:
+        lf = scan_dataset(path, partition_by)
+        if predicate is not None:
+            lf = lf.filter(predicate)
+        if cols is not None:
+            lf = lf.select(cols)
+        if cast:
+            names = lf.collect_schema().names()
+            lf = lf.cast({col: dtype for col, dtype in cast.items() if col in names})
+        return lf.collect()
+    except Exception as e:
+        logger.error(f"Failed to read {path}: {e}")
+        return None
+
+
+def write_sorted(logger: logging.Logger,
+                 source: pathlib.Path,
+                 dest: pathlib.Path,
+                 sort_by: str = SORT_KEY,
+                 bloom_filter_ndv: typing.Optional[typing.Dict[str, typing.Optional[int]]] = None,
+                 row_group_size: typing.Optional[int] = SORTED_ROW_GROUP_SIZE,
+                 compression: str = 'zstd',
+                 compression_level: typing.Optional[int] = 3
+                 ) -> bool:
+    """
+    Rewrite a Parquet file sorted by a key, with page index and Bloom filters.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    source : pathlib.Path
+        Path to the source Parquet file.
+    dest : pathlib.Path
+        Path of the sorted file. May be the same as `source`.
+    sort_by : str, optional
+        Column to sort by (default is 'company_number').
+    bloom_filter_ndv : dict, optional
+        Expected number of distinct values per row group of each column that
+        gets a Bloom filter (default is `BLOOM_FILTER_NDV`). Columns missing
+        from the file are ignored.
+    row_group_size : int, optional
+        Rows per row group (default is 100,000, also used when None). Smaller
+        groups make lookups touch less data.
+    compression : str, optional
+        Codec of the sorted file (default is 'zstd'), with the names of
+        `pl.LazyFrame.sink_parquet`.
+    compression_level : int, optional
+        Compression level of the codec (default is 3).
+
+    Returns
+    -------
+    bool
+        True if the file was written, False otherwise.
+
+    Notes
+    -----
+    - The sort runs on the Polars streaming engine into a temporary file,
+      which is then rewritten batch by batch into a second one, so memory
+      stays bounded. `dest` is only replaced once the rewrite succeeded, so
+      a failure leaves it, and `source`, untouched.
+    - Statistics are always written, lookups rely on them.
+    - Min/max statistics of the sorted key make row groups disjoint, so a
+      lookup touches one row group per key. Bloom filters also let unsorted
+      columns such as `nationality` skip row groups.
+    - Bloom filters need a pyarrow version that supports writing them. Older
+      versions write the file without them and log a warning.
+    """
+    bloom_filter_ndv = BLOOM_FILTER_NDV if bloom_filter_ndv is None else bloom_filter_ndv
+    row_group_size = row_group_size or SORTED_ROW_GROUP_SIZE
+    tmp = dest.with_suffix('.sorting.parquet')
+    rewritten = dest.with_suffix('.sorted.parquet')
+    try:
+        pl.scan_parquet(source).sort(sort_by).sink_parquet(tmp, row_group_size=row_group_size)
+        sorted_file = pq.ParquetFile(tmp)
+        names = sorted_file.schema_arrow.names
+        options = {
+            # pyarrow names the Polars 'uncompressed' codec 'none'
+            'compression': 'none' if compression == 'uncompressed' else compression,
+            'compression_level': compression_level,
+            'write_statistics': True,
+            'write_page_index': True,
+        }
+        bloom_filters = {col: {'ndv': ndv or row_group_size, 'fpp': 0.01}
+                         for col, ndv in bloom_filter_ndv.items() if col in names}
+        try:
+            writer = pq.ParquetWriter(rewritten, sorted_file.schema_arrow,
+                                      bloom_filter_options=bloom_filters, **options)
+        except TypeError:
+            logger.warning("This pyarrow version cannot write Bloom filters, writing without them")
+            writer = pq.ParquetWriter(rewritten, sorted_file.schema_arrow, **options)
+        with writer:
+            for batch in sorted_file.iter_batches(batch_size=row_group_size):
+                writer.write_batch(batch, row_group_size=row_group_size)
+        os.replace(rewritten, dest)
+        logger.info(f"Sorted {source.name} by {sort_by} into {dest}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to sort {source}: {e}")
+        rewritten.unlink(missing_ok=True)
+        return False
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def matching_row_groups(path: pathlib.Path,
+                        column: str,
+                        values: typing.Iterable[typing.Any]
+                        ) -> typing.List[int]:
+    """
+    List the row groups of a Parquet file that may contain any of the values.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path to the Parquet file.
+    column : str
+        Column to look the values up in.
+    values : iterable
+        Values to look up.
+
+    Returns
+    -------
+    list of int
+        Indices of the row groups whose min/max statistics cover a value and,
+        when DuckDB is installed, whose Bloom filter does not exclude it.
+    """
+    values = sorted(set(values))
+    metadata = pq.ParquetFile(path).metadata
+    col_idx = metadata.schema.to_arrow_schema().get_field_index(column)
+    candidates = []
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(col_idx).statistics
+        if stats is None or not stats.has_min_max:
+            candidates.append(i)
+        elif any(stats.min <= value <= stats.max for value in values):
+            candidates.append(i)
+
+    if duckdb is not None and metadata.row_group(0).column(col_idx).bloom_filter_offset:
+        maybe = set()
+        for value in values:
+            probe = duckdb.execute("SELECT row_group_id FROM parquet_bloom_probe(?, ?, ?) "
+                                   "WHERE NOT bloom_filter_excludes",
+                                   [str(path), column, value]).fetchall()
+            maybe.update(row_group for (row_group,) in probe)
+        candidates = [i for i in candidates if i in maybe]
+    return candidates
+
+
+def lookup_rows(logger: logging.Logger,
+                path: pathlib.Path,
+                values: typing.Iterable[typing.Any],
+                column: str = SORT_KEY,
+                cols: typing.Optional[typing.List[str]] = None
+                ) -> typing.Optional[pl.DataFrame]:
+    """
+    Read the rows matching a few values, touching only matching row groups.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    path : pathlib.Path
+        Path to a Parquet file, ideally written by `write_sorted`.
+    values : iterable
+        Values to look up, e.g. a few company numbers.
+    column : str, optional
+        Column to look the values up in (default is 'company_number').
+    cols : list of str, optional
+        Columns to return. All columns are returned when None.
+
+    Returns
+    -------
+    pl.DataFrame or None
+        The matching rows, or None if the lookup failed.
+    """
+    try:
+        values = list(values)
+        row_groups = matching_row_groups(path, column, values)
+        parquet_file = pq.ParquetFile(path)
+        read_cols = None if cols is None else list(dict.fromkeys([column, *cols]))
+        table = parquet_file.read_row_groups(row_groups, columns=read_cols)
+        # Dictionary columns, such as Enums, are matched on their values
+        value_type = table[column].type
+        if pa.types.is_dictionary(value_type):
+            value_type = value_type.value_type
+        table = table.filter(pc.is_in(table[column], pa.array(values, value_type)))
+        logger.info(f"Lookup of {len(values)} values in {path.name} touched "
+                    f"{len(row_groups)}/{parquet_file.metadata.num_row_groups} row groups")
+        df = pl.from_arrow(table)
+        return df if cols is None else df.select(cols)
+    except Exception as e:
+        logger.error(f"Failed to look up {column} in {path}: {e}")
+        return None
+
+
+def benchmark_lookup(logger: logging.Logger,
+                     path: pathlib.Path,
+                     values: typing.List[typing.Any],
+                     column: str = SORT_KEY,
+                     repeats: int = 5
+                     ) -> typing.Dict[str, float]:
+    """
+    Compare `lookup_rows` against a full scan filtering the same values.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    path : pathlib.Path
+        Path to the Parquet file.
+    values : list
+        Values to look up.
+    column : str, optional
+        Column to look the values up in (default is 'company_number').
+    repeats : int, optional
+        Number of timed repetitions, the fastest is kept (default is 5).
+
+    Returns
+    -------
+    dict
+        Best wall time in seconds of 'full_scan' and 'lookup', and 'speedup'.
+    """
+    full_scan, _ = wrangle.best_of(
+        lambda: pl.read_parquet(path).filter(pl.col(column).is_in(values)), repeats)
+    lookup, _ = wrangle.best_of(lambda: lookup_rows(logger, path, values, column), repeats)
+    return {'full_scan': full_scan, 'lookup': lookup, 'speedup': full_scan / lookup}
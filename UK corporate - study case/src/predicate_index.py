@@ -0,0 +1,242 @@
+"""
+Predicate Index Module for the UK Corporate Analysis.
+
+The dashboard counts groups of the same frames under a handful of row filters
+(owners, non-owners, UK nationals, UK residents, active companies) combined
+in several ways. Running each filter with `pd.DataFrame.query` re-parses and
+re-evaluates it and copies the matching rows into a new frame.
+
+A predicate index computes these filters once instead:
+
+- every column used as a group key or in a filter is factorized once, and
+  comparisons are evaluated on the distinct values, then broadcast to the
+  rows through the integer codes,
+- every comparison (e.g. `nationality != 'United Kingdom'`) is stored as a
+  bitmap, one bit per row packed with `np.packbits`, and reused by all the
+  filters it appears in,
+- filters are combined from the bitmaps with AND, OR and NOT, and cached too,
+- groups are counted with `np.bincount` over the codes of the matching rows,
+  so no frame is filtered or copied.
+
+Filters are written in the `pd.DataFrame.query` syntax used by the analysis:
+comparisons of a column with `==`, `!=`, `in` and `not in`, combined with
+`and`, `or`, `not` and parentheses. Missing values compare as in pandas:
+they are never equal to a value and always different from it.
+
+The index is a dict, see `build_index`. It holds a reference to the frame,
+not a copy, so the frame must not be modified while the index is in use.
+
+Future Improvements:
+---------------------
+1. Support the ordering comparisons (`<`, `>=`) on numeric columns.
+2. Count with the bitmaps directly (`np.bitwise_count`) for filters without keys.
+"""
+import ast
+import typing
+
+import numpy as np
+import pandas as pd
+
+
+SUPPORTED_SYNTAX = ("comparisons of a column with a literal or a list of literals by "
+                    "==, !=, in and not in, combined with and, or, not and parentheses")
+
+
+def build_index(df: pd.DataFrame) -> typing.Dict[str, typing.Any]:
+    """
+    Create an empty predicate index over a frame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Frame to index. Not copied.
+
+    Returns
+    -------
+    dict
+        The index: the 'frame', its 'length', the factorized columns
+        ('codes', column to codes and sorted distinct values) and the
+        'bitmaps' of the comparisons and filters evaluated so far. Both are
+        filled on first use.
+    """
+    return {'frame': df, 'length': len(df), 'codes': {}, 'bitmaps': {}}
+
+
+def factorize(index: typing.Dict[str, typing.Any],
+              col: str
+              ) -> typing.Tuple[np.ndarray, typing.Any]:
+    """Return the codes and sorted distinct values of a column, factorized once."""
+    if col not in index['codes']:
+        index['codes'][col] = pd.factorize(index['frame'][col], sort=True)
+    return index['codes'][col]
+
+
+def bitmap_and(*bitmaps: np.ndarray) -> np.ndarray:
+    """Return the rows set in all the bitmaps."""
+    return np.bitwise_and.reduce(bitmaps)
+
+
+def bitmap_or(*bitmaps: np.ndarray) -> np.ndarray:
+    """Return the rows set in any of the bitmaps."""
+    return np.bitwise_or.reduce(bitmaps)
+
+
+def bitmap_not(bitmap: np.ndarray, length: int) -> np.ndarray:
+    """Return the rows not set in a bitmap of `length` rows, padding bits left unset."""
+    inverted = np.bitwise_not(bitmap)
+    if length % 8:
+        inverted[-1] &= np.uint8(0xFF << (8 - length % 8) & 0xFF)
+    return inverted
+
+
+def to_mask(index: typing.Dict[str, typing.Any], bitmap: np.ndarray) -> np.ndarray:
+    """Unpack a bitmap to a boolean mask over the rows of the indexed frame."""
+    return np.unpackbits(bitmap, count=index['length']).view(bool)
+
+
+def _comparison(index: typing.Dict[str, typing.Any],
+                col: str,
+                values: typing.Tuple[typing.Any, ...],
+                negate: bool
+                ) -> np.ndarray:
+    """Return the bitmap of a column being (or not being) one of `values`."""
+    key = (col, values, negate)
+    if key not in index['bitmaps']:
+        codes, uniques = factorize(index, col)
+        hits = pd.Index(uniques).isin(list(values))
+        # Missing values have code -1 and pick the last entry
+        lookup = np.append(~hits, True) if negate else np.append(hits, False)
+        index['bitmaps'][key] = np.packbits(lookup[codes])
+    return index['bitmaps'][key]
+
+
+def _unsupported(expression: str) -> ValueError:
+    """Return the error raised for a filter outside the supported subset."""
+    return ValueError(f"Unsupported filter expression: {expression}, "
+                      f"filters support {SUPPORTED_SYNTAX}")
+
+
+def _literal(node: ast.AST) -> typing.Tuple[typing.Any, ...]:
+    """Return the values of a literal, or of a list or tuple of literals, as a tuple."""
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return tuple(ast.literal_eval(element) for element in node.elts)
+    return (ast.literal_eval(node),)
+
+
+def _evaluate(index: typing.Dict[str, typing.Any], node: ast.AST) -> np.ndarray:
+    """Return the bitmap of a parsed filter."""
+    if isinstance(node, ast.BoolOp):
+        combine = bitmap_and if isinstance(node.op, ast.And) else bitmap_or
+        return combine(*[_evaluate(index, value) for value in node.values])
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return bitmap_not(_evaluate(index, node.operand), index['length'])
+    if isinstance(node, ast.Compare) and len(node.ops) == 1 and isinstance(node.left, ast.Name):
+        op = node.ops[0]
+        if isinstance(op, (ast.Eq, ast.NotEq, ast.In, ast.NotIn)):
+            try:
+                values = _literal(node.comparators[0])
+            except ValueError:
+                # Compared to a column or an expression
+                raise _unsupported(ast.unparse(node)) from None
+            return _comparison(index, node.left.id, values,
+                               negate=isinstance(op, (ast.NotEq, ast.NotIn)))
+    raise _unsupported(ast.unparse(node))
+
+
+def bitmap(index: typing.Dict[str, typing.Any], where: str) -> np.ndarray:
+    """
+    Return the bitmap of the rows matching a filter.
+
+    Parameters
+    ----------
+    index : dict
+        Predicate index, see `build_index`.
+    where : str
+        Filter in the syntax described in the module docstring, e.g.
+        "is_owner == True and nationality != 'United Kingdom'".
+
+    Returns
+    -------
+    np.ndarray
+        The rows as bits packed with `np.packbits`. Evaluated once per filter,
+        from the comparisons shared with the other filters.
+
+    Raises
+    ------
+    ValueError
+        If the filter uses syntax outside the supported subset.
+    """
+    if where not in index['bitmaps']:
+        try:
+            tree = ast.parse(where.strip(), mode='eval')
+        except SyntaxError:
+            # e.g. the '@variable' references of pd.DataFrame.query
+            raise _unsupported(where) from None
+        index['bitmaps'][where] = _evaluate(index, tree.body)
+    return index['bitmaps'][where]
+
+
+def rows(index: typing.Dict[str, typing.Any], where: str) -> np.ndarray:
+    """Return the positions of the rows matching a filter."""
+    return np.flatnonzero(to_mask(index, bitmap(index, where)))
+
+
+def split(index: typing.Dict[str, typing.Any],
+          where: str
+          ) -> typing.Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split the indexed frame into the rows matching a filter and the others, both reindexed."""
+    mask = to_mask(index, bitmap(index, where))
+    df = index['frame']
+    return tuple(df.take(np.flatnonzero(selected)).reset_index(drop=True)
+                 for selected in (mask, ~mask))
+
+
+def group_counts(index: typing.Dict[str, typing.Any],
+                 by: typing.Union[str, typing.List[str]],
+                 where: typing.Optional[str] = None,
+                 top_n: typing.Optional[int] = None
+                 ) -> pd.DataFrame:
+    """
+    Count the rows matching a filter per group, without filtering the frame.
+
+    Parameters
+    ----------
+    index : dict
+        Predicate index, see `build_index`.
+    by : str or list of str
+        Column(s) to group by. Rows with a missing key are dropped, as by
+        `pd.DataFrame.groupby`.
+    where : str, optional
+        Filter of the counted rows, see `bitmap`.
+    top_n : int, optional
+        Number of top rows to keep.
+
+    Returns
+    -------
+    pd.DataFrame
+        The keys and 'size', sorted by descending size, ties ordered by key.
+        Categorical keys are returned as plain objects.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    factorized = [factorize(index, col) for col in by]
+    valid = np.logical_and.reduce([codes >= 0 for codes, _ in factorized])
+    if where:
+        valid &= to_mask(index, bitmap(index, where))
+    shape = tuple(len(uniques) for _, uniques in factorized)
+    codes = np.ravel_multi_index([codes[valid] for codes, _ in factorized], shape)
+    if np.prod(shape) <= index['length']:
+        sizes = np.bincount(codes, minlength=int(np.prod(shape)))
+        groups = np.flatnonzero(sizes)
+        sizes = sizes[groups]
+    else:
+        groups, sizes = np.unique(codes, return_counts=True)
+
+    grouped = pd.DataFrame({col: pd.Series(uniques).take(keys).to_numpy()
+                            for col, (_, uniques), keys
+                            in zip(by, factorized, np.unravel_index(groups, shape))})
+    grouped['size'] = sizes.astype('int64')
+    grouped = grouped.sort_values('size', ascending=False, kind='stable').reset_index(drop=True)
+    for col in by:
+        if isinstance(grouped[col].dtype, pd.CategoricalDtype):
+            grouped[col] = grouped[col].astype(object)
+    return grouped.head(top_n) if top_n else grouped
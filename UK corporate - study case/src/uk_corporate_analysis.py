@@ -25,31 +25,56 @@ Key Features:
     - Assembles all visualizations into an interactive HTML dashboard.
     - Utilizes Bootstrap for styling and responsiveness.
     - Includes a well-structured layout with separate sections for companies, officers, and nationality analysis.
+    - Shows the row count of every dataset, read from the profiles written at ingest (`data_profile`).
+
+5. **Stages**:
+    - Importing the module has no side effects. The work is split into callable stages:
+      `analyze` (load, wrangle and aggregate, persisted as Parquet) and `render` (charts and HTML).
+    - Both stages run from the command line through `cli.py`, with configurable paths.
+
+6. **Execution Backends**:
+    - Load, wrangle and aggregate run on pandas (the reference), Polars or DuckDB, selected
+      per run with `backend` (see `BACKENDS` and `analysis_backends.py`).
+    - `analysis_plan` expresses the whole analysis as one lazy Polars plan, collected at
+      once by `collect_plan`, printed by `explain_plan` and timed by `profile_plan`.
+    - `benchmark_backends` times the three backends and checks their aggregates agree,
+      `benchmark_process_companies` times the company wrangling in pandas against Polars.
 
 Future Improvements:
 ---------------------
-- Replace hardcoded file paths with configuration files or dynamic inputs.
 - Optimize performance by consolidating repetitive operations and queries.
 - Add detailed tooltips and interactivity to visualizations for enhanced usability.
 - Implement unit tests for key functions to ensure robustness.
 TODO> Clean code, optimize code, type hints
 """
+import time
+import string
 import typing
 import pathlib
 import logging
-import etl_tools
+import numpy as np
 import polars as pl
 import pandas as pd
 import datetime as dt
 from datetime import datetime
 
-import etl_logger
 import wrangle
-from re import compile
-import data_visualize as viz
+from re import compile, escape
+from urllib.parse import quote
+import parquet_layout as layout
+import data_ingest
+import data_profile
+import filings_analysis
+import analysis_backends
+import predicate_index
+import chart_render
 from countries import world_countries
 
 
+# Separators of compound nationalities, only the first nationality is mapped
+NATIONALITY_PATTERN = compile(f'[{escape(analysis_backends.NATIONALITY_SEPARATORS)}]')
+
+
 def create_html_file(logger: logging.Logger,
                      path: pathlib.Path,
                      html_content: str
@@ -96,11 +121,76 @@ def normalize_nationality(row: pd.Series,
     str or None
         Mapped country name or None.
     """
-    pattern = compile(r'[+;/,()&-]')
-    normalized_value = pattern.split(row)[0].strip().lower()
+    normalized_value = NATIONALITY_PATTERN.split(row)[0].strip().lower()
     return country_dict.get(normalized_value, None)
 
 
+def nationality_lookup(nationalities: pd.Series,
+                       country_dict: typing.Dict[str, str]
+                       ) -> pd.DataFrame:
+    """
+    Build the lookup table of distinct nationalities to countries.
+
+    Parameters
+    ----------
+    nationalities : pd.Series
+        Distinct raw nationalities.
+    country_dict : Dict[str, str]
+        Mapping of normalized nationalities to countries.
+
+    Returns
+    -------
+    pd.DataFrame
+        'nationality', its normalized 'key' (as `normalize_nationality`) and
+        'country', missing when the key is not in `country_dict`.
+    """
+    lookup = pd.DataFrame({'nationality': nationalities.astype(object).to_numpy()})
+    lookup['key'] = lookup['nationality'].str.split(NATIONALITY_PATTERN.pattern, n=1, regex=True)\
+        .str[0].str.strip().str.lower()
+    countries = pd.DataFrame({'key': list(country_dict), 'country': list(country_dict.values())})
+    return lookup.merge(countries, on='key', how='left')
+
+
+def normalize_nationalities(nationalities: pd.Series,
+                            country_dict: typing.Dict[str, str]
+                            ) -> typing.Tuple[pd.Series, pd.DataFrame]:
+    """
+    Map a column of nationalities to countries, once per distinct value.
+
+    Parameters
+    ----------
+    nationalities : pd.Series
+        Raw nationalities, object or categorical.
+    country_dict : Dict[str, str]
+        Mapping of normalized nationalities to countries.
+
+    Returns
+    -------
+    tuple
+        The countries, with the index of `nationalities` (None when unmapped
+        or missing), and the report of the unmapped nationalities: their
+        'nationality', 'key' and 'rows', most frequent first.
+
+    Notes
+    -----
+    The values are factorized, the lookup table of `nationality_lookup` is
+    built over the distinct values only and broadcast back through the
+    codes, so the cost of the normalization scales with the number of
+    distinct nationalities rather than rows.
+    """
+    codes, uniques = pd.factorize(nationalities)
+    lookup = nationality_lookup(pd.Series(uniques), country_dict)
+    countries = lookup['country'].to_numpy(dtype=object)
+    normalized = pd.Series(np.where(codes >= 0, countries[codes], None),
+                           index=nationalities.index, dtype=object)
+    normalized = normalized.where(normalized.notna(), None)
+
+    lookup['rows'] = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    unmapped = lookup.loc[lookup['country'].isna(), ['nationality', 'key', 'rows']]\
+        .sort_values('rows', ascending=False, kind='stable').reset_index(drop=True)
+    return normalized, unmapped
+
+
 def process_companies_data(logger: logging.Logger,
                            companies: pd.DataFrame,
                            english_countries: typing.List
@@ -122,27 +212,23 @@ def process_companies_data(logger: logging.Logger,
     pd.DataFrame
         Processed DataFrame.
     """
+    # Dates are typed at ingest, raw strings are parsed by column as well
     companies = companies.assign(
-        Year=lambda df: df['incorporation_date'].apply(wrangle.get_year),
-        city=lambda df: df['office_address'].apply(
-            lambda addr: wrangle.process_address(addr, logger)),
-        num_days_active=lambda df: df.apply(
-            lambda row: wrangle.days_between_dates(row, logger), axis=1),
-        Years_bracket=lambda df: pd.cut(
-            df['num_days_active'],
-            bins=[0, 360, 1800, 3600, 7200, float('inf')],
-            labels=['<1', '1-5y', '5-10y', '10-20y', '>20y']
-        )
+        Year=lambda df: wrangle.get_years(df['incorporation_date']),
+        city=lambda df: wrangle.extract_cities(df['office_address']),
+        num_days_active=lambda df: wrangle.days_active(df['incorporation_date'],
+                                                       df['date_of_cessation']),
+        Years_bracket=lambda df: wrangle.years_bracket(df['num_days_active'])
     )
-    companies.loc[companies['city'].isin(english_countries), 'city'] = companies.loc[companies['city'].isin(english_countries), 'office_address'].apply(
-        lambda address: wrangle.process_country(address, logger))
+    english = companies['city'].isin(english_countries)
+    companies.loc[english, 'city'] = wrangle.extract_countries(companies.loc[english, 'office_address'])
     return companies
 
 
 def process_officers_owners_data(officers_owners: pd.DataFrame,
                                  world_countries: typing.Dict,
                                  english_countries: typing.List
-                                 ) -> pd.DataFrame:
+                                 ) -> typing.Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Process officer and owner data.
 
@@ -157,18 +243,24 @@ def process_officers_owners_data(officers_owners: pd.DataFrame,
 
     Returns
     -------
-    pd.DataFrame
-        Processed DataFrame.
+    tuple
+        Processed DataFrame, and the report of the unmapped nationalities of
+        `normalize_nationalities`.
     """
-    officers_owners['country_of_residence'] = officers_owners['country_of_residence'].replace(
-        english_countries, 'United Kingdom')
-    officers_owners['nationality'] = officers_owners['nationality'].map(
-        lambda row: normalize_nationality(row, world_countries))
-    return officers_owners
+    # Works on both object and categorical columns without expanding categories
+    residence = officers_owners['country_of_residence']
+    if isinstance(residence.dtype, pd.CategoricalDtype) and 'United Kingdom' not in residence.cat.categories:
+        residence = residence.cat.add_categories('United Kingdom')
+    officers_owners['country_of_residence'] = residence.where(
+        ~residence.isin(english_countries), 'United Kingdom')
+    # Mapped once per distinct nationality
+    officers_owners['nationality'], unmapped = normalize_nationalities(
+        officers_owners['nationality'], world_countries)
+    return officers_owners, unmapped
 
 
 def prepare_grouped_data(df: pd.DataFrame,
-                         group_by_column: str,
+                         group_by_column: typing.Union[str, typing.List[str]],
                          top_n: int = None
                          ) -> pd.DataFrame:
     """
@@ -178,8 +270,8 @@ def prepare_grouped_data(df: pd.DataFrame,
     ----------
     df : pd.DataFrame
         Input DataFrame.
-    group_by_column : str
-        Column to group by.
+    group_by_column : str or list of str
+        Column(s) to group by.
     top_n : int, optional
         Number of top rows to keep.
 
@@ -188,43 +280,171 @@ def prepare_grouped_data(df: pd.DataFrame,
     pd.DataFrame
         Grouped and sorted DataFrame.
     """
+    group_by_columns = [group_by_column] if isinstance(group_by_column, str) else list(group_by_column)
     # Observed use to silence warning
     grouped_data = (
-        df.groupby([group_by_column], as_index=False, observed=True)
+        df.groupby(group_by_columns, as_index=False, observed=True)
           .size()
           .sort_values('size', ascending=False)
           .reset_index(drop=True)
     )
+    # Small result, plain labels can be relabelled freely downstream
+    for col in group_by_columns:
+        if isinstance(grouped_data[col].dtype, pd.CategoricalDtype):
+            grouped_data[col] = grouped_data[col].astype(object)
     if top_n:
         grouped_data = grouped_data.head(top_n)
     return grouped_data
 
 
+def top_n_other(df: pd.DataFrame,
+                col: str,
+                top_n: int = 10,
+                keep: str = 'first',
+                other: str = 'Other'
+                ) -> pd.DataFrame:
+    """
+    Keep the labels of the largest groups and sum all the others into one row.
+
+    The largest sizes are found by partial selection (`np.partition`),
+    without sorting the counts or relabelling the rows one by one.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Group counts with `col` and 'size', in any order.
+    col : str
+        Column holding the group labels.
+    top_n : int, optional
+        Number of largest groups keeping their label, at least 1 (default
+        is 10).
+    keep : str, optional
+        Which groups tie for the last place, as in `pd.DataFrame.nlargest`:
+        'first' (default) or 'last' keep the first or last ones in the order
+        of `df` up to `top_n` groups, 'all' keeps all of them.
+    other : str, optional
+        Label of the remaining groups (default is 'Other'). A group of `df`
+        already labelled `other` is summed into the same row, whether or not
+        it is in the top.
+
+    Returns
+    -------
+    pd.DataFrame
+        `col` and the summed 'size', sorted by `col`, with one `other` row
+        when any group falls outside the top or is labelled `other`.
+    """
+    if top_n < 1:
+        raise ValueError(f"top_n must be at least 1, got {top_n!r}")
+    if keep not in ('first', 'last', 'all'):
+        raise ValueError(f"keep must be 'first', 'last' or 'all', got {keep!r}")
+    labels = df[col].to_numpy(dtype=object)
+    sizes = df['size'].to_numpy()
+    if top_n >= len(sizes):
+        top = np.arange(len(sizes))
+    else:
+        # Size of the top_n-th largest group, found in linear time
+        threshold = np.partition(sizes, len(sizes) - top_n)[len(sizes) - top_n]
+        above = np.flatnonzero(sizes > threshold)
+        tied = np.flatnonzero(sizes == threshold)
+        if keep == 'first':
+            tied = tied[:top_n - len(above)]
+        elif keep == 'last':
+            tied = tied[len(tied) - (top_n - len(above)):]
+        top = np.concatenate([above, tied])
+    # Every row of a top label keeps it
+    labels = np.where(pd.Index(labels).isin(labels[top]), labels, other)
+    summed = pd.Series(sizes).groupby(labels).sum()
+    return pd.DataFrame({col: summed.index.to_numpy(dtype=object),
+                         'size': summed.to_numpy()})
+
+
+def group_counts(df: pd.DataFrame,
+                 by: typing.Union[str, typing.List[str]],
+                 where: typing.Optional[str] = None,
+                 top_n: int = None
+                 ) -> pd.DataFrame:
+    """
+    Count rows per group of the rows matching a filter, the pandas 'group_count'.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Input DataFrame.
+    by : str or list of str
+        Column(s) to group by.
+    where : str, optional
+        Row filter in the `pd.DataFrame.query` syntax supported by
+        `predicate_index`.
+    top_n : int, optional
+        Number of top rows to keep.
+
+    Returns
+    -------
+    pd.DataFrame
+        Grouped and sorted DataFrame, ties ordered by key, see
+        `predicate_index.group_counts`. The frame is not filtered.
+    """
+    return predicate_index.group_counts(predicate_index.build_index(df), by, where, top_n)
+
+
+def grouping_sets(df: pd.DataFrame,
+                  specs: typing.Dict[str, typing.Dict[str, typing.Any]]
+                  ) -> typing.Dict[str, pd.DataFrame]:
+    """
+    Compute several group counts in one pass, the pandas 'grouping_sets'.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Input DataFrame.
+    specs : dict
+        Grouping specifications keyed by result name, each with 'by' (column
+        or list of columns) and optionally 'where' (a `pd.DataFrame.query`
+        filter) and 'top_n', as the arguments of `group_counts`.
+
+    Returns
+    -------
+    dict
+        Grouped and sorted DataFrames keyed by name, as `group_counts`.
+
+    Notes
+    -----
+    All the sets share one `predicate_index`: every key column is factorized
+    once and every comparison of the filters evaluated once as a bitmap, the
+    filters are combined from the bitmaps. Groups are counted over the codes
+    of the matching rows, so the frame is never filtered, copied or re-grouped.
+    """
+    index = predicate_index.build_index(df)
+    return {name: predicate_index.group_counts(index, **spec) for name, spec in specs.items()}
+
+
 """
 Setup Environment: Define paths, initialize logger, and declare constants.
 
 This section includes:
 1. Path Definitions:
    - BASE_PATH: The base directory for data files.
-   - COMPANIES_DATA_PATH: Path to the companies data file.
-   - OFFICERS_OWNERS_DATA_PATH: Path to the officers and owners data file.
+   - DATA_PATH: Default data directory, holding the parquet files written by `data_pipeline`.
+   - RESULTS_PATH: Default directory of the aggregates written by `analyze` and read by `render`.
+   - HTML_PATH: Default path of the HTML dashboard.
+   - ARROW_CACHE: Whether the data is read through the Arrow IPC cache by default.
+   - BACKEND: Default execution backend of the analysis, one of `BACKENDS`.
 
-2. Logger Initialization:
-   - Creates a logger named 'logger' with a WARNING level and console handler.
-
-3. Constant Definitions:
+2. Constant Definitions:
    - COMPANIES_COLS_TO_EXCL: List of columns to exclude when processing companies data.
    - OFFICERS_OWNERS_COLS_TO_EXCL: List of columns to exclude when processing officers and owners data.
    - ENGLISH_COUNTRIES: List of English-speaking countries to be used for filtering or validation.
    - WORLD_COUNTIES: Flattened dictionary mapping normalized country names to their full names.
 """
 BASE_PATH = pathlib.Path(__file__).resolve().parent.parent
-COMPANIES_DATA_PATH = BASE_PATH / 'data' / 'companies.parquet'
-OFFICERS_OWNERS_DATA_PATH = BASE_PATH / 'data' / 'officers_and_owners.parquet'
-
-# Get logger
-console = logging.StreamHandler()
-logger = etl_logger.get_logger('logger', logging.WARNING, [console])
+DATA_PATH = BASE_PATH / 'data'
+RESULTS_PATH = DATA_PATH / 'results'
+HTML_PATH = BASE_PATH.parent / 'docs' / 'UK Corporate - Study.html'
+COMPANIES_DATA_PATH = DATA_PATH / 'companies.parquet'
+OFFICERS_OWNERS_DATA_PATH = DATA_PATH / 'officers_and_owners.parquet'
+# Read the data through the memory-mapped Arrow IPC cache written next to the
+# parquet files, see arrow_cache.py. Speeds up repeated runs, costs disk space
+ARROW_CACHE = False
 
 # Columns to exclude
 COMPANIES_COLS_TO_EXCL = ['next_accounts_overdue', 'confirmation_statement_overdue',
@@ -239,6 +459,21 @@ WORLD_COUNTIES = {val.lower(): country  # Normalize case
                   for country, values in world_countries.items()
                   for val in (values if isinstance(values, list) else [values])}
 ACTIVE_OPEN_LST = ['Active', 'Open']
+ACTIVE_FILTER = f"company_status in {ACTIVE_OPEN_LST}"
+# Execution backends of load, wrangle and aggregate. pandas is the reference,
+# Polars and DuckDB are implemented in analysis_backends.py
+BACKEND = 'pandas'
+BACKENDS = {
+    'pandas': {
+        'process_companies': process_companies_data,
+        'process_officers_owners': process_officers_owners_data,
+        'group_count': group_counts,
+        'grouping_sets': grouping_sets,
+        'collect': lambda df: df,
+    },
+    'polars': analysis_backends.POLARS_BACKEND,
+    'duckdb': analysis_backends.DUCKDB_BACKEND,
+}
 """
 Load and Process Data: Explain the use of Polars and Pandas, and improve efficiency and error handling.
 
@@ -251,8 +486,9 @@ This section performs the following steps:
    - Excludes unnecessary columns to optimize the data loading process by using predefined exclusion lists (`COMPANIES_COLS_TO_EXCL` and `OFFICERS_OWNERS_COLS_TO_EXCL`).
 
 3. **Data Transformation**:
-   - After filtering columns, the data is read into Polars DataFrames using `etl_tools.read_parquet`.
+   - After filtering columns, the data is read into Polars DataFrames using `parquet_layout.read_dataset`, from the partitioned layout when it exists and from the single parquet file otherwise.
    - Columns like `date_of_cessation` and `jurisdiction` are processed to fill missing values.
+   - Low-cardinality columns are cast to the Enums persisted at ingest, so they load as pandas Categoricals.
    - The final data is converted to Pandas DataFrames for compatibility with downstream workflows.
 
 4. **Potential Improvement**:
@@ -266,24 +502,111 @@ Why Polars and Pandas?
 - **Polars**: Efficient for columnar data processing, schema inspection, and lazy evaluation of large datasets.
 - **Pandas**: Widely compatible with existing Python workflows, providing flexibility for complex transformations and integrations.
 """
-# Scan parquet files
-companies = pl.scan_parquet(COMPANIES_DATA_PATH)
-officers_owners = pl.scan_parquet(OFFICERS_OWNERS_DATA_PATH)
-
-# Exclude columns
-companies_cols = [col for col in companies.collect_schema().names()
-                  if col not in COMPANIES_COLS_TO_EXCL]
-officers_owners_cols = [col for col in officers_owners.collect_schema().names()
-                        if col not in OFFICERS_OWNERS_COLS_TO_EXCL]
-
-# Load and process companies dataframe
-companies = etl_tools.read_parquet(logger, COMPANIES_DATA_PATH, cols=companies_cols)\
-    .with_columns([pl.col('date_of_cessation').fill_null(pl.lit(dt.datetime.today().date())),
-                   pl.col('jurisdiction').fill_null('UK establishment')])\
-    .to_pandas()
-# Load officers and owners dataframe
-officers_owners = etl_tools.read_parquet(logger, OFFICERS_OWNERS_DATA_PATH,
-                                         cols=officers_owners_cols).to_pandas()
+
+
+def dataset_source(data_dir: pathlib.Path,
+                   name: str
+                   ) -> typing.Tuple[pathlib.Path, typing.List[str], typing.Dict[str, pl.Enum]]:
+    """
+    Locate a dataset written by `data_pipeline` in a data directory.
+
+    Parameters
+    ----------
+    data_dir : pathlib.Path
+        Data directory.
+    name : str
+        Dataset name, e.g. 'companies'.
+
+    Returns
+    -------
+    tuple
+        The path to read (the partitioned layout when it exists, the single
+        parquet file otherwise), its partition keys and the Enum types of its
+        categorical columns.
+    """
+    parquet_path = (data_dir / name).with_suffix('.parquet')
+    partitions_path = layout.partitioned_path(data_dir / name)
+    path = partitions_path if partitions_path.exists() else parquet_path
+    enums = data_ingest.category_enums(data_ingest.category_dictionary_path(parquet_path))
+    return path, layout.PARTITION_KEYS.get(name, []), enums
+
+
+def load_data(logger: logging.Logger,
+              data_dir: pathlib.Path = DATA_PATH,
+              cache: bool = ARROW_CACHE,
+              backend: str = BACKEND
+              ) -> typing.Tuple[typing.Any, typing.Any, typing.Any]:
+    """
+    Load active companies, not active companies and officers/owners.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    data_dir : pathlib.Path, optional
+        Directory holding the parquet files (default is `DATA_PATH`).
+    cache : bool, optional
+        Read through the memory-mapped Arrow IPC cache (default is
+        `ARROW_CACHE`). The cache is written on the first run and rewritten
+        when the parquet files change. Ignored by the 'duckdb' backend.
+    backend : str, optional
+        Execution backend, one of `BACKENDS` (default is `BACKEND`).
+
+    Returns
+    -------
+    tuple
+        Active companies, not active companies and officers/owners, as pandas
+        DataFrames, or as Polars lazy frames or DuckDB relations for the
+        other backends.
+    """
+    # Prefer the partitioned layouts written by data_pipeline, so filtered reads
+    # only open the partitions they need
+    companies_path, companies_keys, companies_enums = dataset_source(data_dir, 'companies')
+    officers_owners_path, officers_owners_keys, officers_owners_enums = dataset_source(
+        data_dir, 'officers_and_owners')
+
+    # Scan parquet files
+    companies = layout.scan_dataset(companies_path, companies_keys)
+    officers_owners = layout.scan_dataset(officers_owners_path, officers_owners_keys)
+
+    # Exclude columns
+    companies_cols = [col for col in companies.collect_schema().names()
+                      if col not in COMPANIES_COLS_TO_EXCL + list(layout.DERIVED_COLUMNS)]
+    officers_owners_cols = [col for col in officers_owners.collect_schema().names()
+                            if col not in OFFICERS_OWNERS_COLS_TO_EXCL]
+    fill_null = {'date_of_cessation': dt.datetime.today().date(),
+                 'jurisdiction': 'UK establishment'}
+
+    if backend != 'pandas':
+        # Lazy frames or relations, nothing is read until the aggregates are computed
+        scan, split = BACKENDS[backend]['scan'], BACKENDS[backend]['split']
+        companies = scan(logger, companies_path, companies_cols, companies_keys,
+                         companies_enums, fill_null, cache)
+        active_companies, not_active_companies = split(companies, 'company_status', ACTIVE_OPEN_LST)
+        officers_owners = scan(logger, officers_owners_path, officers_owners_cols,
+                               officers_owners_keys, officers_owners_enums, cache=cache)
+        return active_companies, not_active_companies, officers_owners
+
+    # Load companies once and split them on the bitmap of ACTIVE_FILTER. The
+    # dashboard charts both sides, and owners and non-owners alike, so every
+    # partition is read: one read and an in-memory split beat two pruned reads
+    companies = layout.read_dataset(logger, companies_path, cols=companies_cols,
+                                    partition_by=companies_keys, cast=companies_enums,
+                                    cache=cache)\
+        .with_columns([pl.col(col).fill_null(pl.lit(value)) for col, value in fill_null.items()])\
+        .to_pandas()
+    active_companies, not_active_companies = predicate_index.split(
+        predicate_index.build_index(companies), ACTIVE_FILTER)
+    # Load officers and owners dataframe
+    officers_owners = layout.read_dataset(logger, officers_owners_path,
+                                          cols=officers_owners_cols,
+                                          partition_by=officers_owners_keys,
+                                          cast=officers_owners_enums,
+                                          cache=cache)\
+        .to_pandas()
+    return active_companies, not_active_companies, officers_owners
+
+
 """
 Data Wrangling: Process and split company data.
 
@@ -295,7 +618,7 @@ This section performs the following steps:
    - The `ENGLISH_COUNTRIES` dictionary is passed to `process_officers_owners_data` and 'process_companies_data' for consistent normalization of country names.
 
 2. **Splitting Active and Inactive Companies**:
-   - Splits the `companies` dataset into `active_companies` and `not_active_companies` based on the `company_status` column.
+   - The `companies` dataset is read once and split into `active_companies` and `not_active_companies` on the bitmap of `ACTIVE_FILTER` (`predicate_index`), without re-evaluating the filter per frame.
    - Active companies are identified by statuses such as "Active" or "Open".
    - Inactive companies include all other statuses.
 
@@ -307,16 +630,56 @@ Future Improvements:
 - Ensure consistency in the definition of active/inactive statuses by externalizing the list of statuses to a configuration file or constant.
 - Consider handling edge cases where `company_status` values are missing or undefined.
 """
-# Apply processing functions
-companies = process_companies_data(logger, companies, ENGLISH_COUNTRIES)
-officers_owners = process_officers_owners_data(officers_owners,
-                                               WORLD_COUNTIES,
-                                               ENGLISH_COUNTRIES)
 
-# Split active and inactive companies
-active_companies = companies.query("company_status in @ACTIVE_OPEN_LST")
-not_active_companies = companies.query(
-    "company_status not in @ACTIVE_OPEN_LST")
+
+def wrangle_data(logger: logging.Logger,
+                 active_companies: typing.Any,
+                 not_active_companies: typing.Any,
+                 officers_owners: typing.Any,
+                 backend: str = BACKEND
+                 ) -> typing.Tuple[typing.Any, typing.Any, typing.Any, typing.Any]:
+    """
+    Apply the processing functions to the loaded data.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    active_companies : pd.DataFrame
+        Active companies, in the frame type of `backend`.
+    not_active_companies : pd.DataFrame
+        Not active companies, in the frame type of `backend`.
+    officers_owners : pd.DataFrame
+        Officer and owner data, in the frame type of `backend`.
+    backend : str, optional
+        Execution backend, one of `BACKENDS` (default is `BACKEND`).
+
+    Returns
+    -------
+    tuple
+        Processed active companies, not active companies and officers/owners,
+        and the report of the nationalities `WORLD_COUNTIES` does not map
+        ('nationality', 'key' and 'rows', most frequent first), all in the
+        frame type of `backend`.
+    """
+    process_companies = BACKENDS[backend]['process_companies']
+    process_officers_owners = BACKENDS[backend]['process_officers_owners']
+    # Apply processing functions, active and inactive companies were split at load
+    active_companies = process_companies(logger, active_companies, ENGLISH_COUNTRIES)
+    not_active_companies = process_companies(logger, not_active_companies, ENGLISH_COUNTRIES)
+    officers_owners, unmapped = process_officers_owners(officers_owners,
+                                                        WORLD_COUNTIES,
+                                                        ENGLISH_COUNTRIES)
+    return active_companies, not_active_companies, officers_owners, unmapped
+
+
+def log_unmapped_nationalities(logger: logging.Logger, unmapped: pd.DataFrame) -> None:
+    """Log how many nationalities `WORLD_COUNTIES` does not map, and the most frequent ones."""
+    if len(unmapped):
+        logger.info(f"{len(unmapped)} nationalities not in WORLD_COUNTIES "
+                    f"({unmapped['rows'].sum()} rows), most frequent: "
+                    f"{', '.join(map(str, unmapped['nationality'].head(5)))}")
+
 
 """
 Create DataFrame Visualizations: Generate and transform data for visualization.
@@ -363,92 +726,634 @@ Purpose:
 - Handles missing values and labels non-top entries for better interpretability in visual outputs.
 
 Future Improvements:
-- Consolidate repetitive logic (e.g., top N labeling and grouping) into reusable helper functions.
 - Parameterize thresholds (e.g., size > 5, top 10) for flexibility.
 - Optimize query performance by reducing redundant sorting and filtering.
 """
-# Process data for active companies
-active_city = prepare_grouped_data(active_companies, 'city', top_n=50)
-active_company = prepare_grouped_data(active_companies, 'company_type')
-active_years = prepare_grouped_data(active_companies, 'Years_bracket')
-
-# Process data for not active companies
-not_active_city = prepare_grouped_data(not_active_companies, 'city', top_n=50)
-not_active_company = prepare_grouped_data(not_active_companies, 'company_type')
-not_active_years = prepare_grouped_data(not_active_companies, 'Years_bracket')
-
-# Get Officer roles overview
-officer_roles_df = prepare_grouped_data(officers_owners, 'officer_role')\
-    .sort_values('size', ascending=False)\
-    .assign(oficcer_role=lambda df: df['officer_role'].replace('', 'Unknown'))
-
-# Get occupations overview
-occupations_df = prepare_grouped_data(officers_owners, 'occupation')\
-    .query("size > 5 and occupation != ''")\
-    .sort_values('size', ascending=False)\
-    .reset_index(drop=True)\
-    .assign(occupation=lambda df: df['occupation']
-            .replace('none', 'Unknown').str.title())
-
-occupations_df = viz.label_top_rows(occupations_df, 'occupation', top_n=10)\
-    .groupby('occupation', as_index=False).agg({'size': 'sum'})
-
-# Get Owners overview
-owners_df = prepare_grouped_data(officers_owners, 'is_owner')
-owners_officer_roles = prepare_grouped_data(officers_owners.query("is_owner == True"), 'officer_role')\
-    .sort_values('size', ascending=False)
-
-# Get Nationality overview
-nationality_df = prepare_grouped_data(officers_owners, 'nationality')
-nationality_df = viz.label_top_rows(nationality_df, 'nationality', top_n=20).groupby(
-    'nationality', as_index=False).agg({'size': 'sum'})
-nationality_excl_uk = nationality_df.query("nationality !='United Kingdom'")
-
-# Get Residence and Nationality overview
-country_residence_df = officers_owners.groupby(['country_of_residence', 'nationality'], as_index=False).size()\
-    .query("size > 1000 and country_of_residence != '' and nationality != ''")\
-    .sort_values('size', ascending=False)\
-    .reset_index(drop=True)
-
-# Get individuals whose residence is in the UK but do not have UK nationality
-uk_residence_df = country_residence_df.query(
-    "nationality != 'United Kingdom' and country_of_residence == 'United Kingdom'")\
-    .reset_index(drop=True)
-# Get individuals whose nationality is  form the UK but are living abroad
-uk_nationality = country_residence_df.query(
-    "nationality == 'United Kingdom' and country_of_residence != 'United Kingdom'")\
-    .reset_index(drop=True)
-
-# Get distribution of owner and nationality
-owners_nationality = prepare_grouped_data(officers_owners.query("is_owner == True"), 'nationality')\
-    .sort_values('size', ascending=False)
-owners_nationality = viz.label_top_rows(owners_nationality, 'nationality', top_n=10)\
-    .groupby('nationality', as_index=False).agg({'size': 'sum'})
-
-# Get distribution of owner and nationality excl UK
-owners_nationality_excl_uk = prepare_grouped_data(officers_owners.query(
-    "is_owner == True and nationality != 'United Kingdom'"), 'nationality')\
-    .sort_values('size', ascending=False)
-owners_nationality_excl_uk = viz.label_top_rows(owners_nationality_excl_uk, 'nationality', top_n=20)\
-    .groupby('nationality', as_index=False).agg({'size': 'sum'})
-
-# Get distribution of non-owner and nationality
-non_owners_nationality = prepare_grouped_data(officers_owners.query(
-    "is_owner == False"), 'nationality').sort_values('size', ascending=False)
-non_owners_nationality = viz.label_top_rows(owners_nationality, 'nationality', top_n=10)\
-    .groupby('nationality', as_index=False).agg({'size': 'sum'})
-
-# Get distribution of non-owner and nationality excl UK
-non_owners_nationality_excl_uk = prepare_grouped_data(officers_owners.query(
-    "is_owner == False and nationality != 'United Kingdom'"), 'nationality').sort_values('size', ascending=False).sort_values('size', ascending=False)
-non_owners_nationality_excl_uk = viz.label_top_rows(owners_nationality_excl_uk, 'nationality', top_n=20)\
-    .groupby('nationality', as_index=False).agg({'size': 'sum'})
-
-# Occupation for Owners whose nationality is UK and are living in the UK
-uk_owners_and_residents_ocuppation = prepare_grouped_data(officers_owners.query("is_owner == True and nationality == 'United Kingdom' and country_of_residence == 'United Kingdom'"), 'occupation')\
-    .sort_values('size', ascending=False).head(50)
-uk_owners_and_residents_ocuppation = viz.label_top_rows(
-    uk_owners_and_residents_ocuppation, 'occupation', top_n=10).groupby('occupation', as_index=False).agg({'size': 'sum'})
+
+
+# Group counts of compute_aggregates, each list computed in one pass by the
+# 'grouping_sets' of the backend, see grouping_sets
+COMPANY_GROUPING_SETS = {
+    'city': {'by': 'city', 'top_n': 50},
+    'company_type': {'by': 'company_type'},
+    'years_bracket': {'by': 'Years_bracket'},
+}
+OFFICERS_GROUPING_SETS = {
+    'officer_role': {'by': 'officer_role'},
+    'occupation': {'by': 'occupation'},
+    'is_owner': {'by': 'is_owner'},
+    'owner_officer_role': {'by': 'officer_role', 'where': "is_owner == True"},
+    'nationality': {'by': 'nationality'},
+    'residence_nationality': {'by': ['country_of_residence', 'nationality']},
+    'owner_nationality': {'by': 'nationality', 'where': "is_owner == True"},
+    'owner_nationality_excl_uk': {
+        'by': 'nationality', 'where': "is_owner == True and nationality != 'United Kingdom'"},
+    'non_owner_nationality': {'by': 'nationality', 'where': "is_owner == False"},
+    'non_owner_nationality_excl_uk': {
+        'by': 'nationality', 'where': "is_owner == False and nationality != 'United Kingdom'"},
+    'uk_owner_resident_occupation': {
+        'by': 'occupation',
+        'where': "is_owner == True and nationality == 'United Kingdom' "
+                 "and country_of_residence == 'United Kingdom'"},
+}
+# Chart aggregates, in order, each taken 'from' a group count ('<frame>.<name>'
+# of COMPANY_GROUPING_SETS or OFFICERS_GROUPING_SETS) or an earlier aggregate,
+# then, when given, filtered by 'where', relabelled by 'relabel' (its 'replace'
+# mapping, title-cased with 'title', written to 'as' or back to 'col'), cut to
+# the 'head' largest groups and reduced to the 'top_n' largest groups of
+# 'label' plus 'Other'. compute_aggregates applies it with pandas and
+# aggregate_plan with lazy Polars queries
+AGGREGATE_SPECS = {
+    'active_city': {'from': 'active.city'},
+    'active_company': {'from': 'active.company_type'},
+    'active_years': {'from': 'active.years_bracket'},
+    'not_active_city': {'from': 'not_active.city'},
+    'not_active_company': {'from': 'not_active.company_type'},
+    'not_active_years': {'from': 'not_active.years_bracket'},
+    'officer_roles_df': {
+        'from': 'officers.officer_role',
+        'relabel': {'col': 'officer_role', 'replace': {'': 'Unknown'}, 'as': 'oficcer_role'}},
+    'occupations_df': {
+        'from': 'officers.occupation',
+        'where': "size > 5 and occupation != ''",
+        'relabel': {'col': 'occupation', 'replace': {'none': 'Unknown'}, 'title': True},
+        'label': 'occupation', 'top_n': 10},
+    'owners_df': {'from': 'officers.is_owner'},
+    'owners_officer_roles': {'from': 'officers.owner_officer_role'},
+    'nationality_df': {'from': 'officers.nationality', 'label': 'nationality', 'top_n': 20},
+    'nationality_excl_uk': {'from': 'nationality_df', 'where': "nationality != 'United Kingdom'"},
+    'country_residence_df': {
+        'from': 'officers.residence_nationality',
+        'where': "size > 1000 and country_of_residence != '' and nationality != ''"},
+    # Residents of the UK without UK nationality
+    'uk_residence_df': {
+        'from': 'country_residence_df',
+        'where': "nationality != 'United Kingdom' and country_of_residence == 'United Kingdom'"},
+    # UK nationals living abroad
+    'uk_nationality': {
+        'from': 'country_residence_df',
+        'where': "nationality == 'United Kingdom' and country_of_residence != 'United Kingdom'"},
+    'owners_nationality': {'from': 'officers.owner_nationality',
+                           'label': 'nationality', 'top_n': 10},
+    'owners_nationality_excl_uk': {'from': 'officers.owner_nationality_excl_uk',
+                                   'label': 'nationality', 'top_n': 20},
+    'non_owners_nationality': {'from': 'officers.non_owner_nationality',
+                               'label': 'nationality', 'top_n': 10},
+    'non_owners_nationality_excl_uk': {'from': 'officers.non_owner_nationality_excl_uk',
+                                       'label': 'nationality', 'top_n': 20},
+    # Owners of UK nationality living in the UK
+    'uk_owners_and_residents_ocuppation': {
+        'from': 'officers.uk_owner_resident_occupation',
+        'head': 50, 'label': 'occupation', 'top_n': 10},
+}
+AGGREGATES = list(AGGREGATE_SPECS)
+# Aggregates only computed when their inputs exist
+OPTIONAL_AGGREGATES = ['dataset_summary', 'unmapped_nationalities'] + filings_analysis.AGGREGATES
+
+
+def _aggregate_source(spec: typing.Dict[str, typing.Any],
+                      counts: typing.Dict[str, typing.Dict[str, typing.Any]],
+                      aggregates: typing.Dict[str, typing.Any]
+                      ) -> typing.Any:
+    """Return the group count or earlier aggregate an `AGGREGATE_SPECS` entry is taken from."""
+    frame, _, name = spec['from'].partition('.')
+    return counts[frame][name] if name else aggregates[frame]
+
+
+def compute_aggregates(active_companies: typing.Any,
+                       not_active_companies: typing.Any,
+                       officers_owners: typing.Any,
+                       backend: str = BACKEND
+                       ) -> typing.Dict[str, pd.DataFrame]:
+    """
+    Compute the chart-ready aggregates of the dashboard.
+
+    Parameters
+    ----------
+    active_companies : pd.DataFrame
+        Processed active companies.
+    not_active_companies : pd.DataFrame
+        Processed not active companies.
+    officers_owners : pd.DataFrame
+        Processed officer and owner data.
+    backend : str, optional
+        Execution backend the frames belong to, one of `BACKENDS` (default
+        is `BACKEND`). Groups are counted by the backend, one pass per frame
+        over `COMPANY_GROUPING_SETS` or `OFFICERS_GROUPING_SETS`, only the
+        grouped results are pandas DataFrames.
+
+    Returns
+    -------
+    dict
+        Aggregate DataFrames keyed by name, post-processed with pandas as
+        declared by `AGGREGATE_SPECS`.
+    """
+    grouping_sets = BACKENDS[backend]['grouping_sets']
+    # Count the groups in one pass per frame, every group count comes sorted by size
+    counts = {'active': grouping_sets(active_companies, COMPANY_GROUPING_SETS),
+              'not_active': grouping_sets(not_active_companies, COMPANY_GROUPING_SETS),
+              'officers': grouping_sets(officers_owners, OFFICERS_GROUPING_SETS)}
+    results = {}
+    for name, spec in AGGREGATE_SPECS.items():
+        df = _aggregate_source(spec, counts, results)
+        if spec.get('where'):
+            df = df.query(spec['where']).reset_index(drop=True)
+        if spec.get('relabel'):
+            relabel = spec['relabel']
+            labels = df[relabel['col']].replace(relabel['replace'])
+            if relabel.get('title'):
+                labels = labels.str.title()
+            df = df.assign(**{relabel.get('as', relabel['col']): labels})
+        if spec.get('head'):
+            df = df.head(spec['head'])
+        if spec.get('top_n'):
+            df = top_n_other(df, spec['label'], top_n=spec['top_n'])
+        results[name] = df
+    return results
+
+
+def aggregate_plan(active_companies: pl.LazyFrame,
+                   not_active_companies: pl.LazyFrame,
+                   officers_owners: pl.LazyFrame
+                   ) -> typing.Dict[str, pl.LazyFrame]:
+    """
+    Express `compute_aggregates` as lazy Polars queries, none collected.
+
+    Parameters
+    ----------
+    active_companies : pl.LazyFrame
+        Processed active companies, from the 'polars' backend.
+    not_active_companies : pl.LazyFrame
+        Processed not active companies, from the 'polars' backend.
+    officers_owners : pl.LazyFrame
+        Processed officer and owner data, from the 'polars' backend.
+
+    Returns
+    -------
+    dict
+        Lazy aggregates keyed by name, post-processed as declared by
+        `AGGREGATE_SPECS`. Collected they hold the same rows as
+        `compute_aggregates`.
+    """
+    counts = {'active': analysis_backends.polars_grouping_queries(active_companies,
+                                                                  COMPANY_GROUPING_SETS),
+              'not_active': analysis_backends.polars_grouping_queries(not_active_companies,
+                                                                      COMPANY_GROUPING_SETS),
+              'officers': analysis_backends.polars_grouping_queries(officers_owners,
+                                                                    OFFICERS_GROUPING_SETS)}
+    plan = {}
+    for name, spec in AGGREGATE_SPECS.items():
+        lf = _aggregate_source(spec, counts, plan)
+        if spec.get('where'):
+            lf = lf.filter(pl.sql_expr(spec['where']))
+        if spec.get('relabel'):
+            relabel = spec['relabel']
+            labels = pl.col(relabel['col']).cast(pl.String).replace(relabel['replace'])
+            if relabel.get('title'):
+                labels = labels.str.to_titlecase()
+            lf = lf.with_columns(labels.alias(relabel.get('as', relabel['col'])))
+        if spec.get('head'):
+            lf = lf.head(spec['head'])
+        if spec.get('top_n'):
+            lf = analysis_backends.polars_label_top(lf, spec['label'], top_n=spec['top_n'])
+        plan[name] = lf
+    return plan
+
+
+def analysis_plan(logger: logging.Logger,
+                  data_dir: pathlib.Path = DATA_PATH,
+                  cache: bool = ARROW_CACHE
+                  ) -> typing.Tuple[typing.Dict[str, pl.LazyFrame], typing.Dict[str, pl.LazyFrame]]:
+    """
+    Build the whole analysis, from Parquet to chart-ready aggregates, as one lazy plan.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    data_dir : pathlib.Path, optional
+        Directory holding the parquet files (default is `DATA_PATH`).
+    cache : bool, optional
+        Read through the Arrow IPC cache, see `load_data`.
+
+    Returns
+    -------
+    tuple
+        The lazy aggregates keyed by name, those of `aggregate_plan` and,
+        when filings.parquet exists, of `filings_analysis.AGGREGATES`, and
+        the lazy per-row tables to sink ('filing_cadence'). Nothing is read
+        until they are collected, see `collect_plan`.
+    """
+    *data, unmapped = wrangle_data(logger, *load_data(logger, data_dir, cache, 'polars'),
+                                   backend='polars')
+    plan = aggregate_plan(*data)
+    plan['unmapped_nationalities'] = unmapped
+    tables = {}
+    filings_path = (data_dir / 'filings').with_suffix('.parquet')
+    if filings_path.exists():
+        filings, tables['filing_cadence'] = filings_analysis.filings_queries(
+            filings_path, (data_dir / 'companies').with_suffix('.parquet'), ACTIVE_OPEN_LST)
+        plan.update(filings)
+    return plan, tables
+
+
+def collect_plan(logger: logging.Logger,
+                 plan: typing.Dict[str, pl.LazyFrame],
+                 sinks: typing.Optional[typing.Dict[pathlib.Path, pl.LazyFrame]] = None
+                 ) -> typing.Optional[typing.Dict[str, pd.DataFrame]]:
+    """
+    Collect all the queries of a plan together.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    plan : dict
+        Lazy aggregates keyed by name, see `analysis_plan`.
+    sinks : dict, optional
+        Lazy tables keyed by the Parquet path they are written to, in the same run.
+
+    Returns
+    -------
+    dict or None
+        The aggregates as pandas DataFrames, or None if the collection failed.
+
+    Notes
+    -----
+    With `pl.collect_all` the subplans the queries share, such as the scans
+    and the wrangling of each dataset, are computed once, and independent
+    queries run in parallel on the Polars thread pool.
+    """
+    try:
+        start = time.perf_counter()
+        lazy_frames = list(plan.values())
+        for path, table in (sinks or {}).items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lazy_frames.append(table.sink_parquet(path, lazy=True))
+        frames = pl.collect_all(lazy_frames)
+    except Exception as e:
+        logger.error(f"Failed to collect the analysis plan: {e}")
+        return None
+
+    logger.info(f"Analysis plan of {len(plan)} aggregates collected in "
+                f"{time.perf_counter() - start:.1f}s")
+    return {name: analysis_backends.object_labels(frame.to_pandas(), frame.columns)
+            for name, frame in zip(plan, frames)}
+
+
+def explain_plan(plan: typing.Dict[str, pl.LazyFrame],
+                 optimized: bool = True
+                 ) -> str:
+    """
+    Return the query plan of the aggregates as they are collected together.
+
+    Parameters
+    ----------
+    plan : dict
+        Lazy aggregates keyed by name, see `analysis_plan`.
+    optimized : bool, optional
+        Show the plan after the optimizations, with the shared subplans
+        cached once (default is True), or the plan as written.
+
+    Returns
+    -------
+    str
+        The plan as printed by `pl.explain_all`, preceded by the index of the
+        aggregates in it.
+    """
+    if optimized:
+        text = pl.explain_all(list(plan.values()))
+    else:
+        text = '\n\n'.join(lf.explain(optimized=False) for lf in plan.values())
+    index = '\n'.join(f'{i}: {name}' for i, name in enumerate(plan))
+    return f'{index}\n\n{text}'
+
+
+def profile_plan(logger: logging.Logger,
+                 plan: typing.Dict[str, pl.LazyFrame]
+                 ) -> pd.DataFrame:
+    """
+    Time the collection of each aggregate of a plan, alone and all together.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    plan : dict
+        Lazy aggregates keyed by name, see `analysis_plan`.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per aggregate with its 'rows' and 'seconds' when collected
+        alone, sorted by time, then a row 'all' collected with `collect_plan`.
+        The time alone includes the scans and wrangling it depends on, so
+        the slowest aggregates point at the costly parts of the plan, and
+        the sum against 'all' measures what sharing the subplans saves.
+    """
+    timings = []
+    for name, lf in plan.items():
+        start = time.perf_counter()
+        rows = lf.collect().height
+        timings.append({'aggregate': name, 'rows': rows,
+                        'seconds': time.perf_counter() - start})
+    timings.sort(key=lambda timing: timing['seconds'], reverse=True)
+    start = time.perf_counter()
+    frames = collect_plan(logger, plan) or {}
+    timings.append({'aggregate': 'all', 'rows': sum(len(df) for df in frames.values()),
+                    'seconds': time.perf_counter() - start})
+    return pd.DataFrame(timings, columns=['aggregate', 'rows', 'seconds'])
+
+
+def dataset_summary(data_dir: pathlib.Path = DATA_PATH) -> pd.DataFrame:
+    """
+    Summarize the datasets from the profiles written at ingest.
+
+    Parameters
+    ----------
+    data_dir : pathlib.Path, optional
+        Directory holding the parquet files (default is `DATA_PATH`).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per profiled dataset with its 'dataset', 'rows' and 'columns'.
+        Read from the profile sidecars, the data itself is not scanned.
+    """
+    summary = []
+    for name in ('companies', 'officers_and_owners', 'filings'):
+        profile = data_profile.load_profile((data_dir / name).with_suffix('.parquet'))
+        if profile is not None:
+            summary.append({'dataset': name,
+                            'rows': data_profile.row_count(profile),
+                            'columns': sum(not stats['derived']
+                                           for stats in profile['columns'].values())})
+    return pd.DataFrame(summary, columns=['dataset', 'rows', 'columns'])
+
+
+def analyze(logger: logging.Logger,
+            data_dir: pathlib.Path = DATA_PATH,
+            results_dir: typing.Optional[pathlib.Path] = RESULTS_PATH,
+            cache: bool = ARROW_CACHE,
+            backend: str = BACKEND,
+            lazy_plan: bool = False
+            ) -> typing.Dict[str, pd.DataFrame]:
+    """
+    Run the analyze stage: load, wrangle and aggregate the data.
+
+    The filings analytics of `filings_analysis` run when filings.parquet
+    exists. Their per-company table is saved as `filing_cadence.parquet`
+    in `results_dir`. The nationalities missing from `WORLD_COUNTIES` are
+    reported as 'unmapped_nationalities', by every backend.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    data_dir : pathlib.Path, optional
+        Directory holding the parquet files (default is `DATA_PATH`).
+    results_dir : pathlib.Path, optional
+        Directory the aggregates are saved to as parquet, for the render stage.
+        Nothing is saved when None.
+    cache : bool, optional
+        Read through the Arrow IPC cache, see `load_data`.
+    backend : str, optional
+        Execution backend of load, wrangle and aggregate, one of `BACKENDS`
+        (default is `BACKEND`).
+    lazy_plan : bool, optional
+        Run the whole analysis, filings included, as the single lazy Polars
+        plan of `analysis_plan` (default is False). `backend` is then ignored.
+
+    Returns
+    -------
+    dict
+        Aggregate DataFrames keyed by name.
+    """
+    if lazy_plan:
+        plan, tables = analysis_plan(logger, data_dir, cache)
+        sinks = {results_dir / f'{name}.parquet': table for name, table in tables.items()}\
+            if results_dir is not None else None
+        results = collect_plan(logger, plan, sinks) or {}
+        if 'unmapped_nationalities' in results:
+            log_unmapped_nationalities(logger, results['unmapped_nationalities'])
+        results['dataset_summary'] = dataset_summary(data_dir)
+        if results_dir is not None:
+            save_results(logger, results, results_dir)
+        return results
+
+    *data, unmapped = wrangle_data(logger, *load_data(logger, data_dir, cache, backend),
+                                   backend=backend)
+    results = compute_aggregates(*data, backend=backend)
+    # Report of the nationalities WORLD_COUNTIES does not map, see normalize_nationalities
+    results['unmapped_nationalities'] = BACKENDS[backend]['collect'](unmapped)
+    log_unmapped_nationalities(logger, results['unmapped_nationalities'])
+    results['dataset_summary'] = dataset_summary(data_dir)
+    # Filings are aggregated out of core by Polars, never loaded in pandas
+    filings_path = (data_dir / 'filings').with_suffix('.parquet')
+    if filings_path.exists():
+        filings = filings_analysis.analyze_filings(
+            logger, filings_path, (data_dir / 'companies').with_suffix('.parquet'),
+            cadence_path=results_dir / 'filing_cadence.parquet' if results_dir else None,
+            active_statuses=ACTIVE_OPEN_LST)
+        results.update(filings or {})
+    if results_dir is not None:
+        save_results(logger, results, results_dir)
+    return results
+
+
+def benchmark_backends(logger: logging.Logger,
+                       data_dir: pathlib.Path = DATA_PATH,
+                       backends: typing.Optional[typing.List[str]] = None,
+                       cache: bool = ARROW_CACHE
+                       ) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """
+    Time load, wrangle and aggregate on each backend and check their results.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    data_dir : pathlib.Path, optional
+        Directory holding the parquet files (default is `DATA_PATH`).
+    backends : list of str, optional
+        Backends to time (default is all of `BACKENDS`). The results are
+        checked against the first one.
+    cache : bool, optional
+        Read through the Arrow IPC cache, see `load_data`.
+
+    Returns
+    -------
+    dict
+        Per backend, the wall time in seconds of 'load', 'wrangle',
+        'aggregate' and 'total', and the list of aggregates that differ from
+        the first backend as 'mismatches'.
+
+    Notes
+    -----
+    The Polars and DuckDB backends are lazy, their load and wrangle stages
+    only build the query, which runs when the aggregates are computed.
+    Aggregates are compared as sorted rows, groups tied at a top N cut-off
+    may legitimately differ.
+    """
+    timings, reference = {}, None
+    for backend in backends or list(BACKENDS):
+        start = time.perf_counter()
+        data = load_data(logger, data_dir, cache, backend)
+        loaded = time.perf_counter()
+        *data, _ = wrangle_data(logger, *data, backend=backend)
+        wrangled = time.perf_counter()
+        results = compute_aggregates(*data, backend=backend)
+        aggregated = time.perf_counter()
+
+        rows = {name: sorted(map(str, df.itertuples(index=False))) for name, df in results.items()}
+        reference = reference or rows
+        timings[backend] = {'load': loaded - start,
+                            'wrangle': wrangled - loaded,
+                            'aggregate': aggregated - wrangled,
+                            'total': aggregated - start,
+                            'mismatches': [name for name in rows if rows[name] != reference[name]]}
+        logger.info(f"{backend} backend ran in {timings[backend]['total']:.1f}s")
+    return timings
+
+
+def benchmark_process_companies(logger: logging.Logger,
+                                companies: pl.DataFrame,
+                                repeats: int = 3
+                                ) -> typing.Dict[str, typing.Any]:
+    """
+    Time `process_companies_data` against its vectorized Polars implementation.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    companies : pl.DataFrame
+        Companies with 'office_address', 'incorporation_date' and
+        'date_of_cessation', as dates or '%Y-%m-%d' strings.
+    repeats : int, optional
+        Number of timed repetitions, the fastest is kept (default is 3).
+
+    Returns
+    -------
+    dict
+        Best wall time in seconds of 'pandas' and 'polars', 'speedup', and
+        'identical', whether both produced the same derived columns.
+    """
+    companies_pd = companies.to_pandas()
+    pandas_time, expected = wrangle.best_of(
+        lambda: process_companies_data(logger, companies_pd.copy(), ENGLISH_COUNTRIES), repeats)
+    polars_time, result = wrangle.best_of(
+        lambda: analysis_backends.polars_process_companies(logger, companies.lazy(),
+                                                           ENGLISH_COUNTRIES).collect(),
+        repeats)
+    dtypes = {'Year': pl.Int64, 'city': pl.String, 'num_days_active': pl.Int64,
+              'Years_bracket': pl.String}
+    identical = pl.from_pandas(expected[list(dtypes)]).cast(dtypes)\
+        .equals(result.select(list(dtypes)).cast(dtypes))
+    return {'pandas': pandas_time, 'polars': polars_time,
+            'speedup': pandas_time / polars_time, 'identical': identical}
+
+
+def benchmark_grouping_sets(logger: logging.Logger,
+                            data_dir: pathlib.Path = DATA_PATH,
+                            repeats: int = 3
+                            ) -> typing.Dict[str, typing.Any]:
+    """
+    Time the officers group counts filtered one by one against `grouping_sets`.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    data_dir : pathlib.Path, optional
+        Directory holding the parquet files (default is `DATA_PATH`).
+    repeats : int, optional
+        Number of timed repetitions, the fastest is kept (default is 3).
+
+    Returns
+    -------
+    dict
+        Best wall time in seconds of 'separate' (`pd.DataFrame.query` and
+        `prepare_grouped_data` per specification of `OFFICERS_GROUPING_SETS`),
+        'grouping_sets' (on one `predicate_index`) and
+        'one_scan' (a single `groupby` size, the lower bound), 'speedup' of
+        grouping sets over separate counts, and 'identical', whether both
+        gave the same groups.
+    """
+    _, _, officers_owners, _ = wrangle_data(logger, *load_data(logger, data_dir, backend='pandas'))
+    separate, expected = wrangle.best_of(lambda: {
+        name: prepare_grouped_data(officers_owners.query(spec['where']) if spec.get('where')
+                                   else officers_owners, spec['by'], spec.get('top_n'))
+        for name, spec in OFFICERS_GROUPING_SETS.items()}, repeats)
+    grouped, result = wrangle.best_of(
+        lambda: grouping_sets(officers_owners, OFFICERS_GROUPING_SETS), repeats)
+    one_scan, _ = wrangle.best_of(
+        lambda: officers_owners.groupby('nationality', observed=True).size(), repeats)
+    identical = all(sorted(map(str, expected[name].itertuples(index=False)))
+                    == sorted(map(str, result[name].itertuples(index=False)))
+                    for name in OFFICERS_GROUPING_SETS)
+    return {'separate': separate, 'grouping_sets': grouped, 'one_scan': one_scan,
+            'speedup': separate / grouped, 'identical': identical}
+
+
+def save_results(logger: logging.Logger,
+                 results: typing.Dict[str, pd.DataFrame],
+                 results_dir: pathlib.Path
+                 ) -> None:
+    """
+    Save the aggregates as one parquet file each.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    results : dict
+        Aggregate DataFrames keyed by name.
+    results_dir : pathlib.Path
+        Directory to write to.
+
+    Returns
+    -------
+    None
+    """
+    try:
+        results_dir.mkdir(parents=True, exist_ok=True)
+        for name, df in results.items():
+            df.to_parquet(results_dir / f'{name}.parquet', index=False)
+        logger.info(f"Saved {len(results)} aggregates to {results_dir}")
+    except Exception as e:
+        logger.error(f"Failed to save aggregates: {e}")
+
+
+def load_results(logger: logging.Logger,
+                 results_dir: pathlib.Path = RESULTS_PATH
+                 ) -> typing.Dict[str, pd.DataFrame]:
+    """
+    Load the aggregates saved by `save_results`.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    results_dir : pathlib.Path, optional
+        Directory to read from (default is `RESULTS_PATH`).
+
+    Returns
+    -------
+    dict
+        Aggregate DataFrames keyed by name.
+    """
+    results = {}
+    for name in AGGREGATES + OPTIONAL_AGGREGATES:
+        path = results_dir / f'{name}.parquet'
+        if name in OPTIONAL_AGGREGATES and not path.exists():
+            continue
+        try:
+            results[name] = pd.read_parquet(path)
+        except Exception as e:
+            logger.error(f"Failed to load aggregate '{name}': {e}")
+    return results
+
 
 """
 Create Visualizations: Generate interactive and static charts for companies and officers data.
@@ -489,70 +1394,76 @@ This section creates a series of visualizations to explore and summarize the pro
 - **Toggleable Charts**: Allow users to switch between multiple views, enhancing comparative analysis.
 - **Custom Dimensions**: Dimensions (e.g., width and height) are adjusted for specific visualizations to improve readability.
 - **Dynamic Data Input**: Processed data is fed directly into visualization functions, ensuring consistency with upstream transformations.
+- **Parallel Rendering**: The charts are declared in `chart_render.CHARTS` and built and serialized by a process pool, the time per chart is logged.
 
 **Future Improvements**:
 - Parameterize chart dimensions (e.g., width, height) to avoid hardcoding.
 - Add interactivity to all visualizations, such as hover effects and drill-down capabilities.
 - Automate labeling for toggleable charts based on input data attributes.
 """
-# ---------------- Visualize data from the "Companies" dataset ----------------
-cities_viz = viz.create_toggleable_pie_charts([active_city, not_active_city],
-                                              ['city', 'city'],
-                                              ['size', 'size'],
-                                              ['Active Companies by City', 'Not Active Companies by City'])\
-    .to_html(full_html=False, include_plotlyjs=False)
-company_type_viz = viz.create_toggleable_bar_charts([active_company, not_active_company],
-                                                    ['company_type',
-                                                        'company_type'],
-                                                    ['size', 'size'],
-                                                    ['Active Companies by Type',
-                                                        'Not Active Companies by Type'],
-                                                    width=1000,
-                                                    height=1200)\
-    .to_html(full_html=False, include_plotlyjs=False)
-years_viz = viz.create_toggleable_pie_charts([active_years, not_active_years],
-                                             ['Years_bracket', 'Years_bracket'],
-                                             ['size', 'size'],
-                                             ['Active Companies by Years Bracket', 'Not Active Companies by Years Bracket'])\
-    .to_html(full_html=False, include_plotlyjs=False)
-
-# ----------- Visualize data from the "Officers and Owners" dataset -----------
-officer_roles_viz = viz.create_bar_chart(
-    officer_roles_df, 'officer_role', 'size', 'Officer Roles Overview')\
-    .to_html(full_html=False, include_plotlyjs=False)
-occupation_viz = viz.create_pie_chart(
-    occupations_df, "occupation", "size", "Occupation Overview")\
-    .to_html(full_html=False, include_plotlyjs=False)
-owners_viz = viz.create_toggleable_pie_charts([owners_df, owners_officer_roles],
-                                              ['is_owner', 'officer_role'],
-                                              ['size', 'size'],
-                                              ['Is Owner', 'Owner Ofiicer Role'])\
-    .to_html(full_html=False, include_plotlyjs=False)
-nationality_viz = viz.create_toggleable_bar_charts(
-    [nationality_df, nationality_excl_uk],
-    ['nationality', 'nationality'],
-    ['size', 'size'],
-    ['Nationality Overview', 'Nationality Overview (excl UK)'])\
-    .to_html(full_html=False, include_plotlyjs=False)
-
-residence_nationality_viz = viz.create_toggleable_bar_charts(
-    [uk_residence_df, uk_nationality],
-    ['nationality', 'country_of_residence'],
-    ['size', 'size'],
-    ['UK Residence (excl British)', 'UK Nationality (not UK resident)'])\
-    .to_html(full_html=False, include_plotlyjs=False)
-
-owners_and_non_owners_viz = viz.create_toggleable_pie_charts(
-    [owners_nationality, owners_nationality_excl_uk,
-        non_owners_nationality, non_owners_nationality_excl_uk],
-    ['nationality', 'nationality', 'nationality', 'nationality'],
-    ['size', 'size', 'size', 'size'],
-    ['Owners Nationality',
-        'Owners Nationality (Excl UK)', 'Non Owners Nationality', 'Non Owners Nationality (Excl UK)'])\
-    .to_html(full_html=False, include_plotlyjs=False)
-uk_owners_and_residents_ocuppation_viz = viz.create_pie_chart(
-    uk_owners_and_residents_ocuppation, "occupation", "size", "Occupation for UK nationals who reside in the UK")\
-    .to_html(full_html=False, include_plotlyjs=False)
+
+
+def build_charts(logger: logging.Logger,
+                 results: typing.Dict[str, pd.DataFrame],
+                 workers: int = chart_render.RENDER_WORKERS,
+                 payload_dir: typing.Optional[pathlib.Path] = None,
+                 serializer: typing.Optional[typing.Dict[str, typing.Any]] = None
+                 ) -> typing.Dict[str, str]:
+    """
+    Build the dashboard charts as HTML snippets.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance, the time spent on every chart is logged at INFO.
+    results : dict
+        Aggregate DataFrames keyed by name, see `compute_aggregates`.
+    workers : int, optional
+        Number of processes building the charts, see `chart_render.render_charts`.
+    payload_dir : pathlib.Path, optional
+        Directory the charts are written to as gzip-compressed figure JSON,
+        one `<placeholder>.json.gz` file each, for the lazy dashboard. The
+        snippets are then `LAZY_CHART` placeholders fetching these files by
+        their path relative to the parent of `payload_dir`. Charts are
+        embedded in the snippets when None (default).
+    serializer : dict, optional
+        Options of the orjson serializer `data_visualize.figure_to_json`,
+        e.g. {'precision': 2}. Charts are serialized by Plotly when None
+        (default).
+
+    Returns
+    -------
+    dict
+        HTML snippet of every chart keyed by its placeholder in `HTML_TEMPLATE`.
+    """
+    summary = results.get('dataset_summary', pd.DataFrame(columns=['dataset', 'rows']))
+    summary_viz = ' | '.join(f"{row.dataset.replace('_', ' ').capitalize()}: {row.rows:,} rows"
+                             for row in summary.itertuples())
+
+    start = time.perf_counter()
+    snippets, timings = chart_render.render_charts(
+        results, workers, 'html' if payload_dir is None else 'json.gz', serializer)
+    if payload_dir is not None:
+        payload_dir.mkdir(parents=True, exist_ok=True)
+        for name, payload in snippets.items():
+            (payload_dir / f'{name}.json.gz').write_bytes(payload)
+        snippets = {name: LAZY_CHART.format(src=quote(f'{payload_dir.name}/{name}.json.gz'))
+                    for name in snippets}
+    for timing in timings.itertuples():
+        logger.info(f"Chart {timing.chart}: built in {timing.build:.3f}s, "
+                    f"serialized in {timing.serialize:.3f}s")
+    logger.info(f"{len(snippets)} charts rendered in {time.perf_counter() - start:.1f}s "
+                f"with {min(workers, len(snippets))} process(es)")
+
+    charts = {name: html for name, html in snippets.items() if name.endswith('_viz')}
+    # Filings section, only when every filings chart could be drawn
+    filings = {name: html for name, html in snippets.items() if name.endswith('_html')}
+    charts['filings_viz'] = FILINGS_TEMPLATE.format(**filings) \
+        if all(name in results for name in filings_analysis.AGGREGATES) else ''
+    charts['summary_viz'] = summary_viz
+    return charts
+
+
 """
 Generate and Save HTML Dashboard: Create an interactive web page with visualizations.
 
@@ -573,25 +1484,24 @@ This section performs the following tasks:
        - Active Companies (Cities, Types, Years Bracket)
        - Officer Analysis (Roles, Occupation, Ownership)
        - Nationality and Residence Overview
-     - HTML components for each chart (e.g., `{cities_html}`) are dynamically injected.
+       - Filings Analysis (Filings per Year, Time Since Last Filing, Filing Cadence), when filings were analyzed
+     - HTML components for each chart (e.g., `{cities_viz}`) are injected by `render_dashboard`.
 
 3. **HTML File Saving**:
-   - The complete HTML content is saved to a file (`uk_exploration.html`) for distribution or direct use in a web browser.
+   - The complete HTML content is saved to `HTML_PATH`, or the path given to `render`, for distribution or direct use in a web browser.
 
-4. **Console Output**:
-   - Confirms the successful creation of the HTML file and outputs its name.
+4. **Lazy Dashboard** (`render(..., lazy=True)`):
+   - Every chart is written as precompressed figure JSON to a `_data` directory next to the page instead of being embedded.
+   - The page only holds placeholders, `LAZY_LOADER` fetches and draws each chart when it scrolls into view, and the page is streamed to disk by `stream_html_file`.
 
 **Purpose**:
 - Generate a standalone, shareable, interactive dashboard for exploring company and officer data.
 - Enable easy access and visualization of key insights without requiring additional tools.
 
 **Future Improvements**:
-- Parameterize the file name (`html_file`) for flexibility.
-- Modularize the template creation for easier maintenance (e.g., separate template from chart injection).
 - Add metadata (e.g., descriptions, tooltips) for charts to enhance interpretability.
 """
-
-html_template = f"""
+HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -599,7 +1509,7 @@ html_template = f"""
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Company Analysis</title>
     <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <script src="{plotly_js}"{plotly_loading}></script>
     <style>
         body {{
             padding: 20px;
@@ -619,7 +1529,8 @@ html_template = f"""
 </head>
 <body>
     <div class="container">
-        <h1 class="text-center mb-5">Company Analysis</h1>
+        <h1 class="text-center">Company Analysis</h1>
+        <p class="text-center text-muted mb-5">{summary_viz}</p>
         <h2 class="text-center mb-4">Active Companies</h2>
         <div class="chart-container">
             <h3 class="text-center">Cities overviews</h3>
@@ -665,9 +1576,190 @@ html_template = f"""
             <div class="chart">{uk_owners_and_residents_ocuppation_viz}</div>
         </div>
     </div>
+    {filings_viz}
+    {scripts}
 </body>
 </html>
 """
-html_file = pathlib.Path(
-    r"C:\Users\juann\OneDrive\Documentos\GitHub\Data-analysis\docs\UK Corporate - Study.html")
-create_html_file(logger, html_file, html_template)
+
+# Filings section of the dashboard, left out when filings were not analyzed
+FILINGS_TEMPLATE = """
+    <div class="container">
+        <h1 class="text-center mb-5">Filings Analysis</h1>
+        <div class="chart-container">
+            <h3 class="text-center">Filings per Year</h3>
+            <div class="chart">{filings_per_year_html}</div>
+            <div class="chart">{filings_per_status_html}</div>
+        </div>
+        <div class="chart-container">
+            <h3 class="text-center">Time Since Last Filing</h3>
+            <div class="chart">{filing_recency_html}</div>
+        </div>
+        <div class="chart-container">
+            <h3 class="text-center">Filing Cadence</h3>
+            <div class="chart">{filing_cadence_html}</div>
+        </div>
+    </div>
+"""
+
+
+# Lazy dashboard: placeholder of a chart, fetched from `src` by LAZY_LOADER
+LAZY_CHART = '<div class="lazy-chart" data-src="{src}"></div>'
+# Renders each lazy chart when it comes near the viewport. Payloads are gzip
+# files, decompressed here unless the server already sent them decoded. A chart
+# that cannot be loaded shows the error in its placeholder
+LAZY_LOADER = """
+    <style>
+        .lazy-chart {
+            min-height: 600px;
+        }
+        .lazy-chart.lazy-chart-error {
+            min-height: 0;
+            padding: 20px;
+            color: #842029;
+            background-color: #f8d7da;
+        }
+    </style>
+    <script>
+        document.addEventListener('DOMContentLoaded', function () {
+            async function renderChart(element) {
+                try {
+                    const response = await fetch(element.dataset.src);
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status} ${response.statusText}`);
+                    }
+                    let bytes = new Uint8Array(await response.arrayBuffer());
+                    if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+                        const stream = new Blob([bytes]).stream()
+                            .pipeThrough(new DecompressionStream('gzip'));
+                        bytes = new Uint8Array(await new Response(stream).arrayBuffer());
+                    }
+                    const figure = JSON.parse(new TextDecoder().decode(bytes));
+                    await Plotly.newPlot(element, figure.data, figure.layout);
+                } catch (error) {
+                    // Browsers refuse to fetch the payloads of a page opened from disk
+                    const hint = location.protocol === 'file:'
+                        ? ' Serve the page over HTTP, e.g. python -m http.server, to load its charts.'
+                        : '';
+                    element.classList.add('lazy-chart-error');
+                    element.textContent = `Could not load the chart ${element.dataset.src}: `
+                        + `${error.message}.${hint}`;
+                }
+            }
+            const observer = new IntersectionObserver(function (entries) {
+                entries.filter(entry => entry.isIntersecting).forEach(function (entry) {
+                    observer.unobserve(entry.target);
+                    renderChart(entry.target);
+                });
+            }, {rootMargin: '200px'});
+            document.querySelectorAll('.lazy-chart').forEach(element => observer.observe(element));
+        });
+    </script>
+"""
+
+
+def render_dashboard(charts: typing.Dict[str, str]) -> str:
+    """
+    Fill the dashboard template with the chart snippets.
+
+    Parameters
+    ----------
+    charts : dict
+        HTML snippets keyed by placeholder, see `build_charts`.
+
+    Returns
+    -------
+    str
+        The complete HTML page.
+    """
+    return HTML_TEMPLATE.format(**{'plotly_js': chart_render.plotly_js_url(),
+                                   'plotly_loading': '', 'scripts': '', **charts})
+
+
+def stream_html_file(logger: logging.Logger,
+                     path: pathlib.Path,
+                     template: str,
+                     values: typing.Dict[str, str]
+                     ) -> None:
+    """
+    Write a `str.format` template to an HTML file piece by piece.
+
+    The literal parts of the template and the values of its placeholders are
+    written as they come, the page is never assembled in memory.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance for logging events.
+    path : pathlib.Path
+        Path to save the HTML file.
+    template : str
+        Template with named placeholders, e.g. `HTML_TEMPLATE`.
+    values : dict
+        Value of every placeholder.
+
+    Returns
+    -------
+    None
+    """
+    try:
+        with open(path, 'w') as file:
+            for literal, field, _, _ in string.Formatter().parse(template):
+                file.write(literal)
+                if field is not None:
+                    file.write(values[field])
+        logger.info(f"HTML file streamed successfully: {path}")
+    except Exception as e:
+        logger.error(f"Failed to stream HTML file: {e}")
+
+
+def render(logger: logging.Logger,
+           results: typing.Optional[typing.Dict[str, pd.DataFrame]] = None,
+           results_dir: pathlib.Path = RESULTS_PATH,
+           html_path: pathlib.Path = HTML_PATH,
+           workers: int = chart_render.RENDER_WORKERS,
+           lazy: bool = False,
+           serializer: typing.Optional[typing.Dict[str, typing.Any]] = None
+           ) -> None:
+    """
+    Run the render stage: build the charts and write the HTML dashboard.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger instance.
+    results : dict, optional
+        Aggregates from `analyze`. Loaded from `results_dir` when None.
+    results_dir : pathlib.Path, optional
+        Directory of the saved aggregates (default is `RESULTS_PATH`).
+    html_path : pathlib.Path, optional
+        Path of the HTML dashboard (default is `HTML_PATH`).
+    workers : int, optional
+        Number of processes building the charts in parallel (default is
+        `chart_render.RENDER_WORKERS`).
+    lazy : bool, optional
+        Write the lazy dashboard (default is False): the data of every chart
+        is written to the `<page name>_data` directory next to the page, as
+        precompressed JSON fetched when its section scrolls into view, and the
+        page itself is streamed to disk. The page is then a few kilobytes and
+        paints before any chart is loaded. Browsers only fetch the payloads
+        when the page is served over HTTP, not opened as a local file.
+    serializer : dict, optional
+        Options of the orjson serializer of the charts, see `build_charts`.
+
+    Returns
+    -------
+    None
+    """
+    if results is None:
+        results = load_results(logger, results_dir)
+    if not lazy:
+        create_html_file(logger, html_path, render_dashboard(
+            build_charts(logger, results, workers, serializer=serializer)))
+        return
+    charts = build_charts(logger, results, workers,
+                          payload_dir=html_path.with_name(f'{html_path.stem}_data'),
+                          serializer=serializer)
+    stream_html_file(logger, html_path, HTML_TEMPLATE,
+                     {**charts, 'plotly_js': chart_render.plotly_js_url(),
+                      'plotly_loading': ' defer', 'scripts': LAZY_LOADER})
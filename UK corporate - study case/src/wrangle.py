@@ -6,18 +6,37 @@ from data related to dates and addresses. It includes functionality to
 extract years, calculate days between dates, and parse city or country
 information from address strings.
 
+The row functions have column versions that take and return whole pandas
+Series and run vectorized, for use on full datasets: `to_dates`, `get_years`,
+`days_active` and `years_bracket` for the dates, `extract_cities` and
+`extract_countries` for the addresses. The address columns run the same
+patterns on the native regex kernels of Polars.
+
 This module is designed for data preprocessing in ETL pipelines or similar
 data analysis workflows where structured date and address handling is required.
 """
 
 
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+import time
+import numpy as np
 import pandas as pd
+import polars as pl
 from re import search
-from datetime import datetime
+from datetime import date, datetime
 import logging
 
 
+# Bins in days (right-closed) and labels of the years a company was active
+YEARS_BRACKET_BINS = [0, 360, 1800, 3600, 7200, float('inf')]
+YEARS_BRACKET_LABELS = ['<1', '1-5y', '5-10y', '10-20y', '>20y']
+# Address patterns: the city candidate, the last part used when the candidate
+# holds a space and a digit, and the country (third part)
+CITY_PATTERN = r',\s*([\w\s]+),'
+CITY_FALLBACK_PATTERN = r', [^,]+, ([^,]+)$'
+COUNTRY_PATTERN = r'^[^,]+, [^,]+, ([^,]+),'
+
+
 def get_year(a_date: Union[pd.Timestamp, datetime, str, None]
              ) -> Optional[int]:
     """
@@ -84,6 +103,154 @@ def days_between_dates(row: pd.Series,
         return None
 
 
+def to_dates(dates: pd.Series) -> pd.Series:
+    """
+    Convert a column of dates to datetime64.
+
+    Parameters
+    ----------
+    dates : pd.Series
+        Dates as datetime64, or as objects mixing strings in the format
+        '%Y-%m-%d', datetime objects, Timestamps, None and NaT.
+
+    Returns
+    -------
+    pd.Series
+        The dates as datetime64. Missing and unparsable values are NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates
+    return pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce')
+
+
+def get_years(dates: pd.Series) -> pd.Series:
+    """
+    Extract the year of a column of dates, the column version of `get_year`.
+
+    Parameters
+    ----------
+    dates : pd.Series
+        Dates, see `to_dates`.
+
+    Returns
+    -------
+    pd.Series
+        The years, NaN for missing or unparsable dates.
+    """
+    return to_dates(dates).dt.year
+
+
+def days_active(start_dates: pd.Series,
+                end_dates: pd.Series,
+                today: Optional[date] = None
+                ) -> pd.Series:
+    """
+    Calculate the days between two columns of dates, the column version of `days_between_dates`.
+
+    Parameters
+    ----------
+    start_dates : pd.Series
+        Start dates, e.g. 'incorporation_date', see `to_dates`.
+    end_dates : pd.Series
+        End dates, e.g. 'date_of_cessation', see `to_dates`. Missing end
+        dates are filled with `today`, the company is still active.
+    today : date, optional
+        Fill value of missing end dates (default is today).
+
+    Returns
+    -------
+    pd.Series
+        The absolute number of days between the dates, NaN when the start
+        date is missing or unparsable.
+    """
+    end_dates = to_dates(end_dates).fillna(pd.Timestamp(today or date.today()))
+    return (end_dates - to_dates(start_dates)).dt.days.abs()
+
+
+def years_bracket(days: pd.Series) -> pd.Series:
+    """
+    Bin days active into `YEARS_BRACKET_LABELS` with one binary search.
+
+    Parameters
+    ----------
+    days : pd.Series
+        Days active, see `days_active`.
+
+    Returns
+    -------
+    pd.Series
+        Ordered categorical of the labels, identical to `pd.cut` with
+        `YEARS_BRACKET_BINS`: bins are right-closed and days outside of them
+        (0 or less) or missing are NaN.
+
+    Notes
+    -----
+    `np.searchsorted` with side='left' returns, for every value, the index
+    of the first bin edge greater than or equal to it, i.e. the index of its
+    right-closed bin plus one. Missing values sort after the last edge.
+    """
+    values = days.to_numpy(dtype='float64', na_value=np.nan)
+    codes = np.searchsorted(YEARS_BRACKET_BINS, values, side='left') - 1
+    codes[(codes < 0) | (codes >= len(YEARS_BRACKET_LABELS))] = -1
+    return pd.Series(pd.Categorical.from_codes(codes, categories=YEARS_BRACKET_LABELS, ordered=True),
+                     index=days.index)
+
+
+def best_of(func: Callable[[], Any], repeats: int) -> Tuple[float, Any]:
+    """Return the best wall time in seconds of `repeats` calls of `func`, and its last result."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def benchmark_dates(logger: logging.Logger,
+                    dates: pd.DataFrame,
+                    repeats: int = 3
+                    ) -> Dict[str, Union[float, bool]]:
+    """
+    Compare the row date functions against their column versions.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        A logger instance to log errors of the row functions.
+    dates : pd.DataFrame
+        Companies with 'incorporation_date' and 'date_of_cessation'.
+    repeats : int, optional
+        Number of timed repetitions, the fastest is kept (default is 3).
+
+    Returns
+    -------
+    Dict[str, Union[float, bool]]
+        Best wall time in seconds of 'rows' (`get_year`, `days_between_dates`
+        and `pd.cut`) and 'columns' (`get_years`, `days_active` and
+        `years_bracket`), 'speedup', and 'identical', whether both produced
+        the same years, days and brackets.
+    """
+    def by_rows() -> pd.DataFrame:
+        days = dates.apply(lambda row: days_between_dates(row, logger), axis=1)
+        return pd.DataFrame({'Year': dates['incorporation_date'].apply(get_year),
+                             'num_days_active': days,
+                             'Years_bracket': pd.cut(days, bins=YEARS_BRACKET_BINS,
+                                                     labels=YEARS_BRACKET_LABELS)})
+
+    def by_columns() -> pd.DataFrame:
+        days = days_active(dates['incorporation_date'], dates['date_of_cessation'])
+        return pd.DataFrame({'Year': get_years(dates['incorporation_date']),
+                             'num_days_active': days,
+                             'Years_bracket': years_bracket(days)})
+
+    rows, expected = best_of(by_rows, repeats)
+    columns, result = best_of(by_columns, repeats)
+    identical = all(expected[col].astype('Float64').equals(result[col].astype('Float64'))
+                    for col in ('Year', 'num_days_active')) \
+        and expected['Years_bracket'].equals(result['Years_bracket'])
+    return {'rows': rows, 'columns': columns, 'speedup': rows / columns, 'identical': identical}
+
+
 def process_address(address: Optional[str],
                     logger: logging.Logger
                     ) -> Optional[str]:
@@ -112,11 +279,11 @@ def process_address(address: Optional[str],
         if not address or not isinstance(address, str):
             return None
 
-        sub_match = search(r',\s*([\w\s]+),', address)
+        sub_match = search(CITY_PATTERN, address)
         if sub_match:
             city_candidate = sub_match.group(1).strip()
             if " " in city_candidate and any(char.isdigit() for char in city_candidate):
-                final_match = search(r', [^,]+, ([^,]+)$', address)
+                final_match = search(CITY_FALLBACK_PATTERN, address)
                 return final_match.group(1) if final_match else city_candidate
         return city_candidate
     except Exception as e:
@@ -152,8 +319,141 @@ def process_country(address: Optional[str],
         if not address or not isinstance(address, str):
             return None
 
-        final_match = search(r'^[^,]+, [^,]+, ([^,]+),', address)
+        final_match = search(COUNTRY_PATTERN, address)
         return final_match.group(1) if final_match else None
     except Exception as e:
         logger.error(f"Error processing country from address '{address}': {e}")
         return None
+
+
+def with_city(frame: Union[pl.DataFrame, pl.LazyFrame],
+              address_col: str = 'office_address',
+              alias: str = 'city'
+              ) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Add the city of a column of addresses, as `process_address` on every row.
+
+    Parameters
+    ----------
+    frame : Union[pl.DataFrame, pl.LazyFrame]
+        Polars frame holding the addresses.
+    address_col : str, optional
+        Column of the addresses (default is 'office_address').
+    alias : str, optional
+        Name of the city column (default is 'city').
+
+    Returns
+    -------
+    Union[pl.DataFrame, pl.LazyFrame]
+        The frame with the city column: the first `CITY_PATTERN` candidate,
+        stripped, or the `CITY_FALLBACK_PATTERN` part when the candidate
+        holds a space and a digit and the fallback matches. Null when no
+        candidate matches.
+
+    Notes
+    -----
+    The candidate is stored before it is tested, so each pattern runs once
+    per row.
+    """
+    address, city = pl.col(address_col), pl.col(alias)
+    return frame\
+        .with_columns(address.str.extract(CITY_PATTERN, 1).str.strip_chars().alias(alias))\
+        .with_columns(
+            pl.when(city.str.contains(' ', literal=True) & city.str.contains(r'\d'))
+            .then(address.str.extract(CITY_FALLBACK_PATTERN, 1).fill_null(city))
+            .otherwise(city).alias(alias))
+
+
+def country_expr(address: pl.Expr) -> pl.Expr:
+    """Return the country of addresses, as `process_country` on every row."""
+    return address.str.extract(COUNTRY_PATTERN, 1)
+
+
+def _address_series(addresses: pd.Series) -> pl.Series:
+    """Convert pandas addresses to a Polars string Series, non-strings becoming null."""
+    if isinstance(addresses.dtype, pd.StringDtype):
+        return pl.from_pandas(addresses)  # Arrow backed, no copy
+    if pd.api.types.infer_dtype(addresses, skipna=True) not in ('string', 'empty'):
+        addresses = addresses.where(addresses.map(lambda value: isinstance(value, str)), None)
+    return pl.from_pandas(addresses.astype(object)).cast(pl.String)
+
+
+def extract_cities(addresses: pd.Series) -> pd.Series:
+    """
+    Extract the city of a column of addresses, the column version of `process_address`.
+
+    Parameters
+    ----------
+    addresses : pd.Series
+        Office addresses.
+
+    Returns
+    -------
+    pd.Series
+        The cities as strings, with the index of `addresses`. Missing when the address
+        is missing, not a string or holds no candidate.
+    """
+    frame = with_city(pl.DataFrame({'address': _address_series(addresses)}), 'address')
+    return frame['city'].to_pandas().set_axis(addresses.index)
+
+
+def extract_countries(addresses: pd.Series) -> pd.Series:
+    """
+    Extract the country of a column of addresses, the column version of `process_country`.
+
+    Parameters
+    ----------
+    addresses : pd.Series
+        Office addresses.
+
+    Returns
+    -------
+    pd.Series
+        The countries as strings, with the index of `addresses`, missing
+        when not found.
+    """
+    countries = _address_series(addresses).to_frame('address')\
+        .select(country_expr(pl.col('address')))
+    return countries.to_series().to_pandas().set_axis(addresses.index)
+
+
+def benchmark_addresses(logger: logging.Logger,
+                        addresses: pd.Series,
+                        repeats: int = 1
+                        ) -> Dict[str, Union[float, bool]]:
+    """
+    Compare the row address functions against their column versions.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        A logger instance to log errors of the row functions.
+    addresses : pd.Series
+        Office addresses.
+    repeats : int, optional
+        Number of timed repetitions, the fastest is kept (default is 1, the
+        row functions take minutes on millions of addresses).
+
+    Returns
+    -------
+    Dict[str, Union[float, bool]]
+        Best wall time in seconds of 'rows' (`process_address` and
+        `process_country` through `.apply`) and 'columns' (`extract_cities`
+        and `extract_countries`), 'speedup', and 'identical', whether both
+        produced the same cities and countries.
+    """
+    results = {}
+
+    def by_rows() -> None:
+        results['rows'] = (addresses.apply(lambda address: process_address(address, logger)),
+                           addresses.apply(lambda address: process_country(address, logger)))
+
+    def by_columns() -> None:
+        results['columns'] = (extract_cities(addresses), extract_countries(addresses))
+
+    rows, _ = best_of(by_rows, repeats)
+    columns, _ = best_of(by_columns, repeats)
+    identical = all(expected.astype(object).where(expected.notna(), None).tolist()
+                    == result.astype(object).where(result.notna(), None).tolist()
+                    for expected, result in zip(results['rows'], results['columns']))
+    return {'rows': rows, 'columns': columns, 'speedup': rows / columns, 'identical': identical}
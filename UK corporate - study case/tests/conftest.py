@@ -0,0 +1,5 @@
+"""Make the flat modules of src importable by the tests."""
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / 'src'))
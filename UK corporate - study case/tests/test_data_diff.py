@@ -0,0 +1,62 @@
+"""Tests of the snapshot diff of data_diff."""
+import datetime
+import logging
+
+import polars as pl
+
+import data_diff
+
+logger = logging.getLogger(__name__)
+
+STATUS = pl.Enum(['Active', 'Dissolved'])
+
+
+def diff(tmp_path, new, old):
+    """Diff two frames written as snapshots, returning the counts and the keys per change set."""
+    new.write_parquet(tmp_path / 'new.parquet')
+    old.write_parquet(tmp_path / 'old.parquet')
+    out_dir = tmp_path / 'changes'
+    counts = data_diff.diff_snapshots(logger, tmp_path / 'new.parquet', tmp_path / 'old.parquet',
+                                      out_dir)
+    keys = {name: sorted(data_diff.read_change_set(out_dir, name)
+                         .select('company_number').collect().to_series().to_list())
+            for name in data_diff.CHANGE_SETS}
+    return counts, keys
+
+
+def test_diff_finds_inserted_updated_and_deleted_keys(tmp_path):
+    old = pl.DataFrame({'company_number': ['01', '02', '03', '03', '04'],
+                        'officer': ['Ann', 'Bob', 'Cy', 'Di', 'Ed']})
+    # 01 is deleted, 03 loses an officer, 04 is unchanged but reordered, 05 is new
+    new = pl.DataFrame({'company_number': ['04', '02', '03', '05', '05'],
+                        'officer': ['Ed', 'Bob', 'Cy', 'Flo', 'Gus']})
+    counts, keys = diff(tmp_path, new, old)
+
+    assert keys == {'inserted': ['05', '05'], 'updated': ['03'], 'deleted': ['01']}
+    assert counts == {'inserted': 2, 'updated': 1, 'deleted': 1}
+
+
+def test_diff_compares_grown_categories_by_value(tmp_path, caplog):
+    old = pl.DataFrame({'company_number': ['01', '02', '03'],
+                        'company_status': pl.Series(['Active', 'Active', 'Dissolved'], dtype=STATUS)})
+    grown = pl.Enum([*STATUS.categories, 'Liquidation'])
+    new = pl.DataFrame({'company_number': ['01', '02', '03'],
+                        'company_status': pl.Series(['Active', 'Liquidation', 'Dissolved'],
+                                                    dtype=grown)})
+    with caplog.at_level(logging.WARNING):
+        _, keys = diff(tmp_path, new, old)
+
+    assert keys == {'inserted': [], 'updated': ['02'], 'deleted': []}
+    assert "Types of ['company_status'] changed" in caplog.text
+
+
+def test_diff_ignores_columns_typed_since_the_previous_snapshot(tmp_path):
+    dates = [datetime.date(2020, 1, 31), None]
+    old = pl.DataFrame({'company_number': ['01', '02'], 'company_status': ['Active', 'Dissolved'],
+                        'incorporation_date': ['2020-01-31', None]})
+    new = pl.DataFrame({'company_number': ['01', '02'],
+                        'company_status': pl.Series(['Active', 'Dissolved'], dtype=STATUS),
+                        'incorporation_date': dates})
+    counts, _ = diff(tmp_path, new, old)
+
+    assert counts == {'inserted': 0, 'updated': 0, 'deleted': 0}
@@ -0,0 +1,73 @@
+"""Tests of the resumable chunked conversion of data_ingest."""
+import polars as pl
+import pytest
+
+import data_ingest
+
+BAD_DATE_ROWS = [3, 17, 31, 44]
+
+
+def write_csv(path, n_rows):
+    """Write a companies-like CSV, with unparseable dates on BAD_DATE_ROWS."""
+    lines = ['company_number;company_name;incorporation_date;company_status']
+    for i in range(n_rows):
+        date = 'not a date' if i in BAD_DATE_ROWS else f'2020-01-{i % 28 + 1:02d}'
+        status = 'Active' if i % 3 else 'Dissolved'
+        lines.append(f'{i:08d};Company {i};{date};{status}')
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def convert(csv_path, parquet_path):
+    """Convert in parts of 10 rows, with dates and a categorical column."""
+    return data_ingest.write_chunks(csv_path, parquet_path, chunk_rows=10,
+                                    date_cols=['incorporation_date'],
+                                    categorical_cols=['company_status'])
+
+
+def test_write_chunks_resumes_after_crash(tmp_path, monkeypatch):
+    csv_path, parquet_path = tmp_path / 'companies.csv', tmp_path / 'companies.parquet'
+    write_csv(csv_path, 45)
+    # Batches smaller than the parts, so parts are cut across batches
+    monkeypatch.setattr(data_ingest, 'BATCH_ROWS', 7)
+
+    save_manifest = data_ingest._save_manifest
+
+    def crash_after_two_parts(parts_dir, manifest):
+        save_manifest(parts_dir, manifest)
+        if len(manifest['parts']) == 2 and not manifest['complete']:
+            raise RuntimeError('killed')
+
+    monkeypatch.setattr(data_ingest, '_save_manifest', crash_after_two_parts)
+    with pytest.raises(RuntimeError, match='killed'):
+        convert(csv_path, parquet_path)
+    assert not parquet_path.exists()
+    assert len(data_ingest.load_manifest(data_ingest.parts_path(parquet_path))['parts']) == 2
+
+    monkeypatch.setattr(data_ingest, '_save_manifest', save_manifest)
+    categories, invalid_dates, resumed = convert(csv_path, parquet_path)
+
+    assert resumed == 2
+    assert invalid_dates == {'incorporation_date': len(BAD_DATE_ROWS)}
+    assert categories == {'company_status': ['Active', 'Dissolved']}
+    assert not data_ingest.parts_path(parquet_path).exists()
+    df = pl.read_parquet(parquet_path)
+    assert df['company_number'].to_list() == [f'{i:08d}' for i in range(45)]
+    assert df['company_name'].to_list() == [f'Company {i}' for i in range(45)]
+    assert df['incorporation_date'].is_null().arg_true().to_list() == BAD_DATE_ROWS
+    # The header is line 1, so row i of the data is on line i + 2
+    quarantine = pl.read_parquet(data_ingest.quarantine_path(parquet_path))
+    assert quarantine['line'].to_list() == [row + 2 for row in BAD_DATE_ROWS]
+    assert quarantine['company_number'].to_list() == [f'{row:08d}' for row in BAD_DATE_ROWS]
+
+
+def test_write_chunks_restarts_when_chunk_size_changes(tmp_path):
+    csv_path, parquet_path = tmp_path / 'companies.csv', tmp_path / 'companies.parquet'
+    write_csv(csv_path, 25)
+    parts_dir = data_ingest.parts_path(parquet_path)
+    data_ingest.write_chunks(csv_path, parquet_path, chunk_rows=10, consolidate=False)
+    assert len(data_ingest.load_manifest(parts_dir)['parts']) == 3
+
+    _, _, resumed = data_ingest.write_chunks(csv_path, parquet_path, chunk_rows=20,
+                                             consolidate=False)
+    assert resumed == 0
+    assert [part['rows'] for part in data_ingest.load_manifest(parts_dir)['parts']] == [20, 5]
@@ -0,0 +1,67 @@
+"""Tests of the filter parser of predicate_index, against pd.DataFrame.query."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import predicate_index
+
+UK = 'United Kingdom'
+
+
+@pytest.fixture
+def officers():
+    """Thirteen rows, so the bitmaps end on a partial byte, with missing values."""
+    return pd.DataFrame({
+        'is_owner': [True, False, True, True, False, False, True,
+                     False, True, False, True, False, True],
+        'nationality': [UK, 'French', None, UK, 'Irish', UK, 'French',
+                        None, 'Irish', UK, UK, 'German', 'French'],
+        'country_of_residence': [UK, UK, 'France', None, 'Ireland', UK, 'France',
+                                 UK, None, 'Spain', UK, UK, 'France'],
+        'company_status': pd.Categorical(['Active', 'Dissolved', 'Open', 'Active', 'Active',
+                                          'Liquidation', 'Active', 'Open', 'Dissolved',
+                                          'Active', None, 'Active', 'Open']),
+    })
+
+
+@pytest.mark.parametrize('where', [
+    "is_owner == True",
+    "is_owner == False",
+    f"nationality == '{UK}'",
+    f"nationality != '{UK}'",
+    "company_status in ['Active', 'Open']",
+    "company_status not in ['Active', 'Open']",
+    f"is_owner == True and nationality != '{UK}'",
+    f"nationality == '{UK}' or country_of_residence == '{UK}'",
+    f"not (nationality == '{UK}' or country_of_residence == '{UK}')",
+    f"is_owner == False and (nationality in ('French', 'Irish') or not country_of_residence != '{UK}')",
+    f"not nationality == '{UK}'",
+])
+def test_rows_match_query(officers, where):
+    index = predicate_index.build_index(officers)
+
+    expected = officers.query(where).index.to_numpy()
+    np.testing.assert_array_equal(predicate_index.rows(index, where), expected)
+
+
+def test_split_matches_query(officers):
+    index = predicate_index.build_index(officers)
+    where = f"is_owner == True and country_of_residence == '{UK}'"
+
+    matching, others = predicate_index.split(index, where)
+    pd.testing.assert_frame_equal(matching, officers.query(where).reset_index(drop=True))
+    pd.testing.assert_frame_equal(others, officers.query(f'not ({where})').reset_index(drop=True))
+
+
+@pytest.mark.parametrize('where', [
+    "is_owner > 2",
+    f"is_owner == True & nationality == '{UK}'",
+    f"(is_owner == True) & (nationality == '{UK}')",
+    "nationality == country_of_residence",
+    "company_status in @ACTIVE_OPEN_LST",
+])
+def test_unsupported_filters_raise(officers, where):
+    index = predicate_index.build_index(officers)
+
+    with pytest.raises(ValueError, match='Unsupported filter expression: .*filters support'):
+        predicate_index.bitmap(index, where)
@@ -0,0 +1,46 @@
+"""Tests of uk_corporate_analysis.top_n_other."""
+import pandas as pd
+import pytest
+
+from uk_corporate_analysis import top_n_other
+
+# Irish, German and Polish tie for the third place
+COUNTS = pd.DataFrame({'nationality': ['British', 'French', 'Irish', 'German', 'Polish', 'Spanish'],
+                       'size': [10, 7, 5, 5, 5, 1]})
+
+
+@pytest.mark.parametrize('keep, expected', [
+    ('first', {'British': 10, 'French': 7, 'Irish': 5, 'Other': 11}),
+    ('last', {'British': 10, 'French': 7, 'Polish': 5, 'Other': 11}),
+    ('all', {'British': 10, 'French': 7, 'German': 5, 'Irish': 5, 'Polish': 5, 'Other': 1}),
+])
+def test_ties_for_the_last_place(keep, expected):
+    result = top_n_other(COUNTS, 'nationality', top_n=3, keep=keep)
+
+    assert dict(zip(result['nationality'], result['size'])) == expected
+    assert result['nationality'].tolist() == sorted(expected)
+
+
+@pytest.mark.parametrize('keep', ['first', 'last', 'all'])
+def test_kept_labels_match_nlargest(keep):
+    shuffled = COUNTS.sample(frac=1, random_state=0).reset_index(drop=True)
+    result = top_n_other(shuffled, 'nationality', top_n=3, keep=keep)
+
+    kept = set(shuffled.nlargest(3, 'size', keep=keep)['nationality'])
+    assert set(result['nationality']) - {'Other'} == kept
+    assert result['size'].sum() == shuffled['size'].sum()
+
+
+def test_labels_already_other_are_summed_in():
+    counts = pd.DataFrame({'occupation': ['Director', 'Other', 'Secretary', 'Manager'],
+                           'size': [9, 8, 3, 2]})
+    result = top_n_other(counts, 'occupation', top_n=2)
+
+    assert dict(zip(result['occupation'], result['size'])) == {'Director': 9, 'Other': 13}
+
+
+def test_invalid_arguments_raise():
+    with pytest.raises(ValueError, match='top_n'):
+        top_n_other(COUNTS, 'nationality', top_n=0)
+    with pytest.raises(ValueError, match='keep'):
+        top_n_other(COUNTS, 'nationality', keep='middle')